@@ -0,0 +1,343 @@
+import bisect
+import re
+
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico, NoAST
+from analisador_semantico import AnalisadorSemantico
+
+
+class AnalisadorSintaticoIncremental(AnalisadorSintatico):
+    def comando(self):
+        inicio = self.pos
+        no = super().comando()
+        no.intervalo = (inicio, self.pos)
+        return no
+
+
+class AnalisadorIncremental:
+    CHAVES_SEM_SIMBOLOS = ['comando', 'operador', 'tipo', 'sensor']
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.tokens = None
+        self.ast = None
+        self.tabela_simbolos = {}
+        self.semantica_ok = False
+        self.declaracoes = []
+        self.simbolos = []
+
+    def analisar(self):
+        self.tokens = None
+        self.ast = None
+        self.semantica_ok = False
+
+        self.tokens = AnalisadorLexico(self.codigo).analisar()
+        self.ast = AnalisadorSintaticoIncremental(self.tokens).programa()
+        self.indexar()
+        self.verificar_tudo()
+        return self.ast
+
+    def editar(self, inicio, fim, texto):
+        codigo_antigo = self.codigo
+        self.codigo = codigo_antigo[:inicio] + texto + codigo_antigo[fim:]
+
+        if self.tokens is None or self.ast is None:
+            return self.analisar()
+
+        relexado = self.relexar(codigo_antigo, inicio, fim, texto)
+        if relexado is None:
+            return self.analisar()
+
+        tokens_antigos = self.tokens
+        self.tokens, ia, ib, deslocamento, linha_b, delta = relexado
+
+        if delta:
+            self.deslocar_linhas(self.ast, linha_b, delta)
+
+        if ia == ib and deslocamento == 0:
+            if not self.semantica_ok:
+                self.verificar_tudo()
+            return self.ast
+
+        try:
+            alterados = self.reparsear(tokens_antigos, ia, ib, deslocamento)
+        except Exception:
+            alterados = None
+
+        if alterados is None:
+            self.ast = None
+            self.semantica_ok = False
+            self.ast = AnalisadorSintaticoIncremental(self.tokens).programa()
+            self.indexar()
+            self.verificar_tudo()
+        elif not self.semantica_ok:
+            self.reindexar(*alterados)
+            self.verificar_tudo()
+        else:
+            self.reverificar(*alterados)
+
+        return self.ast
+
+    def relexar(self, codigo_antigo, inicio, fim, texto):
+        linha_a = codigo_antigo.count('\n', 0, inicio) + 1
+        linha_b = codigo_antigo.count('\n', 0, fim) + 1
+        delta = texto.count('\n') - codigo_antigo.count('\n', inicio, fim)
+
+        for token in self.tokens:
+            if token.tipo == 'STRING' and '\n' in token.valor:
+                return None
+
+        ini_trecho = self.codigo.rfind('\n', 0, inicio) + 1
+        fim_trecho = self.codigo.find('\n', inicio + len(texto))
+        if fim_trecho == -1:
+            fim_trecho = len(self.codigo)
+
+        try:
+            novos = AnalisadorLexico(self.codigo[ini_trecho:fim_trecho], linha_a).analisar()
+        except Exception:
+            return None
+
+        for token in novos:
+            if token.tipo == 'STRING' and '\n' in token.valor:
+                return None
+
+        tokens = self.tokens
+        ia = bisect.bisect_left(tokens, linha_a, key=lambda t: t.linha)
+        ib = bisect.bisect_right(tokens, linha_b, key=lambda t: t.linha)
+
+        # Reduz o trecho substituído aos tokens que de fato mudaram. Só é
+        # seguro quando nenhuma linha muda de número, e um token só é mantido
+        # se continua na mesma linha.
+        ini_novos, fim_novos = 0, len(novos)
+        while (delta == 0 and ia < ib and ini_novos < fim_novos and
+               self.mesmo_token(tokens[ia], novos[ini_novos])):
+            ia += 1
+            ini_novos += 1
+        while (delta == 0 and ia < ib and ini_novos < fim_novos and
+               self.mesmo_token(tokens[ib - 1], novos[fim_novos - 1])):
+            ib -= 1
+            fim_novos -= 1
+
+        for token in tokens[ib:]:
+            if token.linha > linha_b:
+                token.linha += delta
+
+        novos_tokens = tokens[:ia] + novos[ini_novos:fim_novos] + tokens[ib:]
+        return novos_tokens, ia, ib, (fim_novos - ini_novos) - (ib - ia), linha_b, delta
+
+    def mesmo_token(self, a, b):
+        return a.tipo == b.tipo and a.valor == b.valor and a.linha == b.linha
+
+    def reparsear(self, antigos, ia, ib, deslocamento):
+        filhos = self.ast.filhos
+        ini_regiao = 1
+        fim_regiao = filhos[-1].intervalo[1] if filhos else ini_regiao
+
+        if ia < ini_regiao or ib > fim_regiao:
+            return None
+
+        afetados = self.filhos_afetados(self.ast, ia, ib)
+        if len(afetados) == 1:
+            j = afetados[0]
+            if self.reparsear_bloco(filhos[j], antigos, ia, ib, deslocamento):
+                return j, j + 1, 1
+
+        resultado = self.reparsear_lista(self.ast, ['fim'], afetados, ia, ib, deslocamento)
+        if resultado is None:
+            return None
+
+        a, b, novos = resultado
+        return a, b, len(novos)
+
+    def reparsear_bloco(self, no, antigos, ia, ib, deslocamento):
+        for lista, terminadores, ini_regiao in self.regioes(no, antigos):
+            fim_regiao = lista.filhos[-1].intervalo[1] if lista.filhos else ini_regiao
+            if not (ini_regiao <= ia and ib <= fim_regiao):
+                continue
+
+            afetados = self.filhos_afetados(lista, ia, ib)
+            if len(afetados) == 1:
+                if self.reparsear_bloco(lista.filhos[afetados[0]], antigos, ia, ib, deslocamento):
+                    return True
+
+            return self.reparsear_lista(lista, terminadores, afetados, ia, ib, deslocamento) is not None
+
+        return False
+
+    def reparsear_lista(self, lista, terminadores, afetados, ia, ib, deslocamento):
+        filhos = lista.filhos
+        if afetados:
+            a, b = afetados[0], afetados[-1] + 1
+            ini, fim = filhos[a].intervalo[0], filhos[b - 1].intervalo[1]
+        else:
+            a = b = bisect.bisect_left(filhos, ia, key=lambda f: f.intervalo[0])
+            ini = fim = ia
+
+        parser = AnalisadorSintaticoIncremental(self.tokens)
+        parser.pos = ini
+        limite = fim + deslocamento
+        novos = []
+
+        while parser.pos < limite:
+            token = parser.token_atual()
+            if not token or token.valor in terminadores:
+                return None
+            try:
+                novos.append(parser.comando())
+            except Exception:
+                return None
+
+        if parser.pos != limite:
+            return None
+
+        self.deslocar_intervalos(self.ast, ini, fim, deslocamento)
+        filhos[a:b] = novos
+        return a, b, novos
+
+    def deslocar_intervalos(self, no, ini, fim, deslocamento):
+        for filho in no.filhos:
+            intervalo = getattr(filho, 'intervalo', None)
+            if intervalo:
+                s, e = intervalo
+                if s >= fim:
+                    filho.intervalo = (s + deslocamento, e + deslocamento)
+                elif s < ini and e > fim:
+                    filho.intervalo = (s, e + deslocamento)
+                elif e <= ini:
+                    continue
+            self.deslocar_intervalos(filho, ini, fim, deslocamento)
+
+    def deslocar_linhas(self, valor, linha_b, delta):
+        if isinstance(valor, NoAST):
+            if valor.linha is not None and valor.linha > linha_b:
+                valor.linha += delta
+            self.deslocar_linhas(valor.valor, linha_b, delta)
+            for filho in valor.filhos:
+                self.deslocar_linhas(filho, linha_b, delta)
+        elif isinstance(valor, dict):
+            for item in valor.values():
+                self.deslocar_linhas(item, linha_b, delta)
+        elif isinstance(valor, list):
+            for item in valor:
+                self.deslocar_linhas(item, linha_b, delta)
+
+    def filhos_afetados(self, lista, ia, ib):
+        afetados = []
+        for j, filho in enumerate(lista.filhos):
+            s, e = filho.intervalo
+            if s < ib and e > ia:
+                afetados.append(j)
+            elif s >= ib:
+                break
+        return afetados
+
+    def regioes(self, no, tokens):
+        s, _ = no.intervalo
+
+        if no.tipo in ['Repeticao', 'Enquanto']:
+            abertura = 'vezes' if no.tipo == 'Repeticao' else 'faca'
+            fechamento = 'fim_repita' if no.tipo == 'Repeticao' else 'fim_enquanto'
+            return [(no, [fechamento], self.posicao_palavra(tokens, s, abertura) + 1)]
+
+        if no.tipo == 'Procedimento':
+            return [(no, ['fim_procedimento'], self.posicao_palavra(tokens, s, ')') + 1)]
+
+        if no.tipo == 'Condicional':
+            regioes = []
+            inicio = self.posicao_palavra(tokens, s, 'entao') + 1
+            for bloco in no.filhos:
+                if bloco.tipo == 'BlocoVerdadeiro':
+                    regioes.append((bloco, ['senao', 'fim_se'], inicio))
+                else:
+                    regioes.append((bloco, ['fim_se'], inicio))
+                inicio = (bloco.filhos[-1].intervalo[1] if bloco.filhos else inicio) + 1
+            return regioes
+
+        return []
+
+    def posicao_palavra(self, tokens, inicio, palavra):
+        pos = inicio
+        while tokens[pos].valor != palavra:
+            pos += 1
+        return pos
+
+    def indexar(self):
+        self.declaracoes = [self.declaracoes_de(f) for f in self.ast.filhos]
+        self.simbolos = [self.simbolos_de(f) for f in self.ast.filhos]
+
+    def reindexar(self, a, b, n):
+        self.declaracoes[a:b] = [self.declaracoes_de(f) for f in self.ast.filhos[a:a + n]]
+        self.simbolos[a:b] = [self.simbolos_de(f) for f in self.ast.filhos[a:a + n]]
+
+    def declaracoes_de(self, no):
+        # Um procedimento só declara a própria assinatura; as locais ficam nele
+        if no.tipo == 'Procedimento':
+            tipos = tuple(p['tipo'] for p in no.valor['parametros'])
+            return [(no.valor['nome'], ('procedimento', tipos))]
+
+        declaracoes = []
+        if no.tipo == 'Declaracao':
+            declaracoes.extend((var, no.valor['tipo']) for var in no.valor['variaveis'])
+        for filho in no.filhos:
+            declaracoes.extend(self.declaracoes_de(filho))
+        return declaracoes
+
+    def simbolos_de(self, no):
+        simbolos = set()
+        self.coletar_simbolos(no, simbolos)
+        return simbolos
+
+    def coletar_simbolos(self, valor, simbolos):
+        if isinstance(valor, NoAST):
+            self.coletar_simbolos(valor.valor, simbolos)
+            for filho in valor.filhos:
+                self.coletar_simbolos(filho, simbolos)
+        elif isinstance(valor, dict):
+            for chave, item in valor.items():
+                if chave not in self.CHAVES_SEM_SIMBOLOS:
+                    self.coletar_simbolos(item, simbolos)
+        elif isinstance(valor, list):
+            for item in valor:
+                self.coletar_simbolos(item, simbolos)
+        elif isinstance(valor, str) and not valor.startswith(('"', "'")):
+            simbolos.update(re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', valor))
+
+    def verificar_tudo(self):
+        self.semantica_ok = False
+        analisador = AnalisadorSemantico()
+        analisador.analisar(self.ast, verboso=False)
+        self.tabela_simbolos = analisador.tabela_simbolos
+        self.semantica_ok = True
+
+    def reverificar(self, a, b, n):
+        antigas = [d for decl in self.declaracoes[a:b] for d in decl]
+        self.reindexar(a, b, n)
+        novas = [d for decl in self.declaracoes[a:a + n] for d in decl]
+
+        tabela = {}
+        for decl in self.declaracoes[:a]:
+            tabela.update(decl)
+
+        self.semantica_ok = False
+        for filho in self.ast.filhos[a:a + n]:
+            tabela = self.verificar_comando(filho, tabela)
+
+        mapa_antigo, mapa_novo = dict(antigas), dict(novas)
+        alterados = {nome for nome in mapa_antigo.keys() | mapa_novo.keys()
+                     if mapa_antigo.get(nome) != mapa_novo.get(nome)}
+
+        if alterados:
+            for j in range(a + n, len(self.ast.filhos)):
+                if self.simbolos[j] & alterados:
+                    tabela = self.verificar_comando(self.ast.filhos[j], tabela)
+                else:
+                    tabela.update(self.declaracoes[j])
+            self.tabela_simbolos = tabela
+
+        self.semantica_ok = True
+
+    def verificar_comando(self, no, tabela):
+        analisador = AnalisadorSemantico()
+        analisador.tabela_simbolos = dict(tabela)
+        analisador.analisar(no, verboso=False)
+        return analisador.tabela_simbolos
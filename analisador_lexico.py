@@ -10,19 +10,24 @@ class Token:
         return f"<{self.tipo}, {self.valor}, linha {self.linha}>"
 
 class AnalisadorLexico:
-    def __init__(self, codigo):
+    def __init__(self, codigo, linha_inicial=1, recuperar=False):
         self.codigo = codigo
         self.tokens = []
-        self.linha_atual = 1
+        self.linha_atual = linha_inicial
+        self.recuperar = recuperar
+        self.erros = []
         self.padrao_tokens = [
-            (r'\b(inicio|fim|var|inteiro|real|texto|logico|verdadeiro|falso)\b', 'RESERVADA'),
-            (r'\b(se|entao|senao|fim_se)\b', 'RESERVADA'),
-            (r'\b(repita|vezes|fim_repita)\b', 'RESERVADA'),
-            (r'\b(enquanto|faca|fim_enquanto)\b', 'RESERVADA'),
-            (r'\b(avancar|recuar|girar_direita|girar_esquerda|ir_para)\b', 'RESERVADA'),
-            (r'\b(levantar_caneta|abaixar_caneta|definir_cor|definir_espessura)\b', 'RESERVADA'),
-            (r'\b(cor_de_fundo|limpar_tela)\b', 'RESERVADA'),
-            (r'\b(velocidade|circulo)\b', 'RESERVADA'),
+            (r'(inicio|fim|var|inteiro|real|texto|logico|verdadeiro|falso)\b', 'RESERVADA'),
+            (r'(se|entao|senao|fim_se)\b', 'RESERVADA'),
+            (r'(repita|vezes|fim_repita)\b', 'RESERVADA'),
+            (r'(enquanto|faca|fim_enquanto)\b', 'RESERVADA'),
+            (r'(procedimento|fim_procedimento)\b', 'RESERVADA'),
+            (r'(avancar|recuar|girar_direita|girar_esquerda|ir_para)\b', 'RESERVADA'),
+            (r'(levantar_caneta|abaixar_caneta|definir_cor|definir_espessura)\b', 'RESERVADA'),
+            (r'(cor_de_fundo|limpar_tela)\b', 'RESERVADA'),
+            (r'(velocidade|circulo)\b', 'RESERVADA'),
+            (r'(tartaruga|usar)\b', 'RESERVADA'),
+            (r'(tocando|distancia_ate_linha)\b', 'RESERVADA'),
             (r'//.*', 'COMENTARIO'),
             (r'"[^"]*"', 'STRING'),
             (r"'[^']*'", 'STRING'),
@@ -35,6 +40,10 @@ class AnalisadorLexico:
             (r'\(|\)|,|;', 'SIMBOLO'),
             (r'\s+', None),
         ]
+        # Casar a partir da posição evita copiar o resto do código a cada token;
+        # por isso as palavras reservadas não começam com \b, que olharia o
+        # caractere anterior
+        self.padroes = [(re.compile(padrao), tipo) for padrao, tipo in self.padrao_tokens]
 
     def analisar(self):
         pos = 0
@@ -42,8 +51,8 @@ class AnalisadorLexico:
         while pos < len(self.codigo):
             matched = False
             
-            for padrao, tipo in self.padrao_tokens:
-                resultado = re.match(padrao, self.codigo[pos:])
+            for padrao, tipo in self.padroes:
+                resultado = padrao.match(self.codigo, pos)
                 
                 if resultado:
                     texto = resultado.group(0)
@@ -59,7 +68,12 @@ class AnalisadorLexico:
                     break
             
             if not matched:
-                raise Exception(f"Erro léxico na linha {self.linha_atual}: caractere inesperado '{self.codigo[pos]}'")
+                mensagem = f"Erro léxico na linha {self.linha_atual}: caractere inesperado '{self.codigo[pos]}'"
+                if not self.recuperar:
+                    raise Exception(mensagem)
+                # No modo de verificação o caractere é descartado e a análise segue
+                self.erros.append({'fase': 'lexico', 'linha': self.linha_atual, 'mensagem': mensagem})
+                pos += 1
                 
         return self.tokens
 
@@ -1,12 +1,17 @@
 class AnalisadorSemantico:
-    def __init__(self):
+    def __init__(self, recuperar=False):
+        self.recuperar = recuperar
+        self.erros = []
         self.tabela_simbolos = {}
-        self.tipos_validos = ['inteiro', 'real', 'texto', 'logico']
+        self.tipos_validos = ['inteiro', 'real', 'texto', 'logico', 'tartaruga']
+        self.profundidade = 0
+        self.tipos_sensores = {'tocando': 'logico', 'distancia_ate_linha': 'real'}
 
-    def analisar(self, ast):
+    def analisar(self, ast, verboso=True):
         try:
             self.verificar_no(ast)
-            print("Análise semântica concluída com sucesso!")
+            if verboso:
+                print("Análise semântica concluída com sucesso!")
         except Exception as e:
             raise Exception(f"Erro semântico: {str(e)}")
 
@@ -25,6 +30,9 @@ class AnalisadorSemantico:
             'Condicional': lambda: self.verificar_condicional(no),
             'Repeticao': lambda: self.verificar_repeticao(no),
             'Enquanto': lambda: self.verificar_enquanto(no),
+            'Procedimento': lambda: self.verificar_procedimento(no),
+            'Chamada': lambda: self.verificar_chamada(no),
+            'Usar': lambda: self.verificar_usar(no),
             'ExpressaoAritmetica': lambda: self.verificar_expressao_aritmetica(no),
             'ExpressaoLogica': lambda: self.verificar_expressao_logica(no)
         }
@@ -36,7 +44,23 @@ class AnalisadorSemantico:
 
     def verificar_filhos(self, no):
         for filho in no.filhos:
-            self.verificar_no(filho)
+            self.tentar(filho, lambda: self.verificar_no(filho))
+
+    def tentar(self, no, verificacao):
+        # Na recuperação, o erro é anotado e a análise segue no próximo comando
+        try:
+            verificacao()
+        except Exception as e:
+            if not self.recuperar:
+                raise
+            linha = no.linha or 1
+            self.erros.append({'fase': 'semantico', 'linha': linha,
+                               'mensagem': f"Erro semântico na linha {linha}: {e}"})
+
+    def verificar_bloco(self, no):
+        self.profundidade += 1
+        self.verificar_filhos(no)
+        self.profundidade -= 1
 
     def verificar_declaracao(self, no):
         tipo = no.valor['tipo']
@@ -56,6 +80,9 @@ class AnalisadorSemantico:
         
         if var not in self.tabela_simbolos:
             raise Exception(f"variável '{var}' não foi declarada")
+
+        if self.eh_procedimento(self.tabela_simbolos[var]):
+            raise Exception(f"não é possível atribuir ao procedimento '{var}'")
         
         tipo_var = self.tabela_simbolos[var]
         tipo_valor = self.inferir_tipo(valor)
@@ -108,13 +135,18 @@ class AnalisadorSemantico:
             self.verificar_tipo_numerico(no.valor['valor'], f"raio do comando '{comando}'")
 
 
+    def verificar_usar(self, no):
+        self.verificar_tipo_especifico(no.valor['nome'], 'tartaruga', "argumento do comando 'usar'")
+
     def verificar_condicional(self, no):
-        self.verificar_tipo_especifico(no.valor['condicao'], 'logico', 'condição do se')
-        self.verificar_filhos(no)
+        self.tentar(no, lambda: self.verificar_tipo_especifico(no.valor['condicao'], 'logico', 'condição do se'))
+        self.verificar_bloco(no)
 
     def verificar_repeticao(self, no):
-        vezes = no.valor['vezes']
-        
+        self.tentar(no, lambda: self.verificar_vezes(no.valor['vezes']))
+        self.verificar_bloco(no)
+
+    def verificar_vezes(self, vezes):
         if isinstance(vezes, str):
             if vezes.isdigit():
                 if int(vezes) <= 0:
@@ -125,11 +157,58 @@ class AnalisadorSemantico:
                 raise Exception(f"variável '{vezes}' deve ser do tipo inteiro")
         
         self.verificar_tipo_especifico(vezes, 'inteiro', 'número de repetições')
-        self.verificar_filhos(no)
 
     def verificar_enquanto(self, no):
-        self.verificar_tipo_especifico(no.valor['condicao'], 'logico', 'condição do enquanto')
-        self.verificar_filhos(no)
+        self.tentar(no, lambda: self.verificar_tipo_especifico(no.valor['condicao'], 'logico', 'condição do enquanto'))
+        self.verificar_bloco(no)
+
+    def verificar_procedimento(self, no):
+        nome = no.valor['nome']
+        parametros = no.valor['parametros']
+
+        if self.profundidade > 0:
+            raise Exception(f"procedimento '{nome}' deve ser declarado fora de blocos e de outros procedimentos")
+        if nome in self.tabela_simbolos:
+            raise Exception(f"'{nome}' já foi declarado")
+
+        # Os parâmetros e as variáveis locais vivem num escopo próprio, que
+        # enxerga as variáveis globais declaradas até aqui
+        escopo = dict(self.tabela_simbolos)
+        locais = set()
+        for parametro in parametros:
+            if parametro['tipo'] not in self.tipos_validos:
+                raise Exception(f"tipo '{parametro['tipo']}' não é válido. Tipos válidos: {self.tipos_validos}")
+            if parametro['nome'] in locais:
+                raise Exception(f"parâmetro '{parametro['nome']}' repetido no procedimento '{nome}'")
+            locais.add(parametro['nome'])
+            escopo[parametro['nome']] = parametro['tipo']
+
+        assinatura = ('procedimento', tuple(p['tipo'] for p in parametros))
+        self.tabela_simbolos[nome] = assinatura
+        escopo[nome] = assinatura
+
+        globais = self.tabela_simbolos
+        self.tabela_simbolos = escopo
+        self.verificar_bloco(no)
+        self.tabela_simbolos = globais
+
+    def verificar_chamada(self, no):
+        nome = no.valor['nome']
+        argumentos = no.valor['argumentos']
+
+        if nome not in self.tabela_simbolos:
+            raise Exception(f"procedimento '{nome}' não foi declarado")
+        if not self.eh_procedimento(self.tabela_simbolos[nome]):
+            raise Exception(f"'{nome}' não é um procedimento")
+
+        tipos = self.tabela_simbolos[nome][1]
+        if len(argumentos) != len(tipos):
+            raise Exception(f"procedimento '{nome}' espera {len(tipos)} argumento(s), encontrado {len(argumentos)}")
+
+        for i, (argumento, tipo) in enumerate(zip(argumentos, tipos), 1):
+            tipo_argumento = self.inferir_tipo(argumento)
+            if not self.tipos_compativeis(tipo, tipo_argumento):
+                raise Exception(f"argumento {i} do procedimento '{nome}' deve ser {tipo}, encontrado {tipo_argumento}")
 
     def verificar_expressao_aritmetica(self, no):
         operador = no.valor.get('operador')
@@ -169,6 +248,8 @@ class AnalisadorSemantico:
 
     def inferir_tipo(self, valor):
         if hasattr(valor, 'tipo'):
+            if valor.tipo == 'Sensor':
+                return self.tipos_sensores[valor.valor['sensor']]
             return 'real' if valor.tipo == 'ExpressaoAritmetica' else 'logico'
         
         if isinstance(valor, dict):
@@ -181,6 +262,8 @@ class AnalisadorSemantico:
         
         if isinstance(valor, str):
             if valor in self.tabela_simbolos:
+                if self.eh_procedimento(self.tabela_simbolos[valor]):
+                    raise Exception(f"procedimento '{valor}' não pode ser usado como valor")
                 return self.tabela_simbolos[valor]
             elif valor.isdigit() or (valor.startswith('-') and valor[1:].isdigit()):
                 return 'inteiro'
@@ -214,6 +297,9 @@ class AnalisadorSemantico:
         except ValueError:
             return False
 
+    def eh_procedimento(self, tipo):
+        return isinstance(tipo, tuple)
+
     def eh_tipo_numerico(self, tipo):
         return tipo in ['inteiro', 'real']
 
@@ -1,7 +1,8 @@
 class NoAST:
-    def __init__(self, tipo, valor=None):
+    def __init__(self, tipo, valor=None, linha=None):
         self.tipo = tipo
         self.valor = valor
+        self.linha = linha
         self.filhos = []
 
     def adicionar_filho(self, filho):
@@ -10,10 +11,25 @@ class NoAST:
     def __repr__(self):
         return f"{self.tipo}({self.valor}) -> {self.filhos}"
 
+FECHAMENTOS = {
+    'se': 'fim_se',
+    'repita': 'fim_repita',
+    'enquanto': 'fim_enquanto',
+    'procedimento': 'fim_procedimento',
+}
+
+INICIOS_COMANDO = ['var', 'se', 'repita', 'enquanto', 'procedimento', 'usar',
+                   'avancar', 'recuar', 'girar_direita', 'girar_esquerda', 'ir_para',
+                   'levantar_caneta', 'abaixar_caneta', 'definir_cor', 'definir_espessura',
+                   'cor_de_fundo', 'limpar_tela', 'velocidade', 'circulo']
+
 class AnalisadorSintatico:
-    def __init__(self, tokens):
+    def __init__(self, tokens, recuperar=False):
         self.tokens = tokens
         self.pos = 0
+        self.recuperar = recuperar
+        self.erros = []
+        self.pendentes = []
 
     def token_atual(self):
         return self.tokens[self.pos] if self.pos < len(self.tokens) else None
@@ -33,15 +49,87 @@ class AnalisadorSintatico:
         return token
 
     def programa(self):
-        no = NoAST("Programa")
-        self.consumir('RESERVADA', 'inicio')
+        inicio = self.tentar(lambda: self.consumir('RESERVADA', 'inicio'))
+        no = NoAST("Programa", linha=inicio.linha if inicio else 1)
         
         while self.token_atual() and self.token_atual().valor != 'fim':
-            no.adicionar_filho(self.comando())
+            self.bloco(no)
         
-        self.consumir('RESERVADA', 'fim')
+        self.tentar(lambda: self.consumir('RESERVADA', 'fim'))
         return no
 
+    def bloco(self, no):
+        comando = self.comando_recuperando() if self.recuperar else self.comando()
+        if comando:
+            no.adicionar_filho(comando)
+
+    def dentro_do_bloco(self, fechamentos):
+        token = self.token_atual()
+        if not token or token.valor in fechamentos:
+            return False
+        # Na recuperação, um bloco sem fechamento termina no fim do programa
+        return not (self.recuperar and token.valor == 'fim')
+
+    def tentar(self, regra):
+        try:
+            return regra()
+        except Exception as e:
+            if not self.recuperar:
+                raise
+            self.registrar_erro(e)
+            return None
+
+    def registrar_erro(self, erro):
+        token = self.token_atual() or (self.tokens[-1] if self.tokens else None)
+        linha = token.linha if token else 1
+        if not self.erros or self.erros[-1]['mensagem'] != str(erro):
+            self.erros.append({'fase': 'sintatico', 'linha': linha, 'mensagem': str(erro)})
+
+    def comando_recuperando(self):
+        # Recuperação em modo pânico: um comando com erro é descartado até o
+        # próximo ';', início de comando ou fim de bloco
+        token = self.token_atual()
+        if self.pendentes and token.valor == self.pendentes[-1]:
+            # Fim do bloco cujo cabeçalho já foi descartado
+            self.pendentes.pop()
+            self.pos += 1
+            return None
+        if self.pendentes and self.pendentes[-1] == 'fim_se' and token.valor == 'senao':
+            self.pos += 1
+            return None
+
+        inicio = self.pos
+        try:
+            return self.comando()
+        except Exception as e:
+            self.registrar_erro(e)
+            if token.valor in FECHAMENTOS and not self.bloco_fechado(inicio):
+                self.pendentes.append(FECHAMENTOS[token.valor])
+            self.sincronizar(inicio)
+            return None
+
+    def bloco_fechado(self, inicio):
+        profundidade = 0
+        for token in self.tokens[inicio:self.pos]:
+            if token.valor in FECHAMENTOS:
+                profundidade += 1
+            elif token.valor in FECHAMENTOS.values():
+                profundidade -= 1
+        return profundidade <= 0
+
+    def sincronizar(self, inicio):
+        if self.pos == inicio:
+            self.pos += 1
+        while self.token_atual():
+            token = self.token_atual()
+            if token.valor == ';':
+                self.pos += 1
+                return
+            if (token.tipo == 'RESERVADA' and token.valor in INICIOS_COMANDO or
+                    token.valor in FECHAMENTOS.values() or token.valor in ['senao', 'fim']):
+                return
+            self.pos += 1
+
     def comando(self):
         token = self.token_atual()
         if not token:
@@ -55,7 +143,12 @@ class AnalisadorSintatico:
             return self.repeticao_repita()
         elif token.valor == 'enquanto':
             return self.repeticao_enquanto()
+        elif token.valor == 'procedimento':
+            return self.procedimento()
         elif token.tipo == 'IDENTIFICADOR':
+            proximo = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+            if proximo and proximo.valor == '(':
+                return self.chamada()
             return self.atribuicao()
         elif token.valor in ['avancar', 'recuar', 'girar_direita', 'girar_esquerda', 'ir_para']:
             return self.movimento()
@@ -65,11 +158,13 @@ class AnalisadorSintatico:
             return self.comando_tela()
         elif token.valor in ['velocidade', 'circulo']:
             return self.comando_turtle()
+        elif token.valor == 'usar':
+            return self.comando_usar()
         else:
             raise Exception(f"Erro sintático na linha {token.linha}: comando inválido '{token.valor}'")
 
     def declaracao_variavel(self):
-        self.consumir('RESERVADA', 'var')
+        inicio = self.consumir('RESERVADA', 'var')
         tipo = self.consumir('RESERVADA')
         
         ids = [self.consumir('IDENTIFICADOR').valor]
@@ -78,14 +173,14 @@ class AnalisadorSintatico:
             ids.append(self.consumir('IDENTIFICADOR').valor)
         
         self.consumir('SIMBOLO', ';')
-        return NoAST('Declaracao', {'tipo': tipo.valor, 'variaveis': ids})
+        return NoAST('Declaracao', {'tipo': tipo.valor, 'variaveis': ids}, inicio.linha)
 
     def atribuicao(self):
         ident = self.consumir('IDENTIFICADOR')
         self.consumir('OPERADOR_ATRIBUICAO', '=')
         valor = self.expressao()
         self.consumir('SIMBOLO', ';')
-        return NoAST('Atribuicao', {'ident': ident.valor, 'valor': valor})
+        return NoAST('Atribuicao', {'ident': ident.valor, 'valor': valor}, ident.linha)
 
     def movimento(self):
         comando = self.consumir('RESERVADA')
@@ -97,87 +192,132 @@ class AnalisadorSintatico:
             y = self.expressao()
             self.consumir('SIMBOLO', ')')
             self.consumir('SIMBOLO', ';')
-            return NoAST('Movimento', {'comando': comando.valor, 'x': x, 'y': y})
+            return NoAST('Movimento', {'comando': comando.valor, 'x': x, 'y': y}, comando.linha)
         
         valor = self.expressao()
         self.consumir('SIMBOLO', ';')
-        return NoAST('Movimento', {'comando': comando.valor, 'valor': valor})
+        return NoAST('Movimento', {'comando': comando.valor, 'valor': valor}, comando.linha)
 
     def comando_caneta(self):
         comando = self.consumir('RESERVADA')
         
         if comando.valor in ['levantar_caneta', 'abaixar_caneta']:
             self.consumir('SIMBOLO', ';')
-            return NoAST('ComandoCaneta', {'comando': comando.valor})
+            return NoAST('ComandoCaneta', {'comando': comando.valor}, comando.linha)
         
         valor = self.expressao()
         self.consumir('SIMBOLO', ';')
-        return NoAST('ComandoCaneta', {'comando': comando.valor, 'valor': valor})
+        return NoAST('ComandoCaneta', {'comando': comando.valor, 'valor': valor}, comando.linha)
 
     def comando_tela(self):
         comando = self.consumir('RESERVADA')
         
         if comando.valor == 'limpar_tela':
             self.consumir('SIMBOLO', ';')
-            return NoAST('ComandoTela', {'comando': comando.valor})
+            return NoAST('ComandoTela', {'comando': comando.valor}, comando.linha)
         
         valor = self.expressao()
         self.consumir('SIMBOLO', ';')
-        return NoAST('ComandoTela', {'comando': comando.valor, 'valor': valor})
+        return NoAST('ComandoTela', {'comando': comando.valor, 'valor': valor}, comando.linha)
 
     def comando_turtle(self):
         comando = self.consumir('RESERVADA')
         
         valor = self.expressao()
         self.consumir('SIMBOLO', ';')
-        return NoAST('ComandoTurtle', {'comando': comando.valor, 'valor': valor})
+        return NoAST('ComandoTurtle', {'comando': comando.valor, 'valor': valor}, comando.linha)
+
+    def comando_usar(self):
+        comando = self.consumir('RESERVADA', 'usar')
+        nome = self.consumir('IDENTIFICADOR')
+        self.consumir('SIMBOLO', ';')
+        return NoAST('Usar', {'nome': nome.valor}, comando.linha)
 
     def condicional(self):
-        self.consumir('RESERVADA', 'se')
+        inicio = self.consumir('RESERVADA', 'se')
         condicao = self.expressao()
         self.consumir('RESERVADA', 'entao')
 
-        no = NoAST('Condicional', {'condicao': condicao})
+        no = NoAST('Condicional', {'condicao': condicao}, inicio.linha)
         
-        bloco_verdadeiro = NoAST('BlocoVerdadeiro')
-        while self.token_atual() and self.token_atual().valor not in ['senao', 'fim_se']:
-            bloco_verdadeiro.adicionar_filho(self.comando())
+        bloco_verdadeiro = NoAST('BlocoVerdadeiro', linha=inicio.linha)
+        while self.dentro_do_bloco(['senao', 'fim_se']):
+            self.bloco(bloco_verdadeiro)
         no.adicionar_filho(bloco_verdadeiro)
 
         if self.token_atual() and self.token_atual().valor == 'senao':
-            self.consumir('RESERVADA', 'senao')
-            bloco_falso = NoAST('BlocoFalso')
-            while self.token_atual() and self.token_atual().valor != 'fim_se':
-                bloco_falso.adicionar_filho(self.comando())
+            senao = self.consumir('RESERVADA', 'senao')
+            bloco_falso = NoAST('BlocoFalso', linha=senao.linha)
+            while self.dentro_do_bloco(['fim_se']):
+                self.bloco(bloco_falso)
             no.adicionar_filho(bloco_falso)
 
         self.consumir('RESERVADA', 'fim_se')
         return no
 
     def repeticao_repita(self):
-        self.consumir('RESERVADA', 'repita')
+        inicio = self.consumir('RESERVADA', 'repita')
         vezes = self.expressao()
         self.consumir('RESERVADA', 'vezes')
 
-        no = NoAST('Repeticao', {'vezes': vezes})
-        while self.token_atual() and self.token_atual().valor != 'fim_repita':
-            no.adicionar_filho(self.comando())
+        no = NoAST('Repeticao', {'vezes': vezes}, inicio.linha)
+        while self.dentro_do_bloco(['fim_repita']):
+            self.bloco(no)
 
         self.consumir('RESERVADA', 'fim_repita')
         return no
     
     def repeticao_enquanto(self):
-        self.consumir('RESERVADA', 'enquanto')
+        inicio = self.consumir('RESERVADA', 'enquanto')
         condicao = self.expressao()
         self.consumir('RESERVADA', 'faca')
         
-        no = NoAST('Enquanto', {'condicao': condicao})
-        while self.token_atual() and self.token_atual().valor != 'fim_enquanto':
-            no.adicionar_filho(self.comando())
+        no = NoAST('Enquanto', {'condicao': condicao}, inicio.linha)
+        while self.dentro_do_bloco(['fim_enquanto']):
+            self.bloco(no)
         
         self.consumir('RESERVADA', 'fim_enquanto')
         return no
 
+    def procedimento(self):
+        inicio = self.consumir('RESERVADA', 'procedimento')
+        nome = self.consumir('IDENTIFICADOR')
+        self.consumir('SIMBOLO', '(')
+
+        parametros = []
+        if self.token_atual() and self.token_atual().valor != ')':
+            parametros.append(self.parametro())
+            while self.token_atual() and self.token_atual().valor == ',':
+                self.consumir('SIMBOLO', ',')
+                parametros.append(self.parametro())
+        self.consumir('SIMBOLO', ')')
+
+        no = NoAST('Procedimento', {'nome': nome.valor, 'parametros': parametros}, inicio.linha)
+        while self.dentro_do_bloco(['fim_procedimento']):
+            self.bloco(no)
+
+        self.consumir('RESERVADA', 'fim_procedimento')
+        return no
+
+    def parametro(self):
+        tipo = self.consumir('RESERVADA')
+        nome = self.consumir('IDENTIFICADOR')
+        return {'tipo': tipo.valor, 'nome': nome.valor}
+
+    def chamada(self):
+        nome = self.consumir('IDENTIFICADOR')
+        self.consumir('SIMBOLO', '(')
+
+        argumentos = []
+        if self.token_atual() and self.token_atual().valor != ')':
+            argumentos.append(self.expressao())
+            while self.token_atual() and self.token_atual().valor == ',':
+                self.consumir('SIMBOLO', ',')
+                argumentos.append(self.expressao())
+        self.consumir('SIMBOLO', ')')
+        self.consumir('SIMBOLO', ';')
+        return NoAST('Chamada', {'nome': nome.valor, 'argumentos': argumentos}, nome.linha)
+
     def expressao(self):
         return self.expressao_logica() if self.eh_expressao_logica() else self.expressao_aritmetica()
 
@@ -205,7 +345,7 @@ class AnalisadorSintatico:
                 'operador': op.valor,
                 'esquerda': esquerda,
                 'direita': direita
-            })
+            }, op.linha)
         
         return esquerda
 
@@ -216,7 +356,7 @@ class AnalisadorSintatico:
             return NoAST('ExpressaoLogica', {
                 'operador': op.valor,
                 'operando': fator
-            })
+            }, op.linha)
         
         return self.comparacao()
 
@@ -232,7 +372,7 @@ class AnalisadorSintatico:
                 'operador': op.valor,
                 'esquerda': esquerda,
                 'direita': direita
-            })
+            }, op.linha)
         
         return esquerda
 
@@ -248,7 +388,7 @@ class AnalisadorSintatico:
                 'operador': op.valor,
                 'esquerda': esquerda,
                 'direita': direita
-            })
+            }, op.linha)
         
         return esquerda
 
@@ -264,7 +404,7 @@ class AnalisadorSintatico:
                 'operador': op.valor,
                 'esquerda': esquerda,
                 'direita': direita
-            })
+            }, op.linha)
         
         return esquerda
 
@@ -280,6 +420,8 @@ class AnalisadorSintatico:
             return self.consumir(token.tipo).valor
         elif token.tipo == 'RESERVADA' and token.valor in ['verdadeiro', 'falso']:
             return self.consumir('RESERVADA').valor
+        elif token.valor in ['tocando', 'distancia_ate_linha']:
+            return self.sensor()
         elif token.valor == '(':
             self.consumir('SIMBOLO', '(')
             expr = self.expressao_aritmetica()
@@ -302,10 +444,18 @@ class AnalisadorSintatico:
             return self.consumir('IDENTIFICADOR').valor
         elif token.tipo == 'RESERVADA' and token.valor in ['verdadeiro', 'falso']:
             return self.consumir('RESERVADA').valor
+        elif token.valor == 'tocando':
+            return self.sensor()
         elif token.valor == '(':
             self.consumir('SIMBOLO', '(')
             expr = self.expressao_logica()
             self.consumir('SIMBOLO', ')')
             return expr
         else:
-            raise Exception(f"Erro sintático na linha {token.linha}: fator lógico inválido '{token.valor}'")
\ No newline at end of file
+            raise Exception(f"Erro sintático na linha {token.linha}: fator lógico inválido '{token.valor}'")
+
+    def sensor(self):
+        sensor = self.consumir('RESERVADA')
+        self.consumir('SIMBOLO', '(')
+        self.consumir('SIMBOLO', ')')
+        return NoAST('Sensor', {'sensor': sensor.valor}, sensor.linha)
\ No newline at end of file
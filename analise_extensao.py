@@ -0,0 +1,758 @@
+import argparse
+import cmath
+import math
+import os
+import sys
+
+from executor import compilar, passos_circulo
+
+LIMITE_PASSOS = 50000
+LIMITE_PERIODO = 1024
+LIMITE_ITERACOES = 4096
+LIMITE_RECURSAO = 32
+EPSILON_ANGULO = 1e-9
+
+
+class Intervalo:
+    def __init__(self, inferior, superior):
+        self.inferior = inferior
+        self.superior = superior
+
+    def __repr__(self):
+        return f"[{self.inferior}, {self.superior}]"
+
+
+class Desconhecido:
+    def __repr__(self):
+        return "?"
+
+
+DESCONHECIDO = Desconhecido()
+TUDO = Intervalo(-math.inf, math.inf)
+
+
+def eh_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def eh_exato(valor):
+    return not isinstance(valor, (Intervalo, Desconhecido))
+
+
+def como_intervalo(valor):
+    if isinstance(valor, Intervalo):
+        return valor
+    if eh_numero(valor):
+        return Intervalo(valor, valor)
+    return TUDO
+
+
+def unir_valores(a, b):
+    if eh_exato(a) and eh_exato(b) and type(a) == type(b) and a == b:
+        return a
+    if (eh_numero(a) or isinstance(a, Intervalo)) and (eh_numero(b) or isinstance(b, Intervalo)):
+        a, b = como_intervalo(a), como_intervalo(b)
+        return Intervalo(min(a.inferior, b.inferior), max(a.superior, b.superior))
+    return DESCONHECIDO
+
+
+def faixa_produto(a, b):
+    # 0 * inf aparece com intervalos abertos e vale 0 aqui
+    produtos = [0.0 if x == 0 or y == 0 else x * y for x in (a.inferior, a.superior) for y in (b.inferior, b.superior)]
+    return Intervalo(min(produtos), max(produtos))
+
+
+def faixa_trigonometrica(direcao, fase):
+    # Menor e maior valor de cos(direcao - fase) para direcao no intervalo
+    direcao = como_intervalo(direcao)
+    inicio, fim = direcao.inferior - fase, direcao.superior - fase
+    if fim - inicio >= 360 or math.isinf(inicio) or math.isinf(fim):
+        return Intervalo(-1.0, 1.0)
+
+    valores = [math.cos(math.radians(inicio)), math.cos(math.radians(fim))]
+    k = math.ceil(inicio / 180.0)
+    while k * 180.0 <= fim:
+        valores.append(1.0 if k % 2 == 0 else -1.0)
+        k += 1
+    return Intervalo(min(valores), max(valores))
+
+
+def somar_circulos(circulos, outros, vezes=1):
+    for raio, quantidade in outros.items():
+        circulos[raio] = circulos.get(raio, 0) + vezes * quantidade
+
+
+class Extensao:
+    def __init__(self, caixa, segmentos, espessura_maxima, retos=0, circulos=None):
+        self.caixa = caixa
+        self.segmentos = segmentos
+        self.espessura_maxima = espessura_maxima
+        self.retos = retos
+        self.circulos = circulos or {}
+        self.limitada = caixa is None or all(not math.isinf(v) for v in caixa)
+
+    def contar_segmentos(self, passos):
+        # Limite de segmentos com outra contagem de lados por círculo, sem
+        # refazer a análise: a caixa não depende do número de lados
+        if math.isinf(self.retos):
+            return math.inf
+        return self.retos + sum(quantidade * passos(raio) for raio, quantidade in self.circulos.items())
+
+    def janela(self, largura, altura, margem=0.05):
+        # Janela com a mesma proporção da imagem que contém todo o desenho
+        if not self.limitada:
+            return None
+        if self.caixa is None:
+            return (-largura / 2, -altura / 2, largura / 2, altura / 2)
+
+        xmin, ymin, xmax, ymax = self.caixa
+        folga = self.espessura_maxima / 2.0 + margem * max(xmax - xmin, ymax - ymin, 1.0)
+        xmin, ymin, xmax, ymax = xmin - folga, ymin - folga, xmax + folga, ymax + folga
+
+        cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+        escala = max((xmax - xmin) / largura, (ymax - ymin) / altura)
+        return (cx - largura * escala / 2, cy - altura * escala / 2,
+                cx + largura * escala / 2, cy + altura * escala / 2)
+
+    def __repr__(self):
+        return f"Extensao(caixa={self.caixa}, segmentos={self.segmentos}, espessura_maxima={self.espessura_maxima})"
+
+
+class EstadoAbstrato:
+    def __init__(self):
+        self.variaveis = {}
+        self.locais = None
+        self.x = 0.0
+        self.y = 0.0
+        self.direcao = 0.0
+        self.caneta = True
+        self.tartaruga_atual = ''
+        self.tartarugas = {}
+        self.caixa = None
+        self.segmentos = 0
+        # Os mesmos segmentos separados em retos e círculos por raio; um
+        # limite que vale para qualquer número de lados por círculo
+        self.retos = 0
+        self.circulos = {}
+        self.espessura_maxima = 1.0
+
+    def copiar(self):
+        copia = EstadoAbstrato()
+        copia.__dict__.update(self.__dict__)
+        copia.circulos = dict(self.circulos)
+        copia.variaveis = dict(self.variaveis)
+        copia.locais = dict(self.locais) if self.locais is not None else None
+        copia.tartarugas = dict(self.tartarugas)
+        copia.caixa = list(self.caixa) if self.caixa else None
+        return copia
+
+    def unir(self, outro):
+        for nome in set(self.variaveis) | set(outro.variaveis):
+            self.variaveis[nome] = unir_valores(self.variaveis.get(nome, DESCONHECIDO),
+                                                outro.variaveis.get(nome, DESCONHECIDO))
+        if self.locais is not None and outro.locais is not None:
+            for nome in set(self.locais) | set(outro.locais):
+                self.locais[nome] = unir_valores(self.locais.get(nome, DESCONHECIDO),
+                                                 outro.locais.get(nome, DESCONHECIDO))
+
+        self.x = unir_valores(self.x, outro.x)
+        self.y = unir_valores(self.y, outro.y)
+        self.direcao = unir_valores(self.direcao, outro.direcao)
+        self.caneta = self.caneta if self.caneta == outro.caneta else None
+        if self.tartaruga_atual != outro.tartaruga_atual:
+            self.tartaruga_atual = DESCONHECIDO
+        for nome in set(self.tartarugas) | set(outro.tartarugas):
+            a, b = self.tartarugas.get(nome), outro.tartarugas.get(nome)
+            if a is None or b is None:
+                self.tartarugas[nome] = a or b
+            else:
+                self.tartarugas[nome] = (unir_valores(a[0], b[0]), unir_valores(a[1], b[1]),
+                                         unir_valores(a[2], b[2]), a[3] if a[3] == b[3] else None)
+        self.incluir_caixa(outro.caixa)
+        self.segmentos = max(self.segmentos, outro.segmentos)
+        self.retos = max(self.retos, outro.retos)
+        for raio, quantidade in outro.circulos.items():
+            self.circulos[raio] = max(self.circulos.get(raio, 0), quantidade)
+        self.espessura_maxima = max(self.espessura_maxima, outro.espessura_maxima)
+
+    def incluir_caixa(self, caixa):
+        if caixa is None:
+            return
+        if self.caixa is None:
+            self.caixa = list(caixa)
+        else:
+            self.caixa = [min(self.caixa[0], caixa[0]), min(self.caixa[1], caixa[1]),
+                          max(self.caixa[2], caixa[2]), max(self.caixa[3], caixa[3])]
+
+    def pose_exata(self):
+        return eh_numero(self.x) and eh_numero(self.y) and eh_numero(self.direcao)
+
+
+class AnalisadorExtensao:
+    def __init__(self, passos=None):
+        self.passos_circulo = passos or passos_circulo
+        self.procedimentos = {}
+        self.passos = 0
+        self.recursao = 0
+        self.contador_tartarugas = 0
+
+    def analisar(self, ast):
+        estado = EstadoAbstrato()
+        self.executar_comandos(estado, ast.filhos)
+        caixa = tuple(estado.caixa) if estado.caixa else None
+        return Extensao(caixa, estado.segmentos, estado.espessura_maxima, estado.retos, estado.circulos)
+
+    def executar_comandos(self, estado, comandos):
+        for comando in comandos:
+            self.executar_comando(estado, comando)
+
+    def executar_comando(self, estado, comando):
+        self.passos += 1
+
+        if comando.tipo == 'Declaracao':
+            self.executar_declaracao(estado, comando)
+        elif comando.tipo == 'Atribuicao':
+            self.atribuir(estado, comando.valor['ident'], self.avaliar(estado, comando.valor['valor']))
+        elif comando.tipo == 'Movimento':
+            self.executar_movimento(estado, comando)
+        elif comando.tipo == 'ComandoCaneta':
+            self.executar_comando_caneta(estado, comando)
+        elif comando.tipo == 'ComandoTurtle' and comando.valor['comando'] == 'circulo':
+            self.desenhar_circulo(estado, self.avaliar(estado, comando.valor['valor']))
+        elif comando.tipo == 'Condicional':
+            self.executar_condicional(estado, comando)
+        elif comando.tipo == 'Repeticao':
+            self.executar_repeticao(estado, comando)
+        elif comando.tipo == 'Enquanto':
+            self.executar_enquanto(estado, comando)
+        elif comando.tipo == 'Procedimento':
+            self.procedimentos[comando.valor['nome']] = comando
+        elif comando.tipo == 'Chamada':
+            self.executar_chamada(estado, comando)
+        elif comando.tipo == 'Usar':
+            self.selecionar_tartaruga(estado, self.avaliar(estado, comando.valor['nome']))
+        elif comando.tipo not in ['ComandoTurtle', 'ComandoTela']:
+            self.executar_comandos(estado, comando.filhos)
+
+    def executar_declaracao(self, estado, comando):
+        iniciais = {'inteiro': 0, 'real': 0.0, 'texto': '', 'logico': False}
+        escopo = estado.variaveis if estado.locais is None else estado.locais
+        for var in comando.valor['variaveis']:
+            if comando.valor['tipo'] == 'tartaruga':
+                self.contador_tartarugas += 1
+                escopo[var] = f"{var}#{self.contador_tartarugas}"
+                estado.tartarugas[escopo[var]] = (0.0, 0.0, 0.0, True)
+            else:
+                escopo[var] = iniciais.get(comando.valor['tipo'])
+
+    def atribuir(self, estado, nome, valor):
+        if estado.locais is not None and nome in estado.locais:
+            estado.locais[nome] = valor
+        else:
+            estado.variaveis[nome] = valor
+
+    def selecionar_tartaruga(self, estado, nome):
+        if nome == estado.tartaruga_atual and nome is not DESCONHECIDO:
+            return
+        if estado.tartaruga_atual is not DESCONHECIDO:
+            estado.tartarugas[estado.tartaruga_atual] = (estado.x, estado.y, estado.direcao, estado.caneta)
+
+        if nome is DESCONHECIDO or estado.tartaruga_atual is DESCONHECIDO:
+            estado.tartaruga_atual = DESCONHECIDO
+            estado.x, estado.y, estado.direcao, estado.caneta = TUDO, TUDO, Intervalo(0.0, 360.0), None
+        else:
+            estado.tartaruga_atual = nome
+            estado.x, estado.y, estado.direcao, estado.caneta = estado.tartarugas.get(nome, (0.0, 0.0, 0.0, True))
+
+    def executar_movimento(self, estado, comando):
+        cmd = comando.valor['comando']
+
+        if cmd == 'ir_para':
+            x = self.avaliar(estado, comando.valor['x'])
+            y = self.avaliar(estado, comando.valor['y'])
+            self.mover_para(estado, self.numero(x), self.numero(y))
+            return
+
+        valor = self.numero(self.avaliar(estado, comando.valor['valor']))
+        if cmd == 'avancar':
+            self.deslocar(estado, valor)
+        elif cmd == 'recuar':
+            self.deslocar(estado, -valor if eh_numero(valor) else Intervalo(-valor.superior, -valor.inferior))
+        elif cmd in ['girar_direita', 'girar_esquerda']:
+            sinal = -1 if cmd == 'girar_direita' else 1
+            if eh_numero(estado.direcao) and eh_numero(valor):
+                estado.direcao = (estado.direcao + sinal * valor) % 360.0
+            else:
+                direcao, valor = como_intervalo(estado.direcao), como_intervalo(valor)
+                if sinal < 0:
+                    valor = Intervalo(-valor.superior, -valor.inferior)
+                inicio, fim = direcao.inferior + valor.inferior, direcao.superior + valor.superior
+                estado.direcao = Intervalo(0.0, 360.0) if fim - inicio >= 360 else Intervalo(inicio, fim)
+
+    def deslocar(self, estado, distancia):
+        if estado.pose_exata() and eh_numero(distancia):
+            angulo = math.radians(estado.direcao)
+            self.mover_para(estado, estado.x + distancia * math.cos(angulo), estado.y + distancia * math.sin(angulo))
+            return
+
+        dx = faixa_produto(como_intervalo(distancia), faixa_trigonometrica(estado.direcao, 0.0))
+        dy = faixa_produto(como_intervalo(distancia), faixa_trigonometrica(estado.direcao, 90.0))
+        x, y = como_intervalo(estado.x), como_intervalo(estado.y)
+        self.mover_para(estado, Intervalo(x.inferior + dx.inferior, x.superior + dx.superior),
+                        Intervalo(y.inferior + dy.inferior, y.superior + dy.superior))
+
+    def mover_para(self, estado, x, y):
+        if estado.caneta is not False:
+            x0, y0, x1, y1 = (como_intervalo(v) for v in (estado.x, estado.y, x, y))
+            estado.incluir_caixa((min(x0.inferior, x1.inferior), min(y0.inferior, y1.inferior),
+                                  max(x0.superior, x1.superior), max(y0.superior, y1.superior)))
+            estado.segmentos += 1
+            estado.retos += 1
+        estado.x, estado.y = x, y
+
+    def desenhar_circulo(self, estado, raio):
+        if estado.caneta is False:
+            return
+        raio = self.numero(raio)
+
+        if estado.pose_exata() and eh_numero(raio):
+            angulo = math.radians(estado.direcao + 90)
+            cx, cy = estado.x + raio * math.cos(angulo), estado.y + raio * math.sin(angulo)
+            r = abs(raio)
+            estado.incluir_caixa((cx - r, cy - r, cx + r, cy + r))
+        else:
+            raio = como_intervalo(raio)
+            r = max(abs(raio.inferior), abs(raio.superior))
+            dx = faixa_produto(raio, faixa_trigonometrica(estado.direcao, -90.0))
+            dy = faixa_produto(raio, faixa_trigonometrica(estado.direcao, 0.0))
+            x, y = como_intervalo(estado.x), como_intervalo(estado.y)
+            estado.incluir_caixa((x.inferior + dx.inferior - r, y.inferior + dy.inferior - r,
+                                  x.superior + dx.superior + r, y.superior + dy.superior + r))
+        estado.segmentos += self.passos_circulo(r)
+        somar_circulos(estado.circulos, {r: 1})
+
+    def executar_comando_caneta(self, estado, comando):
+        cmd = comando.valor['comando']
+
+        if cmd == 'levantar_caneta':
+            estado.caneta = False
+        elif cmd == 'abaixar_caneta':
+            estado.caneta = True
+        elif cmd == 'definir_espessura':
+            espessura = como_intervalo(self.avaliar(estado, comando.valor['valor']))
+            estado.espessura_maxima = max(estado.espessura_maxima, espessura.superior)
+
+    def executar_condicional(self, estado, comando):
+        condicao = self.avaliar(estado, comando.valor['condicao'])
+        blocos = {filho.tipo: filho for filho in comando.filhos}
+
+        if condicao is DESCONHECIDO:
+            senao = estado.copiar()
+            self.executar_comandos(estado, blocos['BlocoVerdadeiro'].filhos if 'BlocoVerdadeiro' in blocos else [])
+            self.executar_comandos(senao, blocos['BlocoFalso'].filhos if 'BlocoFalso' in blocos else [])
+            estado.unir(senao)
+        else:
+            bloco = blocos.get('BlocoVerdadeiro' if condicao else 'BlocoFalso')
+            if bloco:
+                self.executar_comandos(estado, bloco.filhos)
+
+    def executar_repeticao(self, estado, comando):
+        vezes = self.avaliar(estado, comando.valor['vezes'])
+        if not eh_numero(vezes):
+            self.abstrair_laco(estado, comando.filhos, None)
+            return
+
+        vezes = int(vezes)
+        if vezes <= 0:
+            return
+        carregadas = self.variaveis_carregadas(comando.filhos)
+        if carregadas == set() and self.repetir_analiticamente(estado, comando.filhos, vezes, carregadas):
+            return
+
+        for feitas in range(vezes):
+            if self.passos > LIMITE_PASSOS:
+                # O que sobrou do laço só pode ser composto se as variáveis
+                # que mudam a cada volta não alteram o caminho desenhado
+                restantes = vezes - feitas
+                if carregadas is None or not self.repetir_analiticamente(estado, comando.filhos, restantes, carregadas):
+                    self.abstrair_laco(estado, comando.filhos, restantes)
+                return
+            # Cada volta conta como um passo, mesmo com o corpo vazio
+            self.passos += 1
+            self.executar_comandos(estado, comando.filhos)
+
+    def executar_enquanto(self, estado, comando):
+        while True:
+            condicao = self.avaliar(estado, comando.valor['condicao'])
+            if condicao is DESCONHECIDO or self.passos > LIMITE_PASSOS:
+                self.abstrair_laco(estado, comando.filhos, None)
+                return
+            if not condicao:
+                return
+            self.passos += 1
+            self.executar_comandos(estado, comando.filhos)
+
+    def executar_chamada(self, estado, comando):
+        procedimento = self.procedimentos.get(comando.valor['nome'])
+        argumentos = [self.avaliar(estado, a) for a in comando.valor['argumentos']]
+
+        if procedimento is None or self.recursao >= LIMITE_RECURSAO:
+            self.abstrair_tudo(estado)
+            return
+
+        locais = estado.locais
+        estado.locais = {p['nome']: v for p, v in zip(procedimento.valor['parametros'], argumentos)}
+        self.recursao += 1
+        self.executar_comandos(estado, procedimento.filhos)
+        self.recursao -= 1
+        estado.locais = locais
+
+    def repetir_analiticamente(self, estado, corpo, vezes, carregadas):
+        # Se cada volta do laço faz exatamente o mesmo caminho relativo, o
+        # laço inteiro é uma sequência de movimentos rígidos: basta analisar
+        # o corpo uma vez e compor o resultado
+        if vezes < 2 or not estado.pose_exata():
+            return False
+
+        local = estado.copiar()
+        local.x, local.y, local.direcao = 0.0, 0.0, 0.0
+        local.caixa, local.segmentos, local.retos, local.circulos = None, 0, 0, {}
+        for nome in carregadas:
+            self.atribuir(local, nome, DESCONHECIDO)
+        self.executar_comandos(local, corpo)
+        if not local.pose_exata() or local.caneta != estado.caneta:
+            return False
+
+        x0, y0, h0 = estado.x, estado.y, estado.direcao
+        theta = local.direcao
+        passo = complex(local.x, local.y)
+        giro = cmath.exp(1j * math.radians(theta))
+        inicio = cmath.exp(1j * math.radians(h0))
+        origem = complex(x0, y0)
+
+        def pose(k):
+            if translacao:
+                return origem + k * inicio * passo, inicio
+            return centro + giro ** k * (origem - centro), inicio * giro ** k
+
+        def caixa_transformada(k):
+            posicao, rotacao = pose(k)
+            xmin, ymin, xmax, ymax = local.caixa
+            cantos = [posicao + rotacao * complex(x, y) for x in (xmin, xmax) for y in (ymin, ymax)]
+            return (min(c.real for c in cantos), min(c.imag for c in cantos),
+                    max(c.real for c in cantos), max(c.imag for c in cantos))
+
+        resto = theta % 360.0
+        translacao = min(resto, 360.0 - resto) < EPSILON_ANGULO
+        if not translacao:
+            centro = origem + inicio * passo / (1 - giro)
+
+        if local.caixa is not None:
+            if translacao:
+                estado.incluir_caixa(caixa_transformada(0))
+                estado.incluir_caixa(caixa_transformada(vezes - 1))
+            else:
+                xmin, ymin, xmax, ymax = caixa_transformada(0)
+                raio = max(abs(complex(x, y) - centro) for x in (xmin, xmax) for y in (ymin, ymax))
+                disco = (centro.real - raio, centro.imag - raio, centro.real + raio, centro.imag + raio)
+                periodo = self.periodo(theta, min(vezes, LIMITE_PERIODO))
+                voltas = min(vezes, periodo) if periodo else vezes
+                if voltas <= LIMITE_ITERACOES:
+                    folga = 0.0
+                    if periodo and periodo < vezes:
+                        # O período é aproximado: cada volta completa gira mais
+                        # 'sobra' graus, e o desvio acumulado afasta as caixas
+                        # repetidas até raio * deriva das primeiras
+                        sobra = (periodo * theta) % 360.0
+                        deriva = math.radians((vezes - 1) // periodo * min(sobra, 360.0 - sobra))
+                        folga = raio * deriva
+                    caixas = [caixa_transformada(k) for k in range(voltas)]
+                    estado.incluir_caixa((max(min(c[0] for c in caixas) - folga, disco[0]),
+                                          max(min(c[1] for c in caixas) - folga, disco[1]),
+                                          min(max(c[2] for c in caixas) + folga, disco[2]),
+                                          min(max(c[3] for c in caixas) + folga, disco[3])))
+                else:
+                    estado.incluir_caixa(disco)
+
+        final, _ = pose(vezes)
+        estado.x, estado.y = final.real, final.imag
+        estado.direcao = (h0 + vezes * theta) % 360.0
+        estado.segmentos += vezes * local.segmentos
+        estado.retos += vezes * local.retos
+        somar_circulos(estado.circulos, local.circulos, vezes)
+        estado.espessura_maxima = max(estado.espessura_maxima, local.espessura_maxima)
+        estado.variaveis, estado.locais = local.variaveis, local.locais
+        for nome in carregadas:
+            self.atribuir(estado, nome, DESCONHECIDO)
+        return True
+
+    def periodo(self, theta, limite):
+        for q in range(1, limite + 1):
+            resto = (q * theta) % 360.0
+            if min(resto, 360.0 - resto) < 1e-6 * q:
+                return q
+        return None
+
+    def variaveis_carregadas(self, corpo):
+        # Variáveis que uma volta do laço lê e altera para a próxima, ou None
+        # se o corpo depende da posição absoluta da tartaruga
+        lidas, atribuidas = set(), set()
+        if not self.coletar_uso(corpo, lidas, atribuidas, set(), set()):
+            return None
+        return lidas & atribuidas
+
+    def coletar_uso(self, comandos, lidas, atribuidas, declaradas, visitados):
+        # Variáveis lidas e atribuídas pelos comandos, sem contar as declaradas
+        # dentro deles. Devolve False se o caminho depende da posição absoluta.
+        for comando in comandos:
+            if comando.tipo == 'Usar':
+                return False
+            if comando.tipo == 'Movimento' and comando.valor['comando'] == 'ir_para':
+                return False
+
+            if comando.tipo == 'Declaracao':
+                declaradas.update(comando.valor['variaveis'])
+            elif comando.tipo == 'Atribuicao' and comando.valor['ident'] not in declaradas:
+                atribuidas.add(comando.valor['ident'])
+            elif comando.tipo == 'Chamada':
+                if not all(self.coletar_leituras(a, lidas, declaradas) for a in comando.valor['argumentos']):
+                    return False
+                if not self.coletar_uso_procedimento(comando.valor['nome'], lidas, atribuidas, visitados):
+                    return False
+            elif comando.tipo == 'Procedimento':
+                continue
+
+            for chave in ['condicao', 'vezes', 'valor', 'x', 'y']:
+                if chave in (comando.valor or {}) and comando.tipo != 'Chamada':
+                    if not self.coletar_leituras(comando.valor[chave], lidas, declaradas):
+                        return False
+
+            if not self.coletar_uso(comando.filhos, lidas, atribuidas, declaradas, visitados):
+                return False
+        return True
+
+    def coletar_uso_procedimento(self, nome, lidas, atribuidas, visitados):
+        procedimento = self.procedimentos.get(nome)
+        if procedimento is None:
+            return False
+        if nome in visitados:
+            return True
+
+        visitados.add(nome)
+        parametros = set(p['nome'] for p in procedimento.valor['parametros'])
+        return self.coletar_uso(procedimento.filhos, lidas, atribuidas, parametros, visitados)
+
+    def coletar_leituras(self, expr, lidas, declaradas):
+        if isinstance(expr, str):
+            nome = expr.lstrip('+-')
+            if (nome[:1].isalpha() or nome[:1] == '_') and nome.lower() not in ['verdadeiro', 'falso']:
+                if nome not in declaradas:
+                    lidas.add(nome)
+            return True
+        if expr.tipo == 'Sensor':
+            return False
+        return all(self.coletar_leituras(v, lidas, declaradas) for k, v in expr.valor.items() if k != 'operador')
+
+    def abstrair_laco(self, estado, corpo, vezes):
+        # Sem como desenrolar o laço: tudo o que o corpo altera passa a ser
+        # desconhecido e o corpo é analisado uma vez a partir desse estado
+        lidas, atribuidas = set(), set()
+        if not self.coletar_uso(corpo, lidas, atribuidas, set(), set()):
+            self.abstrair_tudo(estado)
+        else:
+            for nome in atribuidas:
+                self.atribuir(estado, nome, DESCONHECIDO)
+            if self.contem(corpo, ['Movimento', 'ComandoTurtle', 'Chamada']):
+                estado.x, estado.y, estado.direcao = TUDO, TUDO, Intervalo(0.0, 360.0)
+            if self.contem(corpo, ['ComandoCaneta', 'Chamada']):
+                estado.caneta = None
+
+        antes, retos, circulos = estado.segmentos, estado.retos, dict(estado.circulos)
+        depois = estado.copiar()
+        depois.segmentos, depois.retos, depois.circulos = 0, 0, {}
+        self.executar_comandos(depois, corpo)
+        estado.unir(depois)
+
+        estado.segmentos, estado.retos, estado.circulos = antes, retos, circulos
+        if depois.segmentos == 0:
+            return
+        if vezes is None:
+            estado.segmentos = estado.retos = math.inf
+        else:
+            estado.segmentos += vezes * depois.segmentos
+            estado.retos += vezes * depois.retos
+            somar_circulos(estado.circulos, depois.circulos, vezes)
+
+    def abstrair_tudo(self, estado):
+        for nome in estado.variaveis:
+            if not isinstance(estado.variaveis[nome], str) or '#' not in estado.variaveis[nome]:
+                estado.variaveis[nome] = DESCONHECIDO
+        if estado.locais is not None:
+            for nome in estado.locais:
+                estado.locais[nome] = DESCONHECIDO
+        estado.x, estado.y, estado.direcao, estado.caneta = TUDO, TUDO, Intervalo(0.0, 360.0), None
+        estado.tartarugas = {nome: (TUDO, TUDO, Intervalo(0.0, 360.0), None) for nome in estado.tartarugas}
+        estado.incluir_caixa((-math.inf, -math.inf, math.inf, math.inf))
+        estado.segmentos = estado.retos = math.inf
+        estado.espessura_maxima = math.inf
+
+    def contem(self, comandos, tipos):
+        return any(c.tipo in tipos or self.contem(c.filhos, tipos) for c in comandos)
+
+    def numero(self, valor):
+        return valor if eh_numero(valor) or isinstance(valor, Intervalo) else TUDO
+
+    def avaliar(self, estado, expr):
+        if isinstance(expr, str):
+            if expr[:1] in ['"', "'"]:
+                return expr[1:-1]
+            elif expr.lower() in ['verdadeiro', 'falso']:
+                return expr.lower() == 'verdadeiro'
+            elif expr[:1] in ['+', '-']:
+                valor = self.avaliar(estado, expr[1:])
+                if expr[0] == '+':
+                    return valor
+                if eh_numero(valor):
+                    return -valor
+                valor = como_intervalo(valor)
+                return Intervalo(-valor.superior, -valor.inferior)
+            elif expr[:1].isdigit():
+                return float(expr) if '.' in expr else int(expr)
+            if estado.locais is not None and expr in estado.locais:
+                return estado.locais[expr]
+            return estado.variaveis.get(expr, DESCONHECIDO)
+
+        if expr.tipo == 'ExpressaoAritmetica':
+            return self.avaliar_aritmetica(estado, expr.valor)
+        elif expr.tipo == 'ExpressaoLogica':
+            return self.avaliar_logica(estado, expr.valor)
+        elif expr.tipo == 'Sensor':
+            return DESCONHECIDO if expr.valor['sensor'] == 'tocando' else Intervalo(0.0, math.inf)
+        return DESCONHECIDO
+
+    def avaliar_aritmetica(self, estado, expr_info):
+        op = expr_info['operador']
+        esq = self.avaliar(estado, expr_info['esquerda'])
+        dir = self.avaliar(estado, expr_info['direita'])
+
+        if eh_exato(esq) and eh_exato(dir):
+            try:
+                if op == '+':
+                    return esq + dir
+                elif op == '-':
+                    return esq - dir
+                elif op == '*':
+                    return esq * dir
+                elif op == '/':
+                    return esq / dir
+                elif op == '%':
+                    return esq % dir
+            except (ZeroDivisionError, TypeError):
+                return TUDO
+
+        a, b = como_intervalo(esq), como_intervalo(dir)
+        if op == '+':
+            return Intervalo(a.inferior + b.inferior, a.superior + b.superior)
+        elif op == '-':
+            return Intervalo(a.inferior - b.superior, a.superior - b.inferior)
+        elif op == '*':
+            return faixa_produto(a, b)
+        elif op == '/':
+            if b.inferior <= 0 <= b.superior:
+                return TUDO
+            return faixa_produto(a, Intervalo(1 / b.superior, 1 / b.inferior))
+        elif op == '%':
+            if b.inferior > 0:
+                return Intervalo(0, b.superior)
+            return TUDO
+        return TUDO
+
+    def avaliar_logica(self, estado, expr_info):
+        op = expr_info['operador']
+
+        if op == '!':
+            valor = self.avaliar(estado, expr_info['operando'])
+            return DESCONHECIDO if valor is DESCONHECIDO else not valor
+        elif op in ['&&', '||']:
+            esq = self.avaliar(estado, expr_info['esquerda'])
+            if esq is not DESCONHECIDO and bool(esq) == (op == '||'):
+                return esq
+            dir = self.avaliar(estado, expr_info['direita'])
+            if esq is DESCONHECIDO:
+                if dir is not DESCONHECIDO and bool(dir) == (op == '||'):
+                    return dir
+                return DESCONHECIDO
+            return dir
+
+        esq = self.avaliar(estado, expr_info['esquerda'])
+        dir = self.avaliar(estado, expr_info['direita'])
+
+        if eh_exato(esq) and eh_exato(dir):
+            if op == '==':
+                return esq == dir
+            elif op == '!=':
+                return esq != dir
+            elif op == '<':
+                return esq < dir
+            elif op == '>':
+                return esq > dir
+            elif op == '<=':
+                return esq <= dir
+            elif op == '>=':
+                return esq >= dir
+
+        if esq is DESCONHECIDO or dir is DESCONHECIDO or isinstance(esq, str) or isinstance(dir, str):
+            return DESCONHECIDO
+
+        a, b = como_intervalo(esq), como_intervalo(dir)
+        if op in ['<', '>']:
+            a, b = (a, b) if op == '<' else (b, a)
+            if a.superior < b.inferior:
+                return True
+            if a.inferior >= b.superior:
+                return False
+        elif op in ['<=', '>=']:
+            a, b = (a, b) if op == '<=' else (b, a)
+            if a.superior <= b.inferior:
+                return True
+            if a.inferior > b.superior:
+                return False
+        elif op in ['==', '!=']:
+            if a.superior < b.inferior or b.superior < a.inferior:
+                return op == '!='
+        return DESCONHECIDO
+
+
+def analisar_extensao(ast, passos=None):
+    return AnalisadorExtensao(passos).analisar(ast)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estima a área desenhada por um programa TurtleScript sem executá-lo")
+    parser.add_argument('entrada', help="arquivo TurtleScript de entrada")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.entrada):
+        print(f"Erro: Arquivo '{args.entrada}' não encontrado!")
+        sys.exit(1)
+
+    try:
+        with open(args.entrada, "r", encoding="utf-8") as f:
+            extensao = analisar_extensao(compilar(f.read()))
+    except Exception as e:
+        print(f"Erro durante a análise: {e}")
+        sys.exit(1)
+
+    if extensao.caixa is None:
+        print("O programa não desenha nada")
+    elif not extensao.limitada:
+        print("Não foi possível limitar a área desenhada")
+    else:
+        xmin, ymin, xmax, ymax = extensao.caixa
+        print(f"Área desenhada: x de {xmin:.2f} a {xmax:.2f}, y de {ymin:.2f} a {ymax:.2f}")
+    print(f"Segmentos (limite superior): {extensao.segmentos}")
+    print(f"Espessura máxima: {extensao.espessura_maxima}")
+
+
+if __name__ == "__main__":
+    main()
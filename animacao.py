@@ -0,0 +1,311 @@
+import argparse
+import math
+import os
+import re
+import shutil
+import struct
+import sys
+import zlib
+
+from analise_extensao import analisar_extensao
+from executor import compilar, executar
+from rasterizador import BRANCO, EscritorPNG, Ladrilho, RasterizadorLadrilhos, cor_rgb
+
+# O turtle do Tk redesenha a tela a cada 10 ms enquanto a tartaruga anda
+INTERVALO_ATUALIZACAO = 0.01
+VELOCIDADE_PADRAO = 3
+
+
+def passo_velocidade(velocidade):
+    # Distância percorrida por atualização de tela, como em turtle._goto;
+    # 0 significa sem animação
+    if velocidade > 10 or velocidade < 0.5:
+        return 0.0
+    velocidade = int(round(velocidade))
+    return 3.0 * 1.1 ** velocidade * velocidade
+
+
+class Quadro(Ladrilho):
+    # Imagem inteira que persiste entre os quadros; cada quadro só pinta o
+    # que é novo e anota o retângulo alterado
+    def __init__(self, largura, altura, fundo):
+        super().__init__(0, 0, largura, altura, fundo)
+        self.fundo = fundo
+        self.pintados = bytearray(largura * altura)
+        self.sujo = None
+
+    def pintar(self, y, xa, xb, cor):
+        super().pintar(y, xa, xb, cor)
+        inicio = y * self.largura + xa
+        self.pintados[inicio:inicio + xb - xa + 1] = b'\x01' * (xb - xa + 1)
+        self.marcar(xa, y, xb, y)
+
+    def marcar(self, x0, y0, x1, y1):
+        if self.sujo is None:
+            self.sujo = [x0, y0, x1, y1]
+        else:
+            sujo = self.sujo
+            sujo[0] = min(sujo[0], x0)
+            sujo[1] = min(sujo[1], y0)
+            sujo[2] = max(sujo[2], x1)
+            sujo[3] = max(sujo[3], y1)
+
+    def limpar(self):
+        self.pixels[:] = bytes(self.fundo) * (self.largura * self.altura)
+        self.pintados[:] = bytes(self.largura * self.altura)
+        self.marcar(0, 0, self.largura - 1, self.altura - 1)
+
+    def trocar_fundo(self, fundo):
+        if fundo == self.fundo:
+            return
+        # Só os pixels que nenhum traço cobriu mudam de cor
+        cor = bytes(fundo)
+        for y in range(self.altura):
+            linha = y * self.largura
+            for trecho in re.finditer(b'\x00+', self.pintados[linha:linha + self.largura]):
+                inicio, fim = (linha + trecho.start()) * 3, (linha + trecho.end()) * 3
+                self.pixels[inicio:fim] = cor * (trecho.end() - trecho.start())
+        self.fundo = fundo
+        self.marcar(0, 0, self.largura - 1, self.altura - 1)
+
+    def retirar_sujo(self):
+        sujo, self.sujo = self.sujo, None
+        return sujo
+
+    def linhas(self, x0, y0, x1, y1):
+        for y in range(y0, y1 + 1):
+            inicio = (y * self.largura + x0) * 3
+            yield self.pixels[inicio:(y * self.largura + x1 + 1) * 3]
+
+
+class EscritorAPNG(EscritorPNG):
+    # PNG animado: o primeiro quadro é a imagem inteira e os seguintes só o
+    # retângulo alterado, pintado por cima do anterior
+    def __init__(self, arquivo, largura, altura, fps):
+        super().__init__(arquivo, largura, altura)
+        self.fps = fps
+        self.sequencia = 0
+        self.quadros = 0
+        self.pendente = None
+
+        # O número de quadros só é conhecido no fim; o acTL é reescrito lá
+        self.posicao_actl = self.arquivo.tell()
+        self.escrever_bloco(b'acTL', struct.pack('>II', 0, 0))
+
+    def quadro(self, quadro, sujo):
+        if self.pendente and sujo is None:
+            # Nada mudou: o quadro anterior fica mais tempo na tela
+            self.pendente[1] += 1
+            return
+
+        if self.pendente is None:
+            sujo = (0, 0, self.largura - 1, self.altura - 1)
+        self.escrever_pendente()
+
+        compressor = zlib.compressobj(6)
+        dados = bytearray()
+        for linha in quadro.linhas(*sujo):
+            dados += compressor.compress(b'\x00' + bytes(linha))
+        dados += compressor.flush()
+        self.pendente = [sujo, 1, bytes(dados)]
+
+    def escrever_pendente(self):
+        if self.pendente is None:
+            return
+
+        (x0, y0, x1, y1), atraso, dados = self.pendente
+        self.escrever_bloco(b'fcTL', struct.pack('>IIIIIHHBB', self.sequencia, x1 - x0 + 1, y1 - y0 + 1,
+                                                 x0, y0, min(atraso, 0xFFFF), self.fps, 0, 0))
+        self.sequencia += 1
+
+        for inicio in range(0, max(len(dados), 1), self.tamanho_bloco):
+            bloco = dados[inicio:inicio + self.tamanho_bloco]
+            if self.quadros == 0:
+                self.escrever_bloco(b'IDAT', bloco)
+            else:
+                self.escrever_bloco(b'fdAT', struct.pack('>I', self.sequencia) + bloco)
+                self.sequencia += 1
+        self.quadros += 1
+        self.pendente = None
+
+    def finalizar(self):
+        self.escrever_pendente()
+        self.escrever_bloco(b'IEND', b'')
+
+        self.arquivo.seek(self.posicao_actl)
+        self.escrever_bloco(b'acTL', struct.pack('>II', self.quadros, 0))
+        self.arquivo.seek(0, os.SEEK_END)
+
+        if self.fechar_arquivo:
+            self.arquivo.close()
+
+
+class EscritorSequenciaPNG:
+    # Um PNG por quadro; quadros sem mudança são cópias do anterior
+    def __init__(self, diretorio, largura, altura):
+        self.diretorio = diretorio
+        self.largura = largura
+        self.altura = altura
+        self.quadros = 0
+        self.anterior = None
+        os.makedirs(diretorio, exist_ok=True)
+
+    def quadro(self, quadro, sujo):
+        self.quadros += 1
+        nome = os.path.join(self.diretorio, f"quadro_{self.quadros:05d}.png")
+
+        if self.anterior and sujo is None:
+            shutil.copyfile(self.anterior, nome)
+        else:
+            escritor = EscritorPNG(nome, self.largura, self.altura)
+            for linha in quadro.linhas(0, 0, self.largura - 1, self.altura - 1):
+                escritor.escrever_linha(linha)
+            escritor.finalizar()
+        self.anterior = nome
+
+    def finalizar(self):
+        pass
+
+
+class AnimadorIncremental(RasterizadorLadrilhos):
+    # Simula o tempo que o turtle levaria em cada movimento e tira um quadro a
+    # cada 1/fps segundos. Cada segmento é pintado uma única vez no quadro
+    # persistente, em pedaços quando um quadro cai no meio dele.
+    def __init__(self, escritor, largura=800, altura=800, fps=25, janela=None, tolerancia=None):
+        super().__init__(largura, altura, max(largura, altura), janela, tolerancia)
+        self.escritor = escritor
+        self.fps = fps
+        self.quadro = Quadro(largura, altura, cor_rgb(self.cor_fundo, BRANCO))
+        self.passo = passo_velocidade(VELOCIDADE_PADRAO)
+        self.passos_tartarugas = {}
+        self.tempo = 0.0
+        self.quadros = 0
+        self.finalizado = False
+
+    def duracao(self, distancia):
+        if not self.passo:
+            return 0.0
+        return (1 + int(distancia / self.passo)) * INTERVALO_ATUALIZACAO
+
+    def animar(self, x0, y0, x1, y1, desenhar):
+        duracao = self.duracao(math.hypot(x1 - x0, y1 - y0))
+        inicio = self.tempo
+        fim = inicio + duracao
+        px, py = x0, y0
+
+        while self.quadros / self.fps < fim:
+            f = (self.quadros / self.fps - inicio) / duracao
+            qx, qy = x0 + (x1 - x0) * f, y0 + (y1 - y0) * f
+            if desenhar and (qx, qy) != (px, py):
+                self.segmento(px, py, qx, qy)
+            px, py = qx, qy
+            self.emitir_quadro()
+
+        if desenhar:
+            self.segmento(px, py, x1, y1)
+        self.tempo = fim
+
+    def emitir_quadro(self):
+        self.escritor.quadro(self.quadro, self.quadro.retirar_sujo())
+        self.quadros += 1
+
+    def mover(self, x, y):
+        self.animar(self.x, self.y, x, y, self.caneta_abaixada)
+        self.x, self.y = x, y
+
+    def circulo(self, raio, direcao):
+        # Como em turtle.circle, cada lado do polígono é animado como um passo
+        pontos = self.circulos.pontos(self.x, self.y, direcao, raio, self.escala)
+        for (x0, y0), (x1, y1) in zip(pontos, pontos[1:]):
+            self.animar(x0, y0, x1, y1, self.caneta_abaixada)
+
+    def segmento(self, x0, y0, x1, y1):
+        px0, py0 = self.para_pixels(x0, y0)
+        px1, py1 = self.para_pixels(x1, y1)
+        raio = max(float(self.espessura_caneta), 1.0) / 2
+        self.quadro.desenhar_segmento(px0, py0, px1, py1, cor_rgb(self.cor_caneta), raio)
+        self.segmentos += 1
+
+    def limpar_segmentos(self):
+        self.quadro.limpar()
+
+    def fundo(self, cor):
+        super().fundo(cor)
+        self.quadro.trocar_fundo(cor_rgb(cor, BRANCO))
+
+    def velocidade(self, velocidade):
+        self.passo = passo_velocidade(velocidade)
+
+    def tartaruga(self, nome):
+        self.passos_tartarugas[self.tartaruga_atual] = self.passo
+        super().tartaruga(nome)
+        self.passo = self.passos_tartarugas.get(nome, passo_velocidade(VELOCIDADE_PADRAO))
+
+    def finalizar(self):
+        if self.finalizado:
+            return
+        # O último quadro mostra sempre o desenho completo
+        self.emitir_quadro()
+        self.escritor.finalizar()
+        self.finalizado = True
+
+
+def exportar_animacao(ast, saida, largura=800, altura=800, fps=25, sequencia=False, janela=None,
+                      ajustar=False, tolerancia=None, orcamento=None):
+    if ajustar and janela is None:
+        janela = analisar_extensao(ast).janela(largura, altura)
+
+    if sequencia:
+        escritor = EscritorSequenciaPNG(saida, largura, altura)
+    else:
+        escritor = EscritorAPNG(saida, largura, altura, fps)
+    animador = AnimadorIncremental(escritor, largura, altura, fps, janela, tolerancia)
+
+    try:
+        executar(ast, animador, orcamento)
+    finally:
+        # Se o programa parar no meio, a animação até ali continua válida
+        animador.finalizar()
+
+    return {
+        'quadros': escritor.quadros,
+        'segmentos': animador.segmentos,
+        'duracao': animador.tempo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta a execução de um programa TurtleScript como animação")
+    parser.add_argument('entrada', help="arquivo TurtleScript de entrada")
+    parser.add_argument('saida', help="arquivo PNG animado, ou diretório com --sequencia")
+    parser.add_argument('--largura', type=int, default=800)
+    parser.add_argument('--altura', type=int, default=800)
+    parser.add_argument('--fps', type=int, default=25, help="quadros por segundo")
+    parser.add_argument('--sequencia', action='store_true', help="grava um PNG por quadro em vez de um PNG animado")
+    parser.add_argument('--ajustar', action='store_true', help="enquadra a animação na área estimada do desenho")
+    parser.add_argument('--tolerancia', type=float, help="erro máximo em pixels dos círculos")
+    parser.add_argument('--estatisticas', action='store_true', help="imprime estatísticas da exportação")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.entrada):
+        print(f"Erro: Arquivo '{args.entrada}' não encontrado!")
+        sys.exit(1)
+
+    try:
+        with open(args.entrada, "r", encoding="utf-8") as f:
+            ast = compilar(f.read())
+
+        estatisticas = exportar_animacao(ast, args.saida, args.largura, args.altura, args.fps, args.sequencia,
+                                         ajustar=args.ajustar, tolerancia=args.tolerancia)
+        print(f"Animação gerada com sucesso: {args.saida}")
+        if args.estatisticas:
+            print(f"Quadros: {estatisticas['quadros']}")
+            print(f"Segmentos desenhados: {estatisticas['segmentos']}")
+            print(f"Duração simulada: {estatisticas['duracao']:.2f} s")
+    except Exception as e:
+        print(f"Erro durante a exportação: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
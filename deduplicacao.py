@@ -0,0 +1,143 @@
+import math
+
+from executor import Destino
+
+
+class DestinoDeduplicado(Destino):
+    def __init__(self, destino, quantum=1e-3, celula=64.0, escala=1.0):
+        self.destino = destino
+        self.escala = escala
+        self.quantum = quantum
+        self.tamanho_celula = celula
+        self.x = 0.0
+        self.y = 0.0
+        self.caneta_abaixada = True
+        self.caneta_destino = True
+        self.cor_caneta = 'black'
+        self.espessura_caneta = 1
+        self.tartaruga_atual = ''
+        self.tartarugas = {}
+        self.celulas = {}
+        self.sequencia = 0
+        self.tracos = 0
+        self.duplicados = 0
+
+    def quantizar(self, x, y):
+        return round(x / self.quantum), round(y / self.quantum)
+
+    def chave_celula(self, x, y):
+        return math.floor(x / self.tamanho_celula), math.floor(y / self.tamanho_celula)
+
+    def celulas_cobertas(self, xmin, ymin, xmax, ymax):
+        # A espessura é em pixels; 'escala' é quantos pixels cabem numa unidade
+        folga = (max(float(self.espessura_caneta), 1.0) + 1.0) / self.escala
+        cx0, cy0 = self.chave_celula(xmin - folga, ymin - folga)
+        cx1, cy1 = self.chave_celula(xmax + folga, ymax + folga)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield cx, cy
+
+    def celula(self, chave):
+        if chave not in self.celulas:
+            self.celulas[chave] = ({}, {})
+        return self.celulas[chave]
+
+    def registrar(self, geometria, ancora, caixa):
+        # Devolve True se o traço precisa ser desenhado. A âncora é um ponto
+        # quantizado, para que traços iguais caiam sempre na mesma célula.
+        self.tracos += 1
+        estilo = (self.cor_caneta, self.espessura_caneta)
+        tracos, _ = self.celula(self.chave_celula(ancora[0] * self.quantum, ancora[1] * self.quantum))
+        anterior = tracos.get(geometria)
+        cobertas = list(self.celulas_cobertas(*caixa))
+
+        if anterior and anterior[0] == estilo:
+            # Só é duplicado se nenhum traço de outro estilo passou por cima depois
+            encoberto = False
+            for chave in cobertas:
+                for outro, seq in self.celula(chave)[1].items():
+                    if outro != estilo and seq > anterior[1]:
+                        encoberto = True
+                        break
+                if encoberto:
+                    break
+            if not encoberto:
+                self.duplicados += 1
+                return False
+
+        self.sequencia += 1
+        tracos[geometria] = (estilo, self.sequencia)
+        for chave in cobertas:
+            self.celula(chave)[1][estilo] = self.sequencia
+        return True
+
+    def sincronizar_caneta(self, abaixada):
+        if self.caneta_destino != abaixada:
+            self.destino.caneta(abaixada)
+            self.caneta_destino = abaixada
+
+    def mover(self, x, y):
+        desenhar = False
+        if self.caneta_abaixada:
+            p0, p1 = sorted([self.quantizar(self.x, self.y), self.quantizar(x, y)])
+            caixa = (min(self.x, x), min(self.y, y), max(self.x, x), max(self.y, y))
+            desenhar = self.registrar(('segmento', p0, p1), p0, caixa)
+
+        self.sincronizar_caneta(desenhar)
+        self.destino.mover(x, y)
+        self.x, self.y = x, y
+
+    def caneta(self, abaixada):
+        self.caneta_abaixada = abaixada
+
+    def cor(self, cor):
+        self.cor_caneta = cor
+        self.destino.cor(cor)
+
+    def espessura(self, espessura):
+        self.espessura_caneta = espessura
+        self.destino.espessura(espessura)
+
+    def circulo(self, raio, direcao):
+        if not self.caneta_abaixada:
+            return
+
+        # O centro fica à esquerda da tartaruga, a 'raio' de distância
+        angulo = math.radians(direcao + 90)
+        cx, cy = self.x + raio * math.cos(angulo), self.y + raio * math.sin(angulo)
+        r = abs(raio)
+        inicio = self.quantizar(self.x, self.y)
+        geometria = ('circulo', inicio, self.quantizar(raio, direcao % 360.0))
+
+        if self.registrar(geometria, inicio, (cx - r, cy - r, cx + r, cy + r)):
+            self.sincronizar_caneta(True)
+            self.destino.circulo(raio, direcao)
+
+    def limpar(self):
+        self.celulas.clear()
+        self.destino.limpar()
+
+    def fundo(self, cor):
+        self.destino.fundo(cor)
+
+    def velocidade(self, velocidade):
+        self.destino.velocidade(velocidade)
+
+    def tartaruga(self, nome):
+        self.tartarugas[self.tartaruga_atual] = (self.x, self.y, self.caneta_abaixada, self.caneta_destino,
+                                                 self.cor_caneta, self.espessura_caneta)
+        self.tartaruga_atual = nome
+        self.x, self.y, self.caneta_abaixada, self.caneta_destino, self.cor_caneta, self.espessura_caneta = \
+            self.tartarugas.get(nome, (0.0, 0.0, True, True, 'black', 1))
+        self.destino.tartaruga(nome)
+
+    def finalizar(self):
+        self.sincronizar_caneta(self.caneta_abaixada)
+        self.destino.finalizar()
+
+    def estatisticas(self):
+        return {
+            'tracos': self.tracos,
+            'duplicados': self.duplicados,
+            'razao_deduplicacao': self.duplicados / self.tracos if self.tracos else 0.0,
+        }
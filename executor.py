@@ -0,0 +1,688 @@
+import math
+import re
+from collections import OrderedDict
+
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico
+from analisador_semantico import AnalisadorSemantico
+from indice_espacial import IndiceEspacial
+
+
+def compilar(codigo):
+    tokens = AnalisadorLexico(codigo).analisar()
+    ast = AnalisadorSintatico(tokens).programa()
+    AnalisadorSemantico().analisar(ast, verboso=False)
+    return ast
+
+
+PASSOS_MINIMOS_CIRCULO = 4
+PASSOS_MAXIMOS_CIRCULO = 1024
+
+
+def passos_circulo(raio):
+    return 1 + int(min(11 + abs(raio) / 6.0, 59.0))
+
+
+def pontos_circulo(x, y, direcao, raio, passos=None):
+    # Mesmo polígono que turtle.circle desenha para um círculo completo
+    if passos is None:
+        passos = passos_circulo(raio)
+    w = 360.0 / passos
+    w2 = 0.5 * w
+    lado = 2.0 * raio * math.sin(math.radians(w2))
+    if raio < 0:
+        lado, w, w2 = -lado, -w, -w2
+
+    pontos = [(x, y)]
+    angulo = direcao + w2
+    for _ in range(passos):
+        x += lado * math.cos(math.radians(angulo))
+        y += lado * math.sin(math.radians(angulo))
+        pontos.append((x, y))
+        angulo += w
+    return pontos
+
+
+class CacheCirculos:
+    # Com tolerância, guarda os polígonos de raio 1 já calculados; cada círculo
+    # desenhado só escala, gira e desloca os vértices guardados
+    def __init__(self, tamanho=64, tolerancia=None):
+        self.tamanho = tamanho
+        self.tolerancia = tolerancia
+        self.poligonos = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.diretos = 0
+
+    def passos(self, raio, escala=1.0):
+        if self.tolerancia is None:
+            return passos_circulo(raio)
+
+        # Menos lados possível sem que a flecha de cada lado, em pixels,
+        # passe da tolerância
+        raio_tela = abs(raio) * escala
+        if raio_tela <= self.tolerancia:
+            return PASSOS_MINIMOS_CIRCULO
+        angulo = math.acos(1.0 - self.tolerancia / raio_tela)
+        if angulo == 0.0:
+            # Raio tão grande (ou ilimitado) que a flecha some no arredondamento
+            return PASSOS_MAXIMOS_CIRCULO
+        passos = math.ceil(math.pi / angulo)
+        return max(PASSOS_MINIMOS_CIRCULO, min(passos, PASSOS_MAXIMOS_CIRCULO))
+
+    def unitario(self, passos, horario):
+        chave = (passos, horario)
+        poligono = self.poligonos.get(chave)
+        if poligono:
+            self.poligonos.move_to_end(chave)
+            self.acertos += 1
+            return poligono
+
+        self.falhas += 1
+        poligono = pontos_circulo(0.0, 0.0, 0.0, -1.0 if horario else 1.0, passos)
+        self.poligonos[chave] = poligono
+        if len(self.poligonos) > self.tamanho:
+            self.poligonos.popitem(last=False)
+        return poligono
+
+    def pontos(self, x, y, direcao, raio, escala=1.0):
+        if self.tolerancia is None:
+            # Com o número de lados do turtle.circle, os vértices são
+            # calculados pela mesma trigonometria, sem nenhuma diferença de
+            # arredondamento
+            self.diretos += 1
+            return pontos_circulo(x, y, direcao, raio)
+
+        poligono = self.unitario(self.passos(raio, escala), raio < 0)
+        angulo = math.radians(direcao)
+        cos, sin = abs(raio) * math.cos(angulo), abs(raio) * math.sin(angulo)
+        return [(x + px * cos - py * sin, y + px * sin + py * cos) for px, py in poligono]
+
+    def estatisticas(self):
+        total = self.acertos + self.falhas + self.diretos
+        return {
+            'circulos': total,
+            'acertos_circulos': self.acertos,
+            'circulos_exatos': self.diretos,
+            'taxa_acertos_circulos': self.acertos / total if total else 0.0,
+        }
+
+
+class Destino:
+    def mover(self, x, y):
+        pass
+
+    def caneta(self, abaixada):
+        pass
+
+    def cor(self, cor):
+        pass
+
+    def espessura(self, espessura):
+        pass
+
+    def circulo(self, raio, direcao):
+        pass
+
+    def limpar(self):
+        pass
+
+    def fundo(self, cor):
+        pass
+
+    def velocidade(self, velocidade):
+        pass
+
+    def tartaruga(self, nome):
+        pass
+
+    def finalizar(self):
+        pass
+
+
+class DestinoSegmentos(Destino):
+    def __init__(self, tolerancia=None):
+        self.x = 0.0
+        self.y = 0.0
+        self.caneta_abaixada = True
+        self.cor_caneta = 'black'
+        self.espessura_caneta = 1
+        self.cor_fundo = 'white'
+        self.tartaruga_atual = ''
+        self.tartarugas = {}
+        self.escala = 1.0
+        self.circulos = CacheCirculos(tolerancia=tolerancia)
+
+    def mover(self, x, y):
+        if self.caneta_abaixada:
+            self.segmento(self.x, self.y, x, y)
+        self.x, self.y = x, y
+
+    def caneta(self, abaixada):
+        self.caneta_abaixada = abaixada
+
+    def cor(self, cor):
+        self.cor_caneta = cor
+
+    def espessura(self, espessura):
+        self.espessura_caneta = espessura
+
+    def circulo(self, raio, direcao):
+        if not self.caneta_abaixada:
+            return
+        pontos = self.circulos.pontos(self.x, self.y, direcao, raio, self.escala)
+        for (x0, y0), (x1, y1) in zip(pontos, pontos[1:]):
+            self.segmento(x0, y0, x1, y1)
+
+    def limpar(self):
+        self.limpar_segmentos()
+
+    def fundo(self, cor):
+        self.cor_fundo = cor
+
+    def tartaruga(self, nome):
+        # Cada tartaruga tem posição e caneta próprias
+        self.tartarugas[self.tartaruga_atual] = (self.x, self.y, self.caneta_abaixada,
+                                                 self.cor_caneta, self.espessura_caneta)
+        self.tartaruga_atual = nome
+        self.x, self.y, self.caneta_abaixada, self.cor_caneta, self.espessura_caneta = \
+            self.tartarugas.get(nome, (0.0, 0.0, True, 'black', 1))
+
+    def segmento(self, x0, y0, x1, y1):
+        pass
+
+    def limpar_segmentos(self):
+        pass
+
+
+class DestinoSensores(DestinoSegmentos):
+    # Mantém o índice espacial do que já foi desenhado e repassa tudo ao destino real
+    def __init__(self, destino):
+        super().__init__()
+        self.destino = destino
+        self.indice = IndiceEspacial()
+
+    def mover(self, x, y):
+        super().mover(x, y)
+        self.destino.mover(x, y)
+
+    def segmento(self, x0, y0, x1, y1):
+        self.indice.adicionar_segmento(x0, y0, x1, y1, self.espessura_caneta)
+
+    def caneta(self, abaixada):
+        super().caneta(abaixada)
+        self.destino.caneta(abaixada)
+
+    def cor(self, cor):
+        super().cor(cor)
+        self.destino.cor(cor)
+
+    def espessura(self, espessura):
+        super().espessura(espessura)
+        self.destino.espessura(espessura)
+
+    def circulo(self, raio, direcao):
+        if self.caneta_abaixada:
+            angulo = math.radians(direcao + 90)
+            self.indice.adicionar_circulo(self.x + raio * math.cos(angulo), self.y + raio * math.sin(angulo),
+                                          raio, self.espessura_caneta, self.x, self.y)
+        self.destino.circulo(raio, direcao)
+
+    def limpar(self):
+        self.indice.limpar()
+        self.destino.limpar()
+
+    def fundo(self, cor):
+        super().fundo(cor)
+        self.destino.fundo(cor)
+
+    def velocidade(self, velocidade):
+        self.destino.velocidade(velocidade)
+
+    def tartaruga(self, nome):
+        super().tartaruga(nome)
+        self.destino.tartaruga(nome)
+
+    def finalizar(self):
+        self.destino.finalizar()
+
+
+class GravadorTrajeto(Destino):
+    # Repassa as operações ao destino real e guarda o caminho no referencial
+    # da tartaruga no início da gravação
+    def __init__(self, destino, x, y, direcao, limite):
+        self.destino = destino
+        self.x0, self.y0 = x, y
+        self.direcao = direcao
+        self.cos = math.cos(math.radians(direcao))
+        self.sin = math.sin(math.radians(direcao))
+        self.limite = limite
+        self.operacoes = []
+        self.excedeu = False
+
+    def local(self, x, y):
+        dx, dy = x - self.x0, y - self.y0
+        return dx * self.cos + dy * self.sin, dy * self.cos - dx * self.sin
+
+    def gravar(self, operacao):
+        if len(self.operacoes) < self.limite:
+            self.operacoes.append(operacao)
+        else:
+            self.excedeu = True
+
+    def mover(self, x, y):
+        self.gravar(('mover',) + self.local(x, y))
+        self.destino.mover(x, y)
+
+    def caneta(self, abaixada):
+        self.gravar(('caneta', abaixada))
+        self.destino.caneta(abaixada)
+
+    def cor(self, cor):
+        self.gravar(('cor', cor))
+        self.destino.cor(cor)
+
+    def espessura(self, espessura):
+        self.gravar(('espessura', espessura))
+        self.destino.espessura(espessura)
+
+    def circulo(self, raio, direcao):
+        self.gravar(('circulo', raio, direcao - self.direcao))
+        self.destino.circulo(raio, direcao)
+
+    def limpar(self):
+        self.gravar(('limpar',))
+        self.destino.limpar()
+
+    def fundo(self, cor):
+        self.gravar(('fundo', cor))
+        self.destino.fundo(cor)
+
+    def velocidade(self, velocidade):
+        self.gravar(('velocidade', velocidade))
+        self.destino.velocidade(velocidade)
+
+
+class Trajeto:
+    def __init__(self, operacoes, x, y, direcao, instrucoes, desenhos):
+        self.operacoes = operacoes
+        self.x = x
+        self.y = y
+        self.direcao = direcao
+        self.instrucoes = instrucoes
+        self.desenhos = desenhos
+
+
+class ExecutorTurtle:
+    def __init__(self, destino=None, orcamento=None, max_trajetos=256, max_operacoes_trajeto=65536):
+        self.destino = destino or Destino()
+        self.sensores = None
+        self.orcamento = orcamento
+        self.variaveis = {}
+        self.locais = None
+        self.x = 0.0
+        self.y = 0.0
+        self.direcao = 0.0
+        self.tartaruga_atual = ''
+        self.tartarugas = {}
+        self.procedimentos = {}
+        self.puros = {}
+        self.trajetos = OrderedDict()
+        self.max_trajetos = max_trajetos
+        self.max_operacoes_trajeto = max_operacoes_trajeto
+        self.acertos_trajetos = 0
+        self.falhas_trajetos = 0
+
+    def executar(self, ast):
+        if self.usa_sensores(ast):
+            self.sensores = DestinoSensores(self.destino)
+            self.destino = self.sensores
+        if self.orcamento:
+            self.orcamento.iniciar()
+            self.orcamento.passo(len(ast.filhos), ast.linha)
+        self.executar_comandos(ast.filhos)
+        self.destino.finalizar()
+
+    def usa_sensores(self, valor):
+        if isinstance(valor, list):
+            return any(self.usa_sensores(v) for v in valor)
+        if isinstance(valor, dict):
+            return any(self.usa_sensores(v) for v in valor.values())
+        if hasattr(valor, 'tipo'):
+            return valor.tipo == 'Sensor' or self.usa_sensores(valor.valor) or self.usa_sensores(valor.filhos)
+        return False
+
+    def executar_comandos(self, comandos):
+        for comando in comandos:
+            self.executar_comando(comando)
+
+    def executar_comando(self, comando):
+        if comando.tipo == 'Declaracao':
+            self.executar_declaracao(comando)
+        elif comando.tipo == 'Atribuicao':
+            ident = comando.valor['ident']
+            if self.locais is not None and ident in self.locais:
+                self.locais[ident] = self.avaliar(comando.valor['valor'])
+            else:
+                self.variaveis[ident] = self.avaliar(comando.valor['valor'])
+        elif comando.tipo == 'Movimento':
+            self.executar_movimento(comando)
+        elif comando.tipo == 'ComandoCaneta':
+            self.executar_comando_caneta(comando)
+        elif comando.tipo == 'ComandoTela':
+            self.executar_comando_tela(comando)
+        elif comando.tipo == 'ComandoTurtle':
+            self.executar_comando_turtle(comando)
+        elif comando.tipo == 'Condicional':
+            self.executar_condicional(comando)
+        elif comando.tipo == 'Repeticao':
+            orcamento, custo = self.orcamento, len(comando.filhos) + 1
+            for _ in range(int(self.avaliar(comando.valor['vezes']))):
+                if orcamento:
+                    orcamento.instrucoes += custo
+                    if orcamento.instrucoes >= orcamento.proxima_verificacao:
+                        orcamento.verificar(comando.linha)
+                self.executar_comandos(comando.filhos)
+        elif comando.tipo == 'Enquanto':
+            orcamento, custo = self.orcamento, len(comando.filhos) + 1
+            while self.avaliar(comando.valor['condicao']):
+                if orcamento:
+                    orcamento.instrucoes += custo
+                    if orcamento.instrucoes >= orcamento.proxima_verificacao:
+                        orcamento.verificar(comando.linha)
+                self.executar_comandos(comando.filhos)
+        elif comando.tipo == 'Procedimento':
+            self.procedimentos[comando.valor['nome']] = comando
+            self.puros[comando.valor['nome']] = self.eh_puro(comando)
+        elif comando.tipo == 'Chamada':
+            self.executar_chamada(comando)
+        elif comando.tipo == 'Usar':
+            self.selecionar_tartaruga(self.avaliar(comando.valor['nome']))
+        else:
+            self.executar_comandos(comando.filhos)
+
+    def executar_declaracao(self, comando):
+        iniciais = {'inteiro': 0, 'real': 0.0, 'texto': '', 'logico': False}
+        escopo = self.variaveis if self.locais is None else self.locais
+        for var in comando.valor['variaveis']:
+            if comando.valor['tipo'] == 'tartaruga':
+                # Cada declaração cria uma tartaruga nova, identificada pelo nome
+                escopo[var] = f"{var}#{len(self.tartarugas) + 1}"
+                self.tartarugas[escopo[var]] = (0.0, 0.0, 0.0)
+            else:
+                escopo[var] = iniciais.get(comando.valor['tipo'])
+
+    def selecionar_tartaruga(self, nome):
+        if nome == self.tartaruga_atual:
+            return
+        self.tartarugas[self.tartaruga_atual] = (self.x, self.y, self.direcao)
+        self.tartaruga_atual = nome
+        self.x, self.y, self.direcao = self.tartarugas[nome]
+        self.destino.tartaruga(nome)
+
+    def executar_chamada(self, comando):
+        nome = comando.valor['nome']
+        procedimento = self.procedimentos[nome]
+        argumentos = [self.avaliar(a) for a in comando.valor['argumentos']]
+
+        if not self.puros[nome]:
+            self.executar_procedimento(procedimento, argumentos)
+            return
+
+        # Procedimentos puros desenham sempre o mesmo caminho relativo para os
+        # mesmos argumentos: basta reposicioná-lo a partir da pose atual
+        chave = (nome, tuple(argumentos))
+        trajeto = self.trajetos.get(chave)
+        if trajeto:
+            self.trajetos.move_to_end(chave)
+            self.acertos_trajetos += 1
+            self.reproduzir_trajeto(trajeto, comando.linha)
+            return
+
+        self.falhas_trajetos += 1
+        trajeto = self.gravar_trajeto(procedimento, argumentos)
+        if trajeto:
+            self.trajetos[chave] = trajeto
+            if len(self.trajetos) > self.max_trajetos:
+                self.trajetos.popitem(last=False)
+
+    def executar_procedimento(self, procedimento, argumentos):
+        locais = self.locais
+        self.locais = {p['nome']: v for p, v in zip(procedimento.valor['parametros'], argumentos)}
+        try:
+            if self.orcamento:
+                self.orcamento.passo(len(procedimento.filhos), procedimento.linha)
+            self.executar_comandos(procedimento.filhos)
+        finally:
+            self.locais = locais
+
+    def gravar_trajeto(self, procedimento, argumentos):
+        destino = self.destino
+        gravador = GravadorTrajeto(destino, self.x, self.y, self.direcao, self.max_operacoes_trajeto)
+        instrucoes = self.orcamento.instrucoes if self.orcamento else 0
+        desenhos = self.orcamento.desenhos if self.orcamento else 0
+
+        self.destino = gravador
+        try:
+            self.executar_procedimento(procedimento, argumentos)
+        finally:
+            self.destino = destino
+
+        if gravador.excedeu:
+            return None
+        if self.orcamento:
+            instrucoes = self.orcamento.instrucoes - instrucoes
+            desenhos = self.orcamento.desenhos - desenhos
+        x, y = gravador.local(self.x, self.y)
+        return Trajeto(gravador.operacoes, x, y, (self.direcao - gravador.direcao) % 360.0, instrucoes, desenhos)
+
+    def reproduzir_trajeto(self, trajeto, linha):
+        if self.orcamento:
+            self.orcamento.passo(trajeto.instrucoes, linha)
+            if trajeto.desenhos:
+                self.orcamento.desenho(linha, trajeto.desenhos)
+
+        x0, y0, direcao = self.x, self.y, self.direcao
+        cos, sin = math.cos(math.radians(direcao)), math.sin(math.radians(direcao))
+        destino = self.destino
+
+        for operacao in trajeto.operacoes:
+            if operacao[0] == 'mover':
+                _, x, y = operacao
+                destino.mover(x0 + x * cos - y * sin, y0 + x * sin + y * cos)
+            elif operacao[0] == 'circulo':
+                destino.circulo(operacao[1], (direcao + operacao[2]) % 360.0)
+            else:
+                getattr(destino, operacao[0])(*operacao[1:])
+
+        self.x = x0 + trajeto.x * cos - trajeto.y * sin
+        self.y = y0 + trajeto.x * sin + trajeto.y * cos
+        self.direcao = (direcao + trajeto.direcao) % 360.0
+
+    def eh_puro(self, procedimento):
+        # Puro: só lê parâmetros e locais, não altera globais, não usa posições
+        # absolutas e só chama procedimentos puros (ou a si mesmo)
+        nome = procedimento.valor['nome']
+        locais = {p['nome'] for p in procedimento.valor['parametros']}
+        return self.comandos_puros(procedimento.filhos, locais, nome)
+
+    def comandos_puros(self, comandos, locais, nome):
+        for comando in comandos:
+            if comando.tipo == 'Declaracao':
+                locais.update(comando.valor['variaveis'])
+            elif comando.tipo == 'Atribuicao' and comando.valor['ident'] not in locais:
+                return False
+            elif comando.tipo == 'Movimento' and comando.valor['comando'] == 'ir_para':
+                return False
+            elif comando.tipo == 'Usar':
+                return False
+            elif comando.tipo == 'Chamada' and comando.valor['nome'] != nome and not self.puros.get(comando.valor['nome']):
+                return False
+
+            for chave, valor in (comando.valor or {}).items():
+                if chave in ['condicao', 'vezes', 'valor', 'argumentos'] and not self.expressao_pura(valor, locais):
+                    return False
+
+            if not self.comandos_puros(comando.filhos, locais, nome):
+                return False
+        return True
+
+    def expressao_pura(self, expr, locais):
+        if isinstance(expr, list):
+            return all(self.expressao_pura(e, locais) for e in expr)
+        if isinstance(expr, str):
+            if expr[:1] in ['"', "'"]:
+                return True
+            nomes = re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', expr)
+            return all(n in locais or n.lower() in ['verdadeiro', 'falso'] for n in nomes)
+        if expr.tipo == 'Sensor':
+            # Sensores leem o que já foi desenhado: o resultado depende da tela
+            return False
+        return all(self.expressao_pura(v, locais) for k, v in expr.valor.items() if k != 'operador')
+
+    def executar_movimento(self, comando):
+        cmd = comando.valor['comando']
+
+        if cmd in ['avancar', 'recuar', 'ir_para'] and self.orcamento:
+            self.orcamento.desenho(comando.linha)
+
+        if cmd == 'ir_para':
+            self.mover_para(self.avaliar(comando.valor['x']), self.avaliar(comando.valor['y']))
+            return
+
+        valor = self.avaliar(comando.valor['valor'])
+        if cmd == 'avancar':
+            self.deslocar(valor)
+        elif cmd == 'recuar':
+            self.deslocar(-valor)
+        elif cmd == 'girar_direita':
+            self.direcao = (self.direcao - valor) % 360.0
+        elif cmd == 'girar_esquerda':
+            self.direcao = (self.direcao + valor) % 360.0
+
+    def deslocar(self, distancia):
+        angulo = math.radians(self.direcao)
+        self.mover_para(self.x + distancia * math.cos(angulo), self.y + distancia * math.sin(angulo))
+
+    def mover_para(self, x, y):
+        self.x, self.y = x, y
+        self.destino.mover(x, y)
+
+    def executar_comando_caneta(self, comando):
+        cmd = comando.valor['comando']
+
+        if cmd == 'levantar_caneta':
+            self.destino.caneta(False)
+        elif cmd == 'abaixar_caneta':
+            self.destino.caneta(True)
+        elif cmd == 'definir_cor':
+            self.destino.cor(self.avaliar(comando.valor['valor']))
+        elif cmd == 'definir_espessura':
+            self.destino.espessura(self.avaliar(comando.valor['valor']))
+
+    def executar_comando_tela(self, comando):
+        cmd = comando.valor['comando']
+
+        if cmd == 'limpar_tela':
+            self.destino.limpar()
+        elif cmd == 'cor_de_fundo':
+            self.destino.fundo(self.avaliar(comando.valor['valor']))
+
+    def executar_comando_turtle(self, comando):
+        cmd = comando.valor['comando']
+        valor = self.avaliar(comando.valor['valor'])
+
+        if cmd == 'velocidade':
+            self.destino.velocidade(valor)
+        elif cmd == 'circulo':
+            if self.orcamento:
+                self.orcamento.desenho(comando.linha)
+            self.destino.circulo(valor, self.direcao)
+
+    def executar_condicional(self, comando):
+        condicao = self.avaliar(comando.valor['condicao'])
+
+        for filho in comando.filhos:
+            if (filho.tipo == 'BlocoVerdadeiro') == bool(condicao):
+                if self.orcamento:
+                    self.orcamento.passo(len(filho.filhos), comando.linha)
+                self.executar_comandos(filho.filhos)
+
+    def avaliar(self, expr):
+        if isinstance(expr, str):
+            if expr[:1] in ['"', "'"]:
+                return expr[1:-1]
+            elif expr.lower() in ['verdadeiro', 'falso']:
+                return expr.lower() == 'verdadeiro'
+            elif expr[:1] in ['+', '-']:
+                valor = self.avaliar(expr[1:])
+                return -valor if expr[0] == '-' else valor
+            elif expr[:1].isdigit():
+                return float(expr) if '.' in expr else int(expr)
+            if self.locais is not None and expr in self.locais:
+                return self.locais[expr]
+            return self.variaveis[expr]
+
+        if expr.tipo == 'ExpressaoAritmetica':
+            return self.avaliar_aritmetica(expr.valor)
+        elif expr.tipo == 'ExpressaoLogica':
+            return self.avaliar_logica(expr.valor)
+        elif expr.tipo == 'Sensor':
+            return self.avaliar_sensor(expr.valor['sensor'])
+
+        raise Exception(f"expressão desconhecida: {expr}")
+
+    def avaliar_sensor(self, sensor):
+        indice = self.sensores.indice
+        if sensor == 'tocando':
+            return indice.tocando(self.x, self.y, self.sensores.espessura_caneta)
+        elif sensor == 'distancia_ate_linha':
+            return indice.distancia_ate_linha(self.x, self.y, self.direcao)
+
+    def avaliar_aritmetica(self, expr_info):
+        op = expr_info['operador']
+        esq = self.avaliar(expr_info['esquerda'])
+        dir = self.avaliar(expr_info['direita'])
+
+        if op == '+':
+            return esq + dir
+        elif op == '-':
+            return esq - dir
+        elif op == '*':
+            return esq * dir
+        elif op == '/':
+            return esq / dir
+        elif op == '%':
+            return esq % dir
+
+    def avaliar_logica(self, expr_info):
+        op = expr_info['operador']
+
+        if op == '!':
+            return not self.avaliar(expr_info['operando'])
+        elif op == '&&':
+            return self.avaliar(expr_info['esquerda']) and self.avaliar(expr_info['direita'])
+        elif op == '||':
+            return self.avaliar(expr_info['esquerda']) or self.avaliar(expr_info['direita'])
+
+        esq = self.avaliar(expr_info['esquerda'])
+        dir = self.avaliar(expr_info['direita'])
+
+        if op == '==':
+            return esq == dir
+        elif op == '!=':
+            return esq != dir
+        elif op == '<':
+            return esq < dir
+        elif op == '>':
+            return esq > dir
+        elif op == '<=':
+            return esq <= dir
+        elif op == '>=':
+            return esq >= dir
+
+
+def executar(ast, destino=None, orcamento=None):
+    executor = ExecutorTurtle(destino, orcamento)
+    executor.executar(ast)
+    return executor
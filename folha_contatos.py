@@ -0,0 +1,278 @@
+import argparse
+import glob
+import json
+import math
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from analise_extensao import analisar_extensao
+from executor import compilar, executar
+from orcamento import Orcamento, OrcamentoExcedido
+from rasterizador import EscritorPNG, Ladrilho, RasterizadorLadrilhos, renderizar_ladrilho
+
+# Mesma área que o rasterizador usa para uma tela de 800x800
+JANELA_PADRAO = (-400.0, -400.0, 400.0, 400.0)
+COR_SEPARADOR = (128, 128, 128)
+COR_FALHA = (220, 0, 0)
+COR_LIMITE = (255, 165, 0)
+FUNDO_FALHA = (235, 235, 235)
+
+
+class TempoEsgotado(Exception):
+    pass
+
+
+def estourar_tempo(sinal, quadro):
+    raise TempoEsgotado()
+
+
+def limitar_tarefa(segundos):
+    # Prazo da tarefa inteira, que vale também para a análise e a
+    # rasterização; sem SIGALRM (Windows) só a execução tem limite
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, estourar_tempo)
+        signal.setitimer(signal.ITIMER_REAL, segundos or 0)
+
+
+def novo_resultado(arquivo):
+    return {'arquivo': arquivo, 'situacao': 'ok', 'mensagem': '', 'compilacao': 0.0, 'analise': 0.0,
+            'execucao': 0.0, 'rasterizacao': 0.0, 'segmentos': 0}
+
+
+def renderizar_miniatura(arquivo, lado, max_segundos, max_desenhos, ajustar, max_tarefa=None):
+    # Roda num processo do pool; nenhuma falha de um programa sai daqui
+    limitar_tarefa(max_tarefa)
+    try:
+        return renderizar_fases(arquivo, lado, max_segundos, max_desenhos, ajustar, max_tarefa)
+    except TempoEsgotado:
+        # O alarme chegou entre o fim das fases e o cancelamento do prazo
+        resultado = novo_resultado(arquivo)
+        resultado.update(situacao='tempo', mensagem=f"tempo máximo da tarefa excedido (limite {max_tarefa})")
+        return None, resultado
+    finally:
+        limitar_tarefa(None)
+
+
+def renderizar_fases(arquivo, lado, max_segundos, max_desenhos, ajustar, max_tarefa):
+    # Compila, analisa, executa e rasteriza um programa numa miniatura
+    # quadrada; devolve os pixels RGB (ou None) e os tempos de cada fase
+    resultado = novo_resultado(arquivo)
+    fase = 'compilacao'
+    inicio = time.perf_counter()
+    pixels = None
+
+    try:
+        with open(arquivo, "r", encoding="utf-8") as f:
+            ast = compilar(f.read())
+
+        fase, inicio = 'analise', marcar_fase(resultado, fase, inicio)
+        janela = analisar_extensao(ast).janela(lado, lado) if ajustar else None
+
+        fase, inicio = 'execucao', marcar_fase(resultado, fase, inicio)
+        rasterizador = RasterizadorLadrilhos(lado, lado, lado, janela or JANELA_PADRAO)
+        try:
+            executar(ast, rasterizador, Orcamento(max_desenhos=max_desenhos, max_segundos=max_segundos))
+        except OrcamentoExcedido as e:
+            # O que foi desenhado até o limite ainda aparece na folha
+            resultado.update(situacao='orcamento', mensagem=str(e))
+
+        fase, inicio = 'rasterizacao', marcar_fase(resultado, fase, inicio)
+        _, tarefa = next(rasterizador.tarefas_faixa(0))
+        pixels = renderizar_ladrilho(*tarefa)
+        resultado['segmentos'] = rasterizador.segmentos
+    except TempoEsgotado:
+        resultado.update(situacao='tempo', mensagem=f"tempo máximo da tarefa excedido na fase de {fase} "
+                                                    f"(limite {max_tarefa})")
+    except Exception as e:
+        resultado.update(situacao=fase, mensagem=str(e))
+
+    marcar_fase(resultado, fase, inicio)
+    return (pixels if resultado['situacao'] in ['ok', 'orcamento'] else None), resultado
+
+
+def marcar_fase(resultado, fase, inicio):
+    agora = time.perf_counter()
+    resultado[fase] = agora - inicio
+    return agora
+
+
+def miniatura_falha(lado, cor=COR_FALHA):
+    # Um X sobre fundo cinza claro: vermelho para erros, laranja para o prazo esgotado
+    ladrilho = Ladrilho(0, 0, lado, lado, FUNDO_FALHA)
+    margem = lado / 4
+    raio = max(lado / 40, 1.0)
+    ladrilho.desenhar_segmento(margem, margem, lado - margem, lado - margem, cor, raio)
+    ladrilho.desenhar_segmento(lado - margem, margem, margem, lado - margem, cor, raio)
+    return bytes(ladrilho.pixels)
+
+
+def marcar_limite(pixels, lado):
+    # Moldura laranja: o programa foi interrompido pelo limite de tempo ou de desenhos
+    ladrilho = Ladrilho(0, 0, lado, lado, FUNDO_FALHA)
+    ladrilho.pixels[:] = pixels
+    cor = bytes(COR_LIMITE)
+    borda = max(lado // 40, 2)
+    for y in range(lado):
+        if y < borda or y >= lado - borda:
+            ladrilho.pintar(y, 0, lado - 1, cor)
+        else:
+            ladrilho.pintar(y, 0, borda - 1, cor)
+            ladrilho.pintar(y, lado - borda, lado - 1, cor)
+    return bytes(ladrilho.pixels)
+
+
+class FolhaContatos:
+    # Grava a folha uma fileira de miniaturas por vez, na ordem em que os
+    # resultados chegam; só uma fileira fica na memória
+    def __init__(self, arquivo, quantidade, lado=160, colunas=None, separador=4):
+        self.lado = lado
+        self.colunas = colunas or max(1, math.ceil(math.sqrt(quantidade)))
+        self.fileiras = max(1, math.ceil(quantidade / self.colunas))
+        self.separador = separador
+        self.largura = self.colunas * lado + (self.colunas + 1) * separador
+        self.altura = self.fileiras * lado + (self.fileiras + 1) * separador
+        self.escritor = EscritorPNG(arquivo, self.largura, self.altura)
+        self.fileira = []
+        self.falha = miniatura_falha(lado)
+        self.esgotado = miniatura_falha(lado, COR_LIMITE)
+
+    def adicionar(self, pixels, resultado):
+        if resultado['situacao'] == 'orcamento':
+            pixels = marcar_limite(pixels, self.lado)
+        elif resultado['situacao'] == 'tempo':
+            pixels = self.esgotado
+        self.fileira.append(pixels or self.falha)
+        if len(self.fileira) == self.colunas:
+            self.gravar_fileira()
+
+    def gravar_fileira(self):
+        cor = bytes(COR_SEPARADOR)
+        for _ in range(self.separador):
+            self.escritor.escrever_linha(cor * self.largura)
+
+        largura = self.lado * 3
+        vazias = self.colunas - len(self.fileira)
+        for y in range(self.lado):
+            linha = bytearray(cor * self.separador)
+            for pixels in self.fileira:
+                linha += pixels[y * largura:(y + 1) * largura]
+                linha += cor * self.separador
+            linha += cor * ((self.lado + self.separador) * vazias)
+            self.escritor.escrever_linha(linha)
+        self.fileira = []
+
+    def finalizar(self):
+        if self.fileira:
+            self.gravar_fileira()
+        for _ in range(self.separador):
+            self.escritor.escrever_linha(bytes(COR_SEPARADOR) * self.largura)
+        self.escritor.finalizar()
+
+
+def gerar_folha(arquivos, saida, lado=160, colunas=None, processos=None, max_segundos=5.0, max_desenhos=None,
+                ajustar=True, separador=4, max_tarefa=None):
+    folha = FolhaContatos(saida, len(arquivos), lado, colunas, separador)
+    processos = processos or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(processos) if processos > 1 else None
+    if max_tarefa is None and max_segundos is not None:
+        max_tarefa = 3 * max_segundos
+    argumentos = (arquivos, repeat(lado), repeat(max_segundos), repeat(max_desenhos), repeat(ajustar),
+                  repeat(max_tarefa))
+
+    resultados = []
+    try:
+        if pool:
+            # Lotes pequenos diluem o custo de comunicação sem atrasar a fileira atual
+            lote = max(1, min(16, len(arquivos) // (processos * 8)))
+            miniaturas = pool.map(renderizar_miniatura, *argumentos, chunksize=lote)
+        else:
+            miniaturas = map(renderizar_miniatura, *argumentos)
+
+        for indice, (pixels, resultado) in enumerate(miniaturas):
+            resultado['fileira'], resultado['coluna'] = divmod(indice, folha.colunas)
+            folha.adicionar(pixels, resultado)
+            resultados.append(resultado)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    folha.finalizar()
+    return resultados
+
+
+def tempo_total(resultado):
+    return resultado['compilacao'] + resultado['analise'] + resultado['execucao'] + resultado['rasterizacao']
+
+
+def imprimir_resumo(resultados, duracao):
+    print(f"{'fileira':>7} {'coluna':>6} {'situação':<11} {'compilação':>10} {'análise':>9} {'execução':>9} "
+          f"{'raster':>9} {'segmentos':>9}  arquivo")
+    for r in resultados:
+        print(f"{r['fileira']:>7} {r['coluna']:>6} {r['situacao']:<11} {r['compilacao'] * 1000:>8.1f}ms "
+              f"{r['analise'] * 1000:>7.1f}ms {r['execucao'] * 1000:>7.1f}ms {r['rasterizacao'] * 1000:>7.1f}ms "
+              f"{r['segmentos']:>9}  {r['arquivo']}")
+        if r['mensagem']:
+            print(f"{'':>15}{r['mensagem']}")
+
+    situacoes = {}
+    for r in resultados:
+        situacoes[r['situacao']] = situacoes.get(r['situacao'], 0) + 1
+    trabalho = sum(tempo_total(r) for r in resultados)
+    print(f"\n{len(resultados)} programa(s) em {duracao:.2f} s "
+          f"({len(resultados) / max(duracao, 1e-9):.1f} por segundo; {trabalho:.2f} s somados nos processos)")
+    print(", ".join(f"{quantidade} {situacao}" for situacao, quantidade in sorted(situacoes.items())))
+    mais_lentos = sorted(resultados, key=tempo_total, reverse=True)[:5]
+    print("Mais lentos: " + ", ".join(f"{os.path.basename(r['arquivo'])} ({tempo_total(r):.2f} s)"
+                                      for r in mais_lentos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderiza todos os programas TurtleScript de um diretório "
+                                                 "numa única folha de miniaturas")
+    parser.add_argument('diretorio', help="diretório com os arquivos .txt")
+    parser.add_argument('saida', help="arquivo PNG da folha")
+    parser.add_argument('--lado', type=int, default=160, help="tamanho de cada miniatura em pixels")
+    parser.add_argument('--colunas', type=int, help="miniaturas por fileira (padrão: folha quase quadrada)")
+    parser.add_argument('--processos', type=int, help="processos de renderização (padrão: um por núcleo)")
+    parser.add_argument('--max-segundos', type=float, default=5.0, help="tempo máximo de execução por programa")
+    parser.add_argument('--max-desenhos', type=int, help="chamadas de desenho máximas por programa")
+    parser.add_argument('--max-segundos-tarefa', type=float,
+                        help="prazo de cada programa somando compilação, análise, execução e rasterização "
+                             "(padrão: 3 vezes --max-segundos)")
+    parser.add_argument('--sem-ajuste', dest='ajustar', action='store_false',
+                        help="usa a tela padrão em vez de enquadrar cada desenho")
+    parser.add_argument('--resumo', help="grava os tempos de cada programa neste arquivo JSON")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.diretorio):
+        print(f"Erro: Diretório '{args.diretorio}' não encontrado!")
+        sys.exit(1)
+
+    arquivos = sorted(glob.glob(os.path.join(args.diretorio, '*.txt')))
+    if not arquivos:
+        print(f"Erro: Nenhum arquivo .txt em '{args.diretorio}'")
+        sys.exit(1)
+
+    try:
+        inicio = time.perf_counter()
+        resultados = gerar_folha(arquivos, args.saida, args.lado, args.colunas, args.processos,
+                                 args.max_segundos, args.max_desenhos, args.ajustar,
+                                 max_tarefa=args.max_segundos_tarefa)
+        duracao = time.perf_counter() - inicio
+    except Exception as e:
+        print(f"Erro durante a geração da folha: {e}")
+        sys.exit(1)
+
+    imprimir_resumo(resultados, duracao)
+    if args.resumo:
+        with open(args.resumo, "w", encoding="utf-8") as f:
+            json.dump({'duracao': duracao, 'programas': resultados}, f, ensure_ascii=False, indent=2)
+    print(f"Folha gerada com sucesso: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
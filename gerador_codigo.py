@@ -1,22 +1,191 @@
+import argparse
+import inspect
+import json
 import sys
 import os
 
+import indice_espacial as runtime_indice
+import orcamento as runtime_orcamento
+import perfil as runtime_perfil
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import AnalisadorSintatico
+from analise_extensao import analisar_extensao
+
+LARGURA_TELA = 800
+ALTURA_TELA = 800
+
 class GeradorCodigo:
-    def __init__(self):
+    def __init__(self, orcamento=None, janela=None, perfil=False, fonte=None, arquivo=''):
         self.variaveis_declaradas = {}
         self.indent_level = 0
         self.linhas = []
+        self.orcamento = orcamento
+        self.janela = janela
+        self.perfil = perfil
+        self.fonte = fonte or ''
+        self.arquivo = arquivo
+        self.varias_tartarugas = False
+        self.sensores = False
         
     def gerar_codigo(self, ast):
+        # Com várias tartarugas a tela só é redesenhada uma vez por passo
+        self.varias_tartarugas = self.declara_tartarugas(ast)
+        self.sensores = self.usa_sensores(ast)
+
         self.linhas = [
             "import turtle",
             "",
-            "tela = turtle.Screen()",
-            "t = turtle.Turtle()",
-            "",        
         ]
-        self.processar_comandos(ast.filhos)
+        if self.orcamento:
+            self.linhas += [
+                inspect.getsource(runtime_orcamento).rstrip(),
+                "",
+                f"_orcamento = Orcamento(max_instrucoes={self.orcamento.max_instrucoes!r}, "
+                f"max_desenhos={self.orcamento.max_desenhos!r}, max_segundos={self.orcamento.max_segundos!r})",
+                "",
+            ]
+        if self.perfil:
+            # Cada comando avisa sua linha; o relatório sai no fim da execução
+            self.linhas += [
+                inspect.getsource(runtime_perfil).rstrip(),
+                "",
+                f"_perfil = Perfil({self.arquivo!r}, {self.fontes(ast)!r}, {self.blocos(ast)!r})",
+                "_linha = _perfil.linha",
+                "_desenho = _perfil.desenho",
+                "",
+            ]
+        if self.sensores:
+            # Os sensores consultam um índice espacial do que já foi desenhado,
+            # atualizado a cada movimento com a caneta abaixada
+            self.linhas += [
+                inspect.getsource(runtime_indice).rstrip(),
+                "",
+                "_indice = IndiceEspacial()",
+                "",
+                "def _mover(movimento, *args):",
+                "    x, y = t.position()",
+                "    movimento(*args)",
+                "    if t.isdown():",
+                "        _indice.adicionar_segmento(x, y, t.xcor(), t.ycor(), t.pensize())",
+                "",
+                "def _circulo(raio):",
+                "    x, y = t.position()",
+                "    angulo = math.radians(t.heading() + 90)",
+                "    t.circle(raio)",
+                "    if t.isdown():",
+                "        _indice.adicionar_circulo(x + raio * math.cos(angulo), y + raio * math.sin(angulo),",
+                "                                  raio, t.pensize(), x, y)",
+                "",
+            ]
+        self.linhas.append("tela = turtle.Screen()")
+        if self.janela:
+            # Área calculada pela análise estática: o desenho inteiro cabe na tela
+            xmin, ymin, xmax, ymax = self.janela
+            self.linhas += [
+                f"tela.setup({LARGURA_TELA}, {ALTURA_TELA})",
+                f"tela.setworldcoordinates({xmin!r}, {ymin!r}, {xmax!r}, {ymax!r})",
+            ]
+        if self.usa_tartaruga_padrao(ast.filhos):
+            self.linhas.append("t = turtle.Turtle()")
+        if self.varias_tartarugas:
+            self.linhas.append("tela.tracer(0)")
+        self.linhas.append("")
+
+        if self.orcamento or self.perfil:
+            self.adicionar_linha("try:")
+            self.indent_level += 1
+            inicio_corpo = len(self.linhas)
+            self.contar_passo(len(ast.filhos), ast.linha)
+            self.processar_comandos(ast.filhos)
+            if len(self.linhas) == inicio_corpo:
+                # Programa vazio só com o perfil: nada foi gerado dentro do try
+                self.adicionar_linha("pass")
+            self.indent_level -= 1
+            if self.orcamento:
+                self.adicionar_linha("except OrcamentoExcedido as erro:")
+                if self.perfil:
+                    # O tempo de abortar não é de nenhuma linha do programa
+                    self.adicionar_linha("    _perfil.parar()")
+                self.adicionar_linha("    abortar(erro)")
+            if self.perfil:
+                self.adicionar_linha("finally:")
+                self.adicionar_linha("    _perfil.parar()")
+        else:
+            self.processar_comandos(ast.filhos)
+        self.atualizar_tela()
         return "\n".join(self.linhas)
+
+    def declara_tartarugas(self, no):
+        if no.tipo == 'Declaracao' and no.valor['tipo'] == 'tartaruga':
+            return True
+        return any(self.declara_tartarugas(filho) for filho in no.filhos)
+
+    def usa_tartaruga_padrao(self, comandos):
+        # A tartaruga padrão não tem nome: depois do primeiro usar ela não
+        # volta mais. Só é criada se algo puder rodar com ela antes disso
+        if not self.varias_tartarugas:
+            return True
+        for comando in comandos:
+            if comando.tipo == 'Usar':
+                return False
+            if comando.tipo == 'Procedimento':
+                continue
+            if comando.tipo in ('Declaracao', 'Atribuicao') and not self.usa_sensores(comando):
+                continue
+            return True
+        return False
+
+    def usa_sensores(self, valor):
+        if isinstance(valor, list):
+            return any(self.usa_sensores(v) for v in valor)
+        if isinstance(valor, dict):
+            return any(self.usa_sensores(v) for v in valor.values())
+        if hasattr(valor, 'tipo'):
+            return valor.tipo == 'Sensor' or self.usa_sensores(valor.valor) or self.usa_sensores(valor.filhos)
+        return False
+
+    def fontes(self, ast):
+        # Texto das linhas que têm comandos, para mostrar no relatório
+        linhas = self.fonte.splitlines()
+        fontes = {}
+        for linha in sorted(self.linhas_comandos(ast)):
+            if 0 < linha <= len(linhas):
+                fontes[linha] = linhas[linha - 1].strip()
+        return fontes
+
+    def linhas_comandos(self, no):
+        linhas = {no.linha} if no.linha else set()
+        for filho in no.filhos:
+            linhas |= self.linhas_comandos(filho)
+        return linhas
+
+    def blocos(self, no):
+        # Faixa de linhas de cada laço e procedimento
+        blocos = []
+        if no.tipo in ['Repeticao', 'Enquanto', 'Procedimento']:
+            blocos.append((no.linha, max(self.linhas_comandos(no))))
+        for filho in no.filhos:
+            blocos += self.blocos(filho)
+        return blocos
+
+    def marcar_linha(self, comando):
+        if self.perfil:
+            self.adicionar_linha(f"_linha({comando.linha})")
+
+    def desenha(self, comando):
+        if comando.tipo == 'Movimento':
+            return comando.valor['comando'] in ['avancar', 'recuar', 'ir_para']
+        return comando.tipo == 'ComandoTurtle' and comando.valor['comando'] == 'circulo'
+
+    def movimento(self, metodo, *args):
+        if self.sensores:
+            return f"_mover(t.{metodo}, {', '.join(args)})"
+        return f"t.{metodo}({', '.join(args)})"
+
+    def atualizar_tela(self):
+        if self.varias_tartarugas:
+            self.adicionar_linha("tela.update()")
         
     def get_indent(self):
         return "    " * self.indent_level
@@ -27,9 +196,27 @@ class GeradorCodigo:
         else:
             self.linhas.append("")
     
+    def contar_passo(self, n, linha):
+        # Como no executor: uma soma e uma comparação; o método só é chamado
+        # quando o contador cruza o próximo ponto de verificação
+        if self.orcamento:
+            self.adicionar_linha(f"_orcamento.instrucoes += {n}")
+            self.adicionar_linha("if _orcamento.instrucoes >= _orcamento.proxima_verificacao:")
+            self.adicionar_linha(f"    _orcamento.verificar({linha})")
+
+    def contar_desenho(self, comando):
+        if self.orcamento:
+            self.adicionar_linha(f"_orcamento.desenho({comando.linha})")
+    
     def processar_comandos(self, comandos):
         for comando in comandos:
+            # A condição do enquanto marca a própria linha a cada avaliação
+            if comando.tipo != 'Enquanto':
+                self.marcar_linha(comando)
             self.processar_comando(comando)
+            # O desenho só conta depois de feito; um abortado no orçamento não
+            if self.perfil and self.desenha(comando):
+                self.adicionar_linha("_desenho()")
     
     def processar_comando(self, comando):
         if comando.tipo == 'Declaracao':
@@ -50,6 +237,12 @@ class GeradorCodigo:
             self.processar_repeticao(comando)
         elif comando.tipo == 'Enquanto':
             self.processar_enquanto(comando)
+        elif comando.tipo == 'Procedimento':
+            self.processar_procedimento(comando)
+        elif comando.tipo == 'Chamada':
+            self.processar_chamada(comando)
+        elif comando.tipo == 'Usar':
+            self.adicionar_linha(f"t = {comando.valor['nome']}")
         else:
             if hasattr(comando, 'filhos'):
                 self.processar_comandos(comando.filhos)
@@ -69,6 +262,8 @@ class GeradorCodigo:
                 self.adicionar_linha(f"{var} = ''")
             elif tipo == 'logico':
                 self.adicionar_linha(f"{var} = False")
+            elif tipo == 'tartaruga':
+                self.adicionar_linha(f"{var} = turtle.Turtle()")
     
     def processar_atribuicao(self, comando):
         ident = comando.valor['ident']
@@ -86,17 +281,20 @@ class GeradorCodigo:
     def processar_movimento(self, comando):
         cmd = comando.valor['comando']
         
+        if cmd in ['avancar', 'recuar', 'ir_para']:
+            self.contar_desenho(comando)
+        
         if cmd == 'ir_para':
             x = self.processar_expressao(comando.valor['x'])
             y = self.processar_expressao(comando.valor['y'])
-            self.adicionar_linha(f"t.goto({x}, {y})")
+            self.adicionar_linha(self.movimento('goto', x, y))
         else:
             valor = self.processar_expressao(comando.valor['valor'])
             
             if cmd == 'avancar':
-                self.adicionar_linha(f"t.forward({valor})")
+                self.adicionar_linha(self.movimento('forward', valor))
             elif cmd == 'recuar':
-                self.adicionar_linha(f"t.backward({valor})")
+                self.adicionar_linha(self.movimento('backward', valor))
             elif cmd == 'girar_direita':
                 self.adicionar_linha(f"t.right({valor})")
             elif cmd == 'girar_esquerda':
@@ -120,7 +318,14 @@ class GeradorCodigo:
         cmd = comando.valor['comando']
         
         if cmd == 'limpar_tela':
-            self.adicionar_linha("t.clear()")
+            if self.varias_tartarugas:
+                # Como no executor, apaga os desenhos de todas as tartarugas
+                self.adicionar_linha("for _tartaruga in tela.turtles():")
+                self.adicionar_linha("    _tartaruga.clear()")
+            else:
+                self.adicionar_linha("t.clear()")
+            if self.sensores:
+                self.adicionar_linha("_indice.limpar()")
         elif cmd == 'cor_de_fundo':
             valor = self.processar_expressao(comando.valor['valor'])
             self.adicionar_linha(f"tela.bgcolor({valor})")
@@ -133,7 +338,11 @@ class GeradorCodigo:
             self.adicionar_linha(f"t.speed({valor})")
         elif cmd == 'circulo':
             raio = self.processar_expressao(comando.valor['valor'])
-            self.adicionar_linha(f"t.circle({raio})")
+            self.contar_desenho(comando)
+            if self.sensores:
+                self.adicionar_linha(f"_circulo({raio})")
+            else:
+                self.adicionar_linha(f"t.circle({raio})")
     
     def processar_condicional(self, comando):
         condicao = self.processar_expressao(comando.valor['condicao'])
@@ -151,6 +360,7 @@ class GeradorCodigo:
         if bloco_verdadeiro:
             self.indent_level += 1
             if bloco_verdadeiro.filhos:
+                self.contar_passo(len(bloco_verdadeiro.filhos), comando.linha)
                 self.processar_comandos(bloco_verdadeiro.filhos)
             else:
                 self.adicionar_linha("pass")
@@ -164,6 +374,7 @@ class GeradorCodigo:
             self.adicionar_linha("else:")
             self.indent_level += 1
             if bloco_falso.filhos:
+                self.contar_passo(len(bloco_falso.filhos), comando.linha)
                 self.processar_comandos(bloco_falso.filhos)
             else:
                 self.adicionar_linha("pass")
@@ -176,23 +387,74 @@ class GeradorCodigo:
         self.adicionar_linha(f"for {contador} in range(int({vezes})):")
         
         self.indent_level += 1
+        self.marcar_linha(comando)
+        self.contar_passo(len(comando.filhos) + 1, comando.linha)
         if comando.filhos:
             self.processar_comandos(comando.filhos)
-        else:
+        elif not self.varias_tartarugas:
             self.adicionar_linha("pass")
+        self.atualizar_tela()
         self.indent_level -= 1
     
     def processar_enquanto(self, comando):
         condicao = self.processar_expressao(comando.valor['condicao'])
+        if self.perfil:
+            # _linha devolve None, então a condição decide o laço
+            condicao = f"_linha({comando.linha}) or ({condicao})"
         self.adicionar_linha(f"while {condicao}:")
         
         self.indent_level += 1
+        self.contar_passo(len(comando.filhos) + 1, comando.linha)
         if comando.filhos:
             self.processar_comandos(comando.filhos)
-        else:
+        elif not self.varias_tartarugas:
             self.adicionar_linha("pass")
+        self.atualizar_tela()
         self.indent_level -= 1
     
+    def processar_procedimento(self, comando):
+        nome = comando.valor['nome']
+        parametros = [p['nome'] for p in comando.valor['parametros']]
+        self.adicionar_linha(f"def {nome}({', '.join(parametros)}):")
+
+        self.indent_level += 1
+        # Atribuições a nomes que não são parâmetros nem locais alteram as globais
+        locais = set(parametros) | self.declaracoes_locais(comando.filhos)
+        globais = sorted(self.atribuicoes(comando.filhos) - locais)
+        if globais:
+            self.adicionar_linha(f"global {', '.join(globais)}")
+
+        self.marcar_linha(comando)
+        self.contar_passo(len(comando.filhos), comando.linha)
+        if comando.filhos:
+            self.processar_comandos(comando.filhos)
+        elif not self.orcamento:
+            self.adicionar_linha("pass")
+        self.indent_level -= 1
+        self.adicionar_linha("")
+
+    def declaracoes_locais(self, comandos):
+        nomes = set()
+        for comando in comandos:
+            if comando.tipo == 'Declaracao':
+                nomes.update(comando.valor['variaveis'])
+            nomes |= self.declaracoes_locais(comando.filhos)
+        return nomes
+
+    def atribuicoes(self, comandos):
+        nomes = set()
+        for comando in comandos:
+            if comando.tipo == 'Atribuicao':
+                nomes.add(comando.valor['ident'])
+            elif comando.tipo == 'Usar':
+                nomes.add('t')
+            nomes |= self.atribuicoes(comando.filhos)
+        return nomes
+
+    def processar_chamada(self, comando):
+        argumentos = [self.processar_expressao(a) for a in comando.valor['argumentos']]
+        self.adicionar_linha(f"{comando.valor['nome']}({', '.join(argumentos)})")
+
     def processar_expressao(self, expr):
         if isinstance(expr, str):
             if expr.startswith('"') and expr.endswith('"'):
@@ -219,9 +481,17 @@ class GeradorCodigo:
                 return self.processar_expressao_aritmetica(expr.valor)
             elif expr.tipo == 'ExpressaoLogica':
                 return self.processar_expressao_logica(expr.valor)
+            elif expr.tipo == 'Sensor':
+                return self.processar_sensor(expr.valor['sensor'])
         
         return str(expr)
     
+    def processar_sensor(self, sensor):
+        if sensor == 'tocando':
+            return "_indice.tocando(t.xcor(), t.ycor(), t.pensize())"
+        elif sensor == 'distancia_ate_linha':
+            return "_indice.distancia_ate_linha(t.xcor(), t.ycor(), t.heading())"
+
     def processar_expressao_aritmetica(self, expr_info):
         if isinstance(expr_info, dict) and 'operador' in expr_info:
             op = expr_info['operador']
@@ -261,21 +531,88 @@ class GeradorCodigo:
         return str(expr_info)
 
 
-def gerar_codigo(ast):
-    gerador = GeradorCodigo()
+def gerar_codigo(ast, orcamento=None, janela=None, perfil=False, fonte=None, arquivo=''):
+    gerador = GeradorCodigo(orcamento, janela, perfil, fonte, arquivo)
     return gerador.gerar_codigo(ast)
 
 
+def verificar_codigo(codigo):
+    # Passa pelas três análises sem parar no primeiro erro e devolve todos
+    lexer = AnalisadorLexico(codigo, recuperar=True)
+    tokens = lexer.analisar()
+    parser = AnalisadorSintatico(tokens, recuperar=True)
+    ast = parser.programa()
+    semantico = AnalisadorSemantico(recuperar=True)
+    semantico.analisar(ast, verboso=False)
+    return sorted(lexer.erros + parser.erros + semantico.erros, key=lambda erro: erro['linha'])
+
+
+def verificar_arquivos(arquivos, formato='texto'):
+    resultados = []
+    for arquivo in arquivos:
+        try:
+            with open(arquivo, "r", encoding="utf-8") as f:
+                erros = verificar_codigo(f.read())
+        except OSError as e:
+            erros = [{'fase': 'arquivo', 'linha': None, 'mensagem': f"Erro ao ler '{arquivo}': {e.strerror}"}]
+        except UnicodeDecodeError as e:
+            linha = e.object.count(b'\n', 0, e.start) + 1
+            erros = [{'fase': 'arquivo', 'linha': linha,
+                      'mensagem': f"Erro ao ler '{arquivo}': byte inválido em UTF-8 na posição {e.start}"}]
+        resultados.append({'arquivo': arquivo, 'erros': erros})
+
+    total = sum(len(r['erros']) for r in resultados)
+    if formato == 'json':
+        print(json.dumps({'arquivos': resultados, 'total_erros': total}, ensure_ascii=False, indent=2))
+    else:
+        for resultado in resultados:
+            for erro in resultado['erros']:
+                if erro['linha'] is None:
+                    print(f"{resultado['arquivo']}: {erro['mensagem']}")
+                else:
+                    # A linha já vai no prefixo; a mensagem do analisador não a repete
+                    mensagem = erro['mensagem'].replace(f" na linha {erro['linha']}", '', 1)
+                    print(f"{resultado['arquivo']}:{erro['linha']}: {mensagem}")
+        com_erros = sum(1 for r in resultados if r['erros'])
+        print(f"{len(resultados)} arquivo(s) verificado(s), {com_erros} com erros, {total} erro(s) no total")
+    return 1 if total else 0
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Uso: python gerador_codigo.py <arquivo_entrada> [arquivo_saida]")
+        print("Uso: python gerador_codigo.py <arquivo_entrada> [arquivo_saida] [opções]")
         print("Exemplo: python gerador_codigo.py programa.txt")
         sys.exit(1)
     
-    nome_entrada = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Compila um programa TurtleScript para Python")
+    parser.add_argument('arquivos', nargs='+', metavar='arquivo',
+                        help="arquivo TurtleScript de entrada e, opcionalmente, o nome do arquivo gerado em saidas/; "
+                             "com --check, todos os arquivos a verificar")
+    parser.add_argument('--max-instrucoes', type=int, help="aborta após executar este número de comandos")
+    parser.add_argument('--max-desenhos', type=int, help="aborta após este número de chamadas de desenho")
+    parser.add_argument('--max-segundos', type=float, help="aborta após este tempo de execução")
+    parser.add_argument('--ajustar-tela', action='store_true', help="ajusta a tela à área estimada do desenho")
+    parser.add_argument('--profile', '--perfil', dest='perfil', action='store_true',
+                        help="gera código que mede execuções, tempo e desenhos por linha e imprime um relatório no fim")
+    parser.add_argument('--check', '--verificar', dest='verificar', action='store_true',
+                        help="só verifica os arquivos, relatando todos os erros, sem gerar código")
+    parser.add_argument('--formato', choices=['texto', 'json'], default='texto', help="formato do relatório do --check")
+    args = parser.parse_args()
+
+    if args.verificar:
+        sys.exit(verificar_arquivos(args.arquivos, args.formato))
+    if len(args.arquivos) > 2:
+        parser.error("informe um arquivo de entrada e, opcionalmente, o nome do arquivo de saída")
+    
+    nome_entrada = args.arquivos[0]
+    args.saida = args.arquivos[1] if len(args.arquivos) > 1 else None
+    
+    orcamento = None
+    if args.max_instrucoes is not None or args.max_desenhos is not None or args.max_segundos is not None:
+        orcamento = runtime_orcamento.Orcamento(args.max_instrucoes, args.max_desenhos, args.max_segundos)
     
-    if len(sys.argv) >= 3:
-        nome_saida = sys.argv[2]
+    if args.saida:
+        nome_saida = args.saida
     else:
         base_name = os.path.splitext(os.path.basename(nome_entrada))[0]
         nome_saida = f"saida_{base_name}.py"
@@ -309,8 +646,15 @@ def main():
         semantic_analyzer.analisar(ast)
         print("Análise semântica concluída")
         
+        janela = None
+        if args.ajustar_tela:
+            print("Estimando a área do desenho...")
+            janela = analisar_extensao(ast).janela(LARGURA_TELA, ALTURA_TELA)
+            if not janela:
+                print("Não foi possível limitar a área do desenho; a tela padrão será usada")
+
         print("Gerando código Python...")
-        codigo_python = gerar_codigo(ast)
+        codigo_python = gerar_codigo(ast, orcamento, janela, args.perfil, codigo, os.path.basename(nome_entrada))
         
         with open(f"saidas/{nome_saida}", "w", encoding="utf-8") as f:
             f.write(codigo_python)
@@ -0,0 +1,202 @@
+import math
+
+SEGMENTO = 0
+CIRCULO = 1
+EPSILON = 1e-7
+
+
+class IndiceEspacial:
+    def __init__(self, tamanho_celula=32.0):
+        self.tamanho_celula = tamanho_celula
+        self.limpar()
+
+    def limpar(self):
+        self.celulas = {}
+        self.limites = None
+        self.espessura_maxima = 0.0
+        self.total = 0
+
+    def chave(self, x, y):
+        return math.floor(x / self.tamanho_celula), math.floor(y / self.tamanho_celula)
+
+    def inserir(self, item, chave):
+        if chave in self.celulas:
+            self.celulas[chave].append(item)
+        else:
+            self.celulas[chave] = [item]
+
+        cx, cy = chave
+        if self.limites is None:
+            self.limites = [cx, cy, cx, cy]
+        else:
+            limites = self.limites
+            limites[0] = min(limites[0], cx)
+            limites[1] = min(limites[1], cy)
+            limites[2] = max(limites[2], cx)
+            limites[3] = max(limites[3], cy)
+
+    def adicionar_segmento(self, x0, y0, x1, y1, espessura=1):
+        item = (SEGMENTO, x0, y0, x1, y1, float(espessura))
+        for chave in self.celulas_segmento(x0, y0, x1, y1):
+            self.inserir(item, chave)
+        self.espessura_maxima = max(self.espessura_maxima, float(espessura))
+        self.total += 1
+
+    def adicionar_circulo(self, cx, cy, raio, espessura=1, x_inicio=None, y_inicio=None):
+        raio = abs(raio)
+        item = (CIRCULO, cx, cy, raio, float(espessura), x_inicio, y_inicio)
+
+        # Só as células que o contorno atravessa recebem o círculo
+        c = self.tamanho_celula
+        kx0, ky0 = self.chave(cx - raio, cy - raio)
+        kx1, ky1 = self.chave(cx + raio, cy + raio)
+        for kx in range(kx0, kx1 + 1):
+            for ky in range(ky0, ky1 + 1):
+                x0, y0 = kx * c, ky * c
+                px = min(max(cx, x0), x0 + c)
+                py = min(max(cy, y0), y0 + c)
+                perto = math.hypot(px - cx, py - cy)
+                longe = math.hypot(max(abs(cx - x0), abs(cx - x0 - c)), max(abs(cy - y0), abs(cy - y0 - c)))
+                if perto <= raio <= longe:
+                    self.inserir(item, (kx, ky))
+
+        self.espessura_maxima = max(self.espessura_maxima, float(espessura))
+        self.total += 1
+
+    def celulas_segmento(self, x0, y0, x1, y1):
+        # Percorre as células cruzadas pelo segmento (Amanatides & Woo)
+        c = self.tamanho_celula
+        cx, cy = self.chave(x0, y0)
+        fx, fy = self.chave(x1, y1)
+        dx, dy = x1 - x0, y1 - y0
+        passo_x = 1 if dx > 0 else -1
+        passo_y = 1 if dy > 0 else -1
+        t_max_x = ((cx + (dx > 0)) * c - x0) / dx if dx else math.inf
+        t_max_y = ((cy + (dy > 0)) * c - y0) / dy if dy else math.inf
+        t_delta_x = c / abs(dx) if dx else math.inf
+        t_delta_y = c / abs(dy) if dy else math.inf
+
+        yield cx, cy
+        while (cx, cy) != (fx, fy):
+            if cy == fy or (cx != fx and t_max_x < t_max_y):
+                cx += passo_x
+                t_max_x += t_delta_x
+            else:
+                cy += passo_y
+                t_max_y += t_delta_y
+            yield cx, cy
+
+    def tocando(self, x, y, espessura=1):
+        # Toca uma linha que passa pela posição; as linhas que começam ou
+        # terminam nela (o próprio rastro da tartaruga) não contam
+        if not self.celulas:
+            return False
+
+        alcance = (self.espessura_maxima + espessura) / 2.0
+        kx0, ky0 = self.chave(x - alcance, y - alcance)
+        kx1, ky1 = self.chave(x + alcance, y + alcance)
+        for kx in range(kx0, kx1 + 1):
+            for ky in range(ky0, ky1 + 1):
+                for item in self.celulas.get((kx, ky), ()):
+                    tolerancia = (item[4 if item[0] == CIRCULO else 5] + espessura) / 2.0
+                    if item[0] == SEGMENTO:
+                        _, ax, ay, bx, by, _ = item
+                        if math.hypot(x - ax, y - ay) <= tolerancia or math.hypot(x - bx, y - by) <= tolerancia:
+                            continue
+                        if distancia_segmento(x, y, ax, ay, bx, by) <= tolerancia:
+                            return True
+                    else:
+                        _, cx, cy, raio, _, xi, yi = item
+                        if xi is not None and math.hypot(x - xi, y - yi) <= tolerancia:
+                            continue
+                        if abs(math.hypot(x - cx, y - cy) - raio) <= tolerancia:
+                            return True
+        return False
+
+    def distancia_ate_linha(self, x, y, direcao):
+        # Lança um raio na direção da tartaruga e devolve a distância até a
+        # primeira linha desenhada, ou infinito se não houver nenhuma
+        if not self.celulas:
+            return math.inf
+
+        c = self.tamanho_celula
+        dx, dy = math.cos(math.radians(direcao)), math.sin(math.radians(direcao))
+        if abs(dx) < 1e-15:
+            dx = 0.0
+        if abs(dy) < 1e-15:
+            dy = 0.0
+        cx, cy = self.chave(x, y)
+        passo_x = 1 if dx > 0 else -1
+        passo_y = 1 if dy > 0 else -1
+        t_max_x = ((cx + (dx > 0)) * c - x) / dx if dx else math.inf
+        t_max_y = ((cy + (dy > 0)) * c - y) / dy if dy else math.inf
+        t_delta_x = c / abs(dx) if dx else math.inf
+        t_delta_y = c / abs(dy) if dy else math.inf
+        lx0, ly0, lx1, ly1 = self.limites
+
+        melhor = math.inf
+        while True:
+            for item in self.celulas.get((cx, cy), ()):
+                if item[0] == SEGMENTO:
+                    t = intersecao_segmento(x, y, dx, dy, item[1], item[2], item[3], item[4])
+                else:
+                    t = intersecao_circulo(x, y, dx, dy, item[1], item[2], item[3])
+                if t < melhor:
+                    melhor = t
+
+            if melhor <= min(t_max_x, t_max_y):
+                return melhor
+
+            if t_max_x < t_max_y:
+                cx += passo_x
+                t_max_x += t_delta_x
+            else:
+                cy += passo_y
+                t_max_y += t_delta_y
+
+            if ((cx < lx0 and dx <= 0) or (cx > lx1 and dx >= 0) or
+                    (cy < ly0 and dy <= 0) or (cy > ly1 and dy >= 0)):
+                return melhor
+
+
+def distancia_segmento(x, y, ax, ay, bx, by):
+    dx, dy = bx - ax, by - ay
+    comprimento = dx * dx + dy * dy
+    if comprimento == 0:
+        return math.hypot(x - ax, y - ay)
+    t = max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / comprimento))
+    return math.hypot(x - ax - t * dx, y - ay - t * dy)
+
+
+def intersecao_segmento(x, y, dx, dy, ax, ay, bx, by):
+    ex, ey = bx - ax, by - ay
+    denominador = dx * ey - dy * ex
+    wx, wy = ax - x, ay - y
+
+    if abs(denominador) < 1e-12 * max(1.0, math.hypot(ex, ey)):
+        # Paralelo: só conta se for colinear e estiver inteiro à frente
+        if abs(wx * dy - wy * dx) > EPSILON:
+            return math.inf
+        t0 = wx * dx + wy * dy
+        t1 = (bx - x) * dx + (by - y) * dy
+        t = min(t0, t1)
+        return t if t > EPSILON else math.inf
+
+    t = (wx * ey - wy * ex) / denominador
+    s = (wx * dy - wy * dx) / denominador
+    if t > EPSILON and -EPSILON <= s <= 1 + EPSILON:
+        return t
+    return math.inf
+
+
+def intersecao_circulo(x, y, dx, dy, cx, cy, raio):
+    ox, oy = x - cx, y - cy
+    b = ox * dx + oy * dy
+    discriminante = b * b - (ox * ox + oy * oy - raio * raio)
+    if discriminante < 0:
+        return math.inf
+    raiz = math.sqrt(discriminante)
+    for t in (-b - raiz, -b + raiz):
+        if t > EPSILON:
+            return t
+    return math.inf
@@ -0,0 +1,72 @@
+import json
+import math
+import sys
+import time
+
+
+class OrcamentoExcedido(Exception):
+    def __init__(self, recurso, limite, linha):
+        self.recurso = recurso
+        self.limite = limite
+        self.linha = linha
+        onde = f" na linha {linha}" if linha is not None else ""
+        super().__init__(f"orçamento de {recurso} excedido{onde} (limite {limite})")
+
+    def como_dict(self):
+        return {
+            'erro': 'orcamento_excedido',
+            'recurso': self.recurso,
+            'limite': self.limite,
+            'linha': self.linha,
+        }
+
+
+class Orcamento:
+    def __init__(self, max_instrucoes=None, max_desenhos=None, max_segundos=None, intervalo_relogio=1024):
+        self.max_instrucoes = max_instrucoes
+        self.max_desenhos = max_desenhos
+        self.max_segundos = max_segundos
+        self.intervalo_relogio = intervalo_relogio
+        self.iniciar()
+
+    def iniciar(self):
+        self.instrucoes = 0
+        self.desenhos = 0
+        self.inicio = time.perf_counter()
+        self.proxima_verificacao = self.calcular_proxima_verificacao()
+
+    def calcular_proxima_verificacao(self):
+        # Só volta a olhar limites e relógio quando o contador cruzar este ponto
+        proxima = math.inf
+        if self.max_instrucoes is not None:
+            proxima = self.max_instrucoes + 1
+        if self.max_segundos is not None:
+            proxima = min(proxima, self.instrucoes + self.intervalo_relogio)
+        return proxima
+
+    def passo(self, n, linha):
+        self.instrucoes += n
+        if self.instrucoes >= self.proxima_verificacao:
+            self.verificar(linha)
+
+    def desenho(self, linha, n=1):
+        self.desenhos += n
+        if self.max_desenhos is not None and self.desenhos > self.max_desenhos:
+            raise OrcamentoExcedido('desenhos', self.max_desenhos, linha)
+        if self.max_segundos is not None and (n > 1 or self.desenhos % 64 == 0):
+            self.verificar_relogio(linha)
+
+    def verificar(self, linha):
+        if self.max_instrucoes is not None and self.instrucoes > self.max_instrucoes:
+            raise OrcamentoExcedido('instrucoes', self.max_instrucoes, linha)
+        self.verificar_relogio(linha)
+        self.proxima_verificacao = self.calcular_proxima_verificacao()
+
+    def verificar_relogio(self, linha):
+        if self.max_segundos is not None and time.perf_counter() - self.inicio > self.max_segundos:
+            raise OrcamentoExcedido('segundos', self.max_segundos, linha)
+
+
+def abortar(erro, codigo_saida=3):
+    print(json.dumps(erro.como_dict(), ensure_ascii=False), file=sys.stderr)
+    sys.exit(codigo_saida)
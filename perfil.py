@@ -0,0 +1,65 @@
+import atexit
+import sys
+import time
+
+
+class Perfil:
+    # Conta execuções, tempo e desenhos por linha do programa TurtleScript.
+    # Cada comando gerado avisa a linha em que está; o tempo até o próximo
+    # aviso vai para essa linha.
+    def __init__(self, arquivo='', fontes=None, blocos=None, limite=20):
+        self.arquivo = arquivo
+        self.fontes = fontes or {}
+        self.blocos = blocos or []
+        self.limite = limite
+        self.contagens = {0: [0, 0.0, 0]}
+        self.linha_atual = 0
+        self.inicio = time.perf_counter()
+        self.marca = self.inicio
+        self.fim = None
+        atexit.register(self.relatorio)
+
+    def linha(self, numero):
+        agora = time.perf_counter()
+        self.contagens[self.linha_atual][1] += agora - self.marca
+        contagem = self.contagens.get(numero)
+        if contagem is None:
+            contagem = self.contagens[numero] = [0, 0.0, 0]
+        contagem[0] += 1
+        self.linha_atual = numero
+        self.marca = agora
+
+    def desenho(self):
+        self.contagens[self.linha_atual][2] += 1
+
+    def parar(self):
+        # Fecha a conta da última linha; o que vier depois (abortar, sair
+        # do interpretador) não é tempo do programa
+        if self.fim is None:
+            self.fim = time.perf_counter()
+            self.contagens[self.linha_atual][1] += self.fim - self.marca
+
+    def relatorio(self, saida=None):
+        saida = saida or sys.stderr
+        self.parar()
+        total = self.fim - self.inicio or 1e-9
+
+        print(f"\nPerfil de {self.arquivo or 'programa'}: {total:.3f} s no total", file=saida)
+        print(f"{'linha':>6} {'execuções':>10} {'tempo (ms)':>10} {'%':>6} {'desenhos':>9}  código", file=saida)
+        linhas = sorted(self.contagens.items(), key=lambda item: item[1][1], reverse=True)
+        for numero, (execucoes, tempo, desenhos) in linhas[:self.limite]:
+            codigo = self.fontes.get(numero, '(preparação da tela)' if numero == 0 else '')
+            print(f"{numero:>6} {execucoes:>10} {tempo * 1000:>10.2f} {tempo / total:>6.1%} {desenhos:>9}  {codigo}",
+                  file=saida)
+
+        if self.blocos:
+            # Tempo somado de todas as linhas de cada laço ou procedimento
+            print(f"\n{'bloco':>6} {'até':>6} {'tempo (ms)':>10} {'%':>6} {'desenhos':>9}  código", file=saida)
+            somas = []
+            for inicio, fim in self.blocos:
+                tempo = sum(c[1] for n, c in self.contagens.items() if inicio <= n <= fim)
+                desenhos = sum(c[2] for n, c in self.contagens.items() if inicio <= n <= fim)
+                somas.append((tempo, desenhos, inicio, fim))
+            for tempo, desenhos, inicio, fim in sorted(somas, reverse=True)[:self.limite]:
+                print(f"{inicio:>6} {fim:>6} {tempo * 1000:>10.2f} {tempo / total:>6.1%} {desenhos:>9}  "
+                      f"{self.fontes.get(inicio, '')}", file=saida)
@@ -0,0 +1,456 @@
+import argparse
+import math
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from analise_extensao import analisar_extensao
+from deduplicacao import DestinoDeduplicado
+from executor import DestinoSegmentos, compilar, executar
+from orcamento import OrcamentoExcedido
+
+CORES = {
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'yellow': (255, 255, 0),
+    'cyan': (0, 255, 255),
+    'magenta': (255, 0, 255),
+    'orange': (255, 165, 0),
+    'purple': (160, 32, 240),
+    'pink': (255, 192, 203),
+    'brown': (165, 42, 42),
+    'gray': (190, 190, 190),
+    'grey': (190, 190, 190),
+    'lightgray': (211, 211, 211),
+    'lightgrey': (211, 211, 211),
+    'darkgray': (169, 169, 169),
+    'darkgrey': (169, 169, 169),
+    'darkgreen': (0, 100, 0),
+    'lightgreen': (144, 238, 144),
+    'limegreen': (50, 205, 50),
+    'darkblue': (0, 0, 139),
+    'lightblue': (173, 216, 230),
+    'skyblue': (135, 206, 235),
+    'navy': (0, 0, 128),
+    'darkred': (139, 0, 0),
+    'maroon': (176, 48, 96),
+    'gold': (255, 215, 0),
+    'violet': (238, 130, 238),
+    'indigo': (75, 0, 130),
+    'turquoise': (64, 224, 208),
+    'salmon': (250, 128, 114),
+    'beige': (245, 245, 220),
+    'tan': (210, 180, 140),
+    'coral': (255, 127, 80),
+    'darkorange': (255, 140, 0),
+    'orangered': (255, 69, 0),
+    'tomato': (255, 99, 71),
+    'crimson': (220, 20, 60),
+    'firebrick': (178, 34, 34),
+    'indianred': (205, 92, 92),
+    'lightcoral': (240, 128, 128),
+    'darksalmon': (233, 150, 122),
+    'lightsalmon': (255, 160, 122),
+    'hotpink': (255, 105, 180),
+    'deeppink': (255, 20, 147),
+    'lightpink': (255, 182, 193),
+    'khaki': (240, 230, 140),
+    'lightyellow': (255, 255, 224),
+    'goldenrod': (218, 165, 32),
+    'darkgoldenrod': (184, 134, 11),
+    'wheat': (245, 222, 179),
+    'chocolate': (210, 105, 30),
+    'sienna': (160, 82, 45),
+    'saddlebrown': (139, 69, 19),
+    'peru': (205, 133, 63),
+    'rosybrown': (188, 143, 143),
+    'lavender': (230, 230, 250),
+    'thistle': (216, 191, 216),
+    'plum': (221, 160, 221),
+    'orchid': (218, 112, 214),
+    'darkorchid': (153, 50, 204),
+    'darkviolet': (148, 0, 211),
+    'mediumpurple': (147, 112, 219),
+    'darkmagenta': (139, 0, 139),
+    'fuchsia': (255, 0, 255),
+    'slateblue': (106, 90, 205),
+    'royalblue': (65, 105, 225),
+    'mediumblue': (0, 0, 205),
+    'midnightblue': (25, 25, 112),
+    'dodgerblue': (30, 144, 255),
+    'deepskyblue': (0, 191, 255),
+    'steelblue': (70, 130, 180),
+    'cornflowerblue': (100, 149, 237),
+    'cadetblue': (95, 158, 160),
+    'powderblue': (176, 224, 230),
+    'lightcyan': (224, 255, 255),
+    'darkcyan': (0, 139, 139),
+    'aqua': (0, 255, 255),
+    'aquamarine': (127, 255, 212),
+    'teal': (0, 128, 128),
+    'lime': (0, 255, 0),
+    'olive': (128, 128, 0),
+    'seagreen': (46, 139, 87),
+    'forestgreen': (34, 139, 34),
+    'olivedrab': (107, 142, 35),
+    'darkolivegreen': (85, 107, 47),
+    'yellowgreen': (154, 205, 50),
+    'springgreen': (0, 255, 127),
+    'chartreuse': (127, 255, 0),
+    'lawngreen': (124, 252, 0),
+    'silver': (192, 192, 192),
+    'dimgray': (105, 105, 105),
+    'dimgrey': (105, 105, 105),
+    'slategray': (112, 128, 144),
+    'slategrey': (112, 128, 144),
+    'ivory': (255, 255, 240),
+    'snow': (255, 250, 250),
+    'linen': (250, 240, 230),
+    'azure': (240, 255, 255),
+    'honeydew': (240, 255, 240),
+    'mintcream': (245, 255, 250),
+}
+
+PRETO = (0, 0, 0)
+BRANCO = (255, 255, 255)
+
+
+def cor_rgb(cor, padrao=PRETO):
+    nome = str(cor).strip().lower().replace(' ', '')
+
+    if nome.startswith('#') and len(nome) in [4, 7]:
+        try:
+            if len(nome) == 4:
+                return tuple(int(c * 2, 16) for c in nome[1:])
+            return tuple(int(nome[i:i + 2], 16) for i in (1, 3, 5))
+        except ValueError:
+            pass
+
+    # Nomes que a tabela não conhece usam a cor padrão em vez de derrubar a
+    # renderização de um programa válido
+    return CORES.get(nome, padrao)
+
+
+class EscritorPNG:
+    def __init__(self, arquivo, largura, altura, tamanho_bloco=64 * 1024):
+        self.fechar_arquivo = isinstance(arquivo, str)
+        self.arquivo = open(arquivo, 'wb') if self.fechar_arquivo else arquivo
+        self.largura = largura
+        self.altura = altura
+        self.tamanho_bloco = tamanho_bloco
+        self.compressor = zlib.compressobj(6)
+        self.pendente = bytearray()
+        self.linhas = 0
+
+        self.arquivo.write(b'\x89PNG\r\n\x1a\n')
+        self.escrever_bloco(b'IHDR', struct.pack('>IIBBBBB', largura, altura, 8, 2, 0, 0, 0))
+
+    def escrever_bloco(self, tipo, dados):
+        self.arquivo.write(struct.pack('>I', len(dados)))
+        self.arquivo.write(tipo)
+        self.arquivo.write(dados)
+        self.arquivo.write(struct.pack('>I', zlib.crc32(dados, zlib.crc32(tipo))))
+
+    def escrever_linha(self, linha):
+        self.pendente += self.compressor.compress(b'\x00' + bytes(linha))
+        self.linhas += 1
+        if len(self.pendente) >= self.tamanho_bloco:
+            self.escrever_bloco(b'IDAT', bytes(self.pendente))
+            self.pendente.clear()
+
+    def finalizar(self):
+        if self.linhas != self.altura:
+            raise Exception(f"PNG incompleto: {self.linhas} de {self.altura} linhas escritas")
+
+        self.pendente += self.compressor.flush()
+        self.escrever_bloco(b'IDAT', bytes(self.pendente))
+        self.pendente.clear()
+        self.escrever_bloco(b'IEND', b'')
+
+        if self.fechar_arquivo:
+            self.arquivo.close()
+
+
+class Ladrilho:
+    def __init__(self, x0, y0, largura, altura, fundo):
+        self.x0 = x0
+        self.y0 = y0
+        self.largura = largura
+        self.altura = altura
+        self.pixels = bytearray(bytes(fundo) * (largura * altura))
+
+    def desenhar_segmento(self, x0, y0, x1, y1, rgb, raio):
+        # Preenche a cápsula (segmento engrossado por 'raio') linha a linha
+        ymin = max(self.y0, int(math.floor(min(y0, y1) - raio)))
+        ymax = min(self.y0 + self.altura - 1, int(math.ceil(max(y0, y1) + raio)))
+        if ymin > ymax:
+            return
+
+        dx, dy = x1 - x0, y1 - y0
+        comprimento = math.hypot(dx, dy)
+        if comprimento > 0:
+            nx, ny = -dy / comprimento * raio, dx / comprimento * raio
+            retangulo = [(x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)]
+        else:
+            retangulo = None
+
+        cor = bytes(rgb)
+        raio2 = raio * raio
+        for y in range(ymin, ymax + 1):
+            yc = y + 0.5
+            lo, hi = math.inf, -math.inf
+
+            for cx, cy in ((x0, y0), (x1, y1)):
+                d = raio2 - (yc - cy) ** 2
+                if d >= 0:
+                    r = math.sqrt(d)
+                    lo, hi = min(lo, cx - r), max(hi, cx + r)
+
+            if retangulo:
+                for (ax, ay), (bx, by) in zip(retangulo, retangulo[1:] + retangulo[:1]):
+                    if (ay <= yc <= by) or (by <= yc <= ay):
+                        x = ax if ay == by else ax + (yc - ay) * (bx - ax) / (by - ay)
+                        lo, hi = min(lo, x), max(hi, x)
+
+            if lo > hi:
+                continue
+
+            xa = max(self.x0, int(math.ceil(lo - 0.5)))
+            xb = min(self.x0 + self.largura - 1, int(math.floor(hi - 0.5)))
+            if xa > xb:
+                continue
+
+            self.pintar(y, xa, xb, cor)
+
+    def pintar(self, y, xa, xb, cor):
+        inicio = ((y - self.y0) * self.largura + (xa - self.x0)) * 3
+        self.pixels[inicio:inicio + (xb - xa + 1) * 3] = cor * (xb - xa + 1)
+
+
+def renderizar_ladrilho(x0, y0, largura, altura, fundo, segmentos):
+    ladrilho = Ladrilho(x0, y0, largura, altura, fundo)
+    for segmento in segmentos:
+        ladrilho.desenhar_segmento(*segmento)
+    return bytes(ladrilho.pixels)
+
+
+class RasterizadorLadrilhos(DestinoSegmentos):
+    def __init__(self, largura=800, altura=800, ladrilho=256, janela=None, tolerancia=None, max_pixels=None):
+        super().__init__(tolerancia)
+        self.largura = largura
+        self.altura = altura
+        self.ladrilho = ladrilho
+        if janela is None:
+            janela = (-largura / 2, -altura / 2, largura / 2, altura / 2)
+        self.definir_janela(*janela)
+        self.colunas = (largura + ladrilho - 1) // ladrilho
+        self.faixas = (altura + ladrilho - 1) // ladrilho
+        self.caixas = {}
+        self.segmentos = 0
+        self.max_pixels = max_pixels
+        self.pixels = 0.0
+        self.diagonal = math.hypot(largura, altura)
+
+    def definir_janela(self, xmin, ymin, xmax, ymax):
+        self.xmin, self.ymax = xmin, ymax
+        self.escala_x = self.largura / float(xmax - xmin)
+        self.escala_y = self.altura / float(ymax - ymin)
+        self.escala = max(self.escala_x, self.escala_y)
+
+    def para_pixels(self, x, y):
+        return (x - self.xmin) * self.escala_x, (self.ymax - y) * self.escala_y
+
+    def segmento(self, x0, y0, x1, y1):
+        px0, py0 = self.para_pixels(x0, y0)
+        px1, py1 = self.para_pixels(x1, y1)
+        raio = max(float(self.espessura_caneta), 1.0) / 2
+
+        xa = max(0, int(math.floor(min(px0, px1) - raio)) // self.ladrilho)
+        xb = min(self.colunas - 1, int(math.ceil(max(px0, px1) + raio)) // self.ladrilho)
+        ya = max(0, int(math.floor(min(py0, py1) - raio)) // self.ladrilho)
+        yb = min(self.faixas - 1, int(math.ceil(max(py0, py1) + raio)) // self.ladrilho)
+        if xa > xb or ya > yb:
+            return
+
+        if self.max_pixels is not None:
+            # Área da cápsula na tela: o custo de rasterizar cresce com a espessura
+            self.pixels += (min(math.hypot(px1 - px0, py1 - py0), self.diagonal) + 2 * raio) * 2 * raio
+            if self.pixels > self.max_pixels:
+                raise OrcamentoExcedido('pixels', self.max_pixels, None)
+
+        item = (px0, py0, px1, py1, cor_rgb(self.cor_caneta), raio)
+        self.segmentos += 1
+        for tx, ty in self.ladrilhos_segmento(px0, py0, px1, py1, raio, ya, yb):
+            self.caixas.setdefault((tx, ty), []).append(item)
+
+    def ladrilhos_segmento(self, px0, py0, px1, py1, raio, ya, yb):
+        # Em cada faixa, só as colunas que a cápsula pode tocar: o trecho do
+        # segmento dentro da faixa (ampliada por 'raio') mais 'raio' dos lados
+        for ty in range(ya, yb + 1):
+            topo = ty * self.ladrilho - raio
+            base = (ty + 1) * self.ladrilho + raio
+            if py0 == py1:
+                xs = (px0, px1)
+            else:
+                t0 = (topo - py0) / (py1 - py0)
+                t1 = (base - py0) / (py1 - py0)
+                ta, tb = max(0.0, min(t0, t1)), min(1.0, max(t0, t1))
+                if ta > tb:
+                    continue
+                xs = (px0 + (px1 - px0) * ta, px0 + (px1 - px0) * tb)
+
+            xa = max(0, int(math.floor(min(xs) - raio)) // self.ladrilho)
+            xb = min(self.colunas - 1, int(math.ceil(max(xs) + raio)) // self.ladrilho)
+            for tx in range(xa, xb + 1):
+                yield tx, ty
+
+    def limpar_segmentos(self):
+        self.caixas.clear()
+
+    def tarefas_faixa(self, ty):
+        y0 = ty * self.ladrilho
+        altura = min(self.ladrilho, self.altura - y0)
+        fundo = cor_rgb(self.cor_fundo, BRANCO)
+        for tx in range(self.colunas):
+            x0 = tx * self.ladrilho
+            largura = min(self.ladrilho, self.largura - x0)
+            yield tx, (x0, y0, largura, altura, fundo, self.caixas.get((tx, ty), []))
+
+    def renderizar_faixa(self, ty, pool):
+        resultados = []
+        for tx, args in self.tarefas_faixa(ty):
+            if not args[5]:
+                resultados.append(None)
+            elif pool:
+                resultados.append(pool.submit(renderizar_ladrilho, *args))
+            else:
+                resultados.append(renderizar_ladrilho(*args))
+        return resultados
+
+    def gravar(self, arquivo, processos=1):
+        escritor = EscritorPNG(arquivo, self.largura, self.altura)
+        fundo = bytes(cor_rgb(self.cor_fundo, BRANCO))
+        pool = ProcessPoolExecutor(processos) if processos > 1 else None
+
+        try:
+            proxima = self.renderizar_faixa(0, pool)
+            for ty in range(self.faixas):
+                atual = proxima
+                if ty + 1 < self.faixas:
+                    proxima = self.renderizar_faixa(ty + 1, pool)
+
+                altura = min(self.ladrilho, self.altura - ty * self.ladrilho)
+                blocos = []
+                for tx, resultado in enumerate(atual):
+                    largura = min(self.ladrilho, self.largura - tx * self.ladrilho)
+                    if resultado is None:
+                        blocos.append((None, largura))
+                    else:
+                        blocos.append((resultado.result() if pool else resultado, largura))
+
+                for y in range(altura):
+                    linha = bytearray()
+                    for pixels, largura in blocos:
+                        if pixels is None:
+                            linha += fundo * largura
+                        else:
+                            linha += pixels[y * largura * 3:(y + 1) * largura * 3]
+                    escritor.escrever_linha(linha)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        escritor.finalizar()
+
+
+def renderizar_png(ast, arquivo, largura=800, altura=800, ladrilho=256, processos=1, janela=None,
+                   deduplicar=False, orcamento=None, ajustar=False, tolerancia=None, max_pixels=None):
+    extensao = None
+    if ajustar and janela is None:
+        # Enquadra o desenho sem precisar de uma renderização de teste
+        extensao = analisar_extensao(ast)
+        janela = extensao.janela(largura, altura)
+
+    rasterizador = RasterizadorLadrilhos(largura, altura, ladrilho, janela, tolerancia, max_pixels)
+    segmentos_estimados = extensao.segmentos if extensao else None
+    if extensao and tolerancia is not None:
+        # Com tolerância, o número de lados dos círculos depende da escala da janela
+        segmentos_estimados = extensao.contar_segmentos(
+            lambda raio: rasterizador.circulos.passos(raio, rasterizador.escala))
+
+    if deduplicar:
+        destino = DestinoDeduplicado(rasterizador, escala=min(rasterizador.escala_x, rasterizador.escala_y))
+    else:
+        destino = rasterizador
+    executar(ast, destino, orcamento)
+    rasterizador.gravar(arquivo, processos)
+
+    estatisticas = {'segmentos': rasterizador.segmentos}
+    estatisticas.update(rasterizador.circulos.estatisticas())
+    if extensao:
+        estatisticas['segmentos_estimados'] = segmentos_estimados
+        estatisticas['janela'] = janela
+    if deduplicar:
+        estatisticas.update(destino.estatisticas())
+    return estatisticas
+
+
+def imprimir_estatisticas(estatisticas):
+    print(f"Segmentos rasterizados: {estatisticas['segmentos']}")
+    if estatisticas['circulos'] > estatisticas['circulos_exatos']:
+        print(f"Círculos: {estatisticas['circulos']} "
+              f"(polígonos reaproveitados do cache: {estatisticas['taxa_acertos_circulos']:.1%})")
+    elif estatisticas['circulos']:
+        print(f"Círculos: {estatisticas['circulos']}")
+    if 'segmentos_estimados' in estatisticas:
+        print(f"Segmentos estimados (limite superior): {estatisticas['segmentos_estimados']}")
+        if estatisticas['janela'] is None:
+            print("Área do desenho ilimitada; janela padrão usada")
+        else:
+            print("Janela ajustada: ({:.2f}, {:.2f}) a ({:.2f}, {:.2f})".format(*estatisticas['janela']))
+    if 'tracos' in estatisticas:
+        print(f"Traços duplicados descartados: {estatisticas['duplicados']} de {estatisticas['tracos']} "
+              f"({estatisticas['razao_deduplicacao']:.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderiza um programa TurtleScript em PNG sem interface gráfica")
+    parser.add_argument('entrada', help="arquivo TurtleScript de entrada")
+    parser.add_argument('saida', help="arquivo PNG de saída")
+    parser.add_argument('--largura', type=int, default=800)
+    parser.add_argument('--altura', type=int, default=800)
+    parser.add_argument('--ladrilho', type=int, default=256, help="tamanho do ladrilho em pixels")
+    parser.add_argument('--processos', type=int, default=1, help="processos para renderizar os ladrilhos")
+    parser.add_argument('--deduplicar', action='store_true', help="descarta traços repetidos antes de rasterizar")
+    parser.add_argument('--estatisticas', action='store_true', help="imprime estatísticas da renderização")
+    parser.add_argument('--ajustar', action='store_true', help="enquadra a imagem na área estimada do desenho")
+    parser.add_argument('--tolerancia', type=float,
+                        help="erro máximo em pixels dos círculos; o número de lados passa a depender do raio na tela")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.entrada):
+        print(f"Erro: Arquivo '{args.entrada}' não encontrado!")
+        sys.exit(1)
+
+    try:
+        with open(args.entrada, "r", encoding="utf-8") as f:
+            ast = compilar(f.read())
+
+        estatisticas = renderizar_png(ast, args.saida, args.largura, args.altura,
+                                      args.ladrilho, args.processos, deduplicar=args.deduplicar,
+                                      ajustar=args.ajustar, tolerancia=args.tolerancia)
+        print(f"Imagem gerada com sucesso: {args.saida}")
+        if args.estatisticas:
+            imprimir_estatisticas(estatisticas)
+    except Exception as e:
+        print(f"Erro durante a renderização: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
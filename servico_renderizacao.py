@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from executor import compilar
+from folha_contatos import TempoEsgotado, limitar_tarefa
+from orcamento import Orcamento, OrcamentoExcedido
+from rasterizador import renderizar_png
+
+TAMANHO_MAXIMO_PROGRAMA = 1024 * 1024
+LADO_MAXIMO = 4096
+MAX_DESENHOS_PADRAO = 200000
+# Soma das áreas dos traços, em telas inteiras: um traço grosso custa mais
+COBERTURA_MAXIMA = 16
+
+
+class ServicoOcupado(Exception):
+    pass
+
+
+class ErroRenderizacao(Exception):
+    def __init__(self, mensagem, detalhes=None):
+        super().__init__(mensagem)
+        self.detalhes = detalhes or {'erro': 'compilacao', 'mensagem': mensagem}
+
+
+def renderizar_programa(codigo, largura, altura, deduplicar, max_segundos, max_desenhos, max_tarefa=None):
+    # Roda num processo do pool: compila, executa sem interface e devolve o PNG.
+    # O orçamento só vale para a execução; o prazo cobre o trabalho inteiro
+    limitar_tarefa(max_tarefa)
+    try:
+        return renderizar_com_limites(codigo, largura, altura, deduplicar, max_segundos, max_desenhos)
+    except TempoEsgotado:
+        return None, {'erro': 'tempo_esgotado', 'limite': max_tarefa,
+                      'mensagem': f"tempo máximo do trabalho excedido (limite {max_tarefa})"}
+    finally:
+        limitar_tarefa(None)
+
+
+def renderizar_com_limites(codigo, largura, altura, deduplicar, max_segundos, max_desenhos):
+    try:
+        ast = compilar(codigo)
+        saida = io.BytesIO()
+        orcamento = Orcamento(max_desenhos=max_desenhos, max_segundos=max_segundos)
+        renderizar_png(ast, saida, largura, altura, deduplicar=deduplicar, orcamento=orcamento,
+                       max_pixels=COBERTURA_MAXIMA * largura * altura)
+        return saida.getvalue(), None
+    except TempoEsgotado:
+        raise
+    except OrcamentoExcedido as e:
+        return None, e.como_dict()
+    except Exception as e:
+        return None, {'erro': 'compilacao', 'mensagem': str(e)}
+
+
+class ServicoRenderizacao:
+    def __init__(self, processos=2, tamanho_fila=64, tamanho_cache=128, max_segundos=10.0,
+                 max_desenhos=MAX_DESENHOS_PADRAO, max_tarefa=None):
+        self.processos = processos
+        self.fila = asyncio.Queue(tamanho_fila)
+        self.tamanho_cache = tamanho_cache
+        self.cache = OrderedDict()
+        self.em_andamento = {}
+        self.max_segundos = max_segundos
+        self.max_desenhos = max_desenhos
+        if max_tarefa is None and max_segundos is not None:
+            max_tarefa = 3 * max_segundos
+        self.max_tarefa = max_tarefa
+        self.pool = None
+        self.trabalhadores = []
+        self.acertos_cache = 0
+        self.falhas_cache = 0
+        self.compartilhados = 0
+
+    async def __aenter__(self):
+        self.iniciar()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.encerrar()
+
+    def iniciar(self):
+        self.pool = ProcessPoolExecutor(self.processos)
+        self.trabalhadores = [asyncio.create_task(self.trabalhador()) for _ in range(self.processos)]
+
+    async def encerrar(self):
+        for tarefa in self.trabalhadores:
+            tarefa.cancel()
+        await asyncio.gather(*self.trabalhadores, return_exceptions=True)
+        self.trabalhadores = []
+        self.pool.shutdown(cancel_futures=True)
+
+    def chave(self, codigo, largura, altura, deduplicar):
+        resumo = hashlib.sha256(codigo.encode('utf-8')).hexdigest()
+        return resumo, largura, altura, deduplicar
+
+    async def renderizar(self, codigo, largura=800, altura=800, deduplicar=False, esperar=False):
+        chave = self.chave(codigo, largura, altura, deduplicar)
+
+        if chave in self.cache:
+            self.cache.move_to_end(chave)
+            self.acertos_cache += 1
+            return self.cache[chave]
+
+        # Pedidos idênticos que chegam enquanto o primeiro roda esperam o mesmo resultado
+        if chave in self.em_andamento:
+            self.compartilhados += 1
+            return await asyncio.shield(self.em_andamento[chave])
+
+        self.falhas_cache += 1
+        futuro = asyncio.get_running_loop().create_future()
+        trabalho = (chave, codigo, largura, altura, deduplicar, futuro)
+
+        if esperar:
+            self.em_andamento[chave] = futuro
+            await self.fila.put(trabalho)
+        else:
+            try:
+                self.fila.put_nowait(trabalho)
+            except asyncio.QueueFull:
+                raise ServicoOcupado("fila de renderização cheia")
+            self.em_andamento[chave] = futuro
+
+        return await asyncio.shield(futuro)
+
+    async def trabalhador(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            chave, codigo, largura, altura, deduplicar, futuro = await self.fila.get()
+            try:
+                imagem, erro = await loop.run_in_executor(
+                    self.pool, renderizar_programa, codigo, largura, altura, deduplicar,
+                    self.max_segundos, self.max_desenhos, self.max_tarefa)
+                if erro:
+                    futuro.set_exception(ErroRenderizacao(erro.get('mensagem', erro['erro']), erro))
+                else:
+                    self.guardar(chave, imagem)
+                    futuro.set_result(imagem)
+            except Exception as e:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            finally:
+                self.em_andamento.pop(chave, None)
+                self.fila.task_done()
+
+            # Evita o aviso de exceção nunca lida quando ninguém mais espera
+            if futuro.done() and not futuro.cancelled():
+                futuro.exception()
+
+    def guardar(self, chave, imagem):
+        self.cache[chave] = imagem
+        self.cache.move_to_end(chave)
+        while len(self.cache) > self.tamanho_cache:
+            self.cache.popitem(last=False)
+
+    def estatisticas(self):
+        return {
+            'cache': len(self.cache),
+            'acertos_cache': self.acertos_cache,
+            'falhas_cache': self.falhas_cache,
+            'compartilhados': self.compartilhados,
+            'fila': self.fila.qsize(),
+            'em_andamento': len(self.em_andamento),
+        }
+
+
+class ServidorHTTP:
+    def __init__(self, servico):
+        self.servico = servico
+
+    async def atender(self, leitor, escritor):
+        try:
+            resposta = await self.processar(leitor)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            resposta = None
+        except Exception as e:
+            resposta = self.json(400, {'erro': 'requisicao', 'mensagem': str(e)})
+
+        if resposta:
+            escritor.write(resposta)
+            try:
+                await escritor.drain()
+            except ConnectionError:
+                pass
+        escritor.close()
+
+    async def processar(self, leitor):
+        linha = (await leitor.readline()).decode('latin-1').strip()
+        if not linha:
+            return None
+        metodo, alvo, _ = linha.split(' ', 2)
+
+        cabecalhos = {}
+        while True:
+            linha = (await leitor.readline()).decode('latin-1').strip()
+            if not linha:
+                break
+            nome, _, valor = linha.partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        url = urlsplit(alvo)
+        if url.path == '/estatisticas' and metodo == 'GET':
+            return self.json(200, self.servico.estatisticas())
+        if url.path != '/render':
+            return self.json(404, {'erro': 'nao_encontrado'})
+        if metodo != 'POST':
+            return self.json(405, {'erro': 'metodo_nao_permitido'})
+
+        tamanho = int(cabecalhos.get('content-length', 0))
+        if tamanho > TAMANHO_MAXIMO_PROGRAMA:
+            return self.json(413, {'erro': 'programa_muito_grande'})
+        codigo = (await leitor.readexactly(tamanho)).decode('utf-8')
+
+        parametros = parse_qs(url.query)
+        largura = int(parametros.get('largura', ['800'])[0])
+        altura = int(parametros.get('altura', ['800'])[0])
+        deduplicar = parametros.get('deduplicar', ['0'])[0] in ['1', 'true', 'sim']
+        if not (0 < largura <= LADO_MAXIMO and 0 < altura <= LADO_MAXIMO):
+            return self.json(400, {'erro': 'tamanho_invalido', 'maximo': LADO_MAXIMO})
+
+        try:
+            imagem = await self.servico.renderizar(codigo, largura, altura, deduplicar)
+        except ServicoOcupado:
+            return self.resposta(503, 'application/json', b'{"erro": "ocupado"}', {'Retry-After': '1'})
+        except ErroRenderizacao as e:
+            return self.json(422, e.detalhes)
+
+        return self.resposta(200, 'image/png', imagem)
+
+    def json(self, status, dados):
+        return self.resposta(status, 'application/json', json.dumps(dados, ensure_ascii=False).encode('utf-8'))
+
+    def resposta(self, status, tipo, corpo, extras=None):
+        motivos = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                   413: 'Payload Too Large', 422: 'Unprocessable Entity', 503: 'Service Unavailable'}
+        cabecalhos = [
+            f"HTTP/1.1 {status} {motivos[status]}",
+            f"Content-Type: {tipo}",
+            f"Content-Length: {len(corpo)}",
+            "Connection: close",
+        ]
+        for nome, valor in (extras or {}).items():
+            cabecalhos.append(f"{nome}: {valor}")
+        return ("\r\n".join(cabecalhos) + "\r\n\r\n").encode('latin-1') + corpo
+
+
+async def servir(host, porta, processos, tamanho_fila, tamanho_cache, max_segundos, max_desenhos, max_tarefa):
+    async with ServicoRenderizacao(processos, tamanho_fila, tamanho_cache, max_segundos, max_desenhos,
+                                   max_tarefa) as servico:
+        servidor = await asyncio.start_server(ServidorHTTP(servico).atender, host, porta)
+        print(f"Servindo em http://{host}:{porta}/render")
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP que renderiza programas TurtleScript em PNG")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--processos', type=int, default=2, help="processos de renderização")
+    parser.add_argument('--fila', type=int, default=64, help="trabalhos aguardando antes de recusar pedidos")
+    parser.add_argument('--cache', type=int, default=128, help="imagens mantidas em cache")
+    parser.add_argument('--max-segundos', type=float, default=10.0, help="tempo máximo de execução por programa")
+    parser.add_argument('--max-desenhos', type=int, default=MAX_DESENHOS_PADRAO,
+                        help="chamadas de desenho máximas por programa")
+    parser.add_argument('--max-segundos-tarefa', type=float,
+                        help="prazo de cada pedido somando compilação, execução e rasterização "
+                             "(padrão: 3 vezes --max-segundos)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.processos, args.fila, args.cache, args.max_segundos,
+                           args.max_desenhos, args.max_segundos_tarefa))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import glob
+import random
+
+from analisador_incremental import AnalisadorIncremental
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import AnalisadorSintatico, NoAST
+
+TRECHOS = ['', '\n', ';', ' ', 'avancar 10;\n', 'girar_direita 9;\n', 'girar_direita 9;', '\nrecuar 5;',
+           'var inteiro k;\n', 'repita 2 vezes\navancar 1;\nfim_repita\n']
+
+
+def compilar(codigo):
+    tokens = AnalisadorLexico(codigo).analisar()
+    ast = AnalisadorSintatico(tokens).programa()
+    AnalisadorSemantico().analisar(ast, verboso=False)
+    return tokens, ast
+
+
+def compilar_ou_none(codigo):
+    try:
+        return compilar(codigo)
+    except Exception:
+        return None
+
+
+def estrutura(valor):
+    # Tipo, valor e linha de cada nó, para comparar com uma reanálise completa
+    if isinstance(valor, NoAST):
+        return (valor.tipo, estrutura(valor.valor), valor.linha, [estrutura(f) for f in valor.filhos])
+    if isinstance(valor, dict):
+        return {chave: estrutura(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [estrutura(item) for item in valor]
+    return valor
+
+
+def igual_reanalise(analisador, tokens, ast):
+    return ([(t.tipo, t.valor, t.linha) for t in analisador.tokens] == [(t.tipo, t.valor, t.linha) for t in tokens]
+            and estrutura(analisador.ast) == estrutura(ast))
+
+
+def test_edicao_que_move_tokens_entre_linhas():
+    with open('entradas/entrada5.txt', encoding='utf-8') as f:
+        analisador = AnalisadorIncremental(f.read())
+    analisador.analisar()
+    analisador.editar(96, 97, 'girar_direita 9;\n')
+    assert igual_reanalise(analisador, *compilar(analisador.codigo))
+
+
+def test_edicoes_aleatorias_igualam_reanalise_completa():
+    sorteio = random.Random(26)
+    for arquivo in sorted(glob.glob('entradas/*.txt')):
+        with open(arquivo, encoding='utf-8') as f:
+            codigo = f.read()
+        for _ in range(150):
+            analisador = AnalisadorIncremental(codigo)
+            analisador.analisar()
+            for _ in range(3):
+                inicio = sorteio.randrange(len(analisador.codigo) + 1)
+                fim = min(len(analisador.codigo), inicio + sorteio.choice([0, 0, 1, 2, 5]))
+                novo = analisador.codigo[:inicio] + (texto := sorteio.choice(TRECHOS)) + analisador.codigo[fim:]
+                esperado = compilar_ou_none(novo)
+                if esperado is None:
+                    break
+                analisador.editar(inicio, fim, texto)
+                assert igual_reanalise(analisador, *esperado), (arquivo, inicio, fim, texto)
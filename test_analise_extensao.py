@@ -0,0 +1,52 @@
+from analise_extensao import analisar_extensao
+from executor import DestinoSegmentos, compilar, executar
+
+
+def analisar(codigo):
+    return analisar_extensao(compilar(codigo))
+
+
+def test_enquanto_com_corpo_vazio_termina():
+    extensao = analisar("inicio\nenquanto verdadeiro faca\nfim_enquanto\nfim\n")
+    assert extensao.caixa is None
+    assert extensao.segmentos == 0
+
+
+def test_enquanto_que_so_atribui_termina():
+    extensao = analisar("inicio\nvar inteiro i;\ni = 0;\nenquanto verdadeiro faca\ni = i + 1;\nfim_enquanto\n"
+                        "fim\n")
+    assert extensao.caixa is None
+
+
+def test_enquanto_vazio_depois_de_desenhar_mantem_a_caixa():
+    extensao = analisar("inicio\navancar 50;\nenquanto verdadeiro faca\nfim_enquanto\nfim\n")
+    xmin, ymin, xmax, ymax = extensao.caixa
+    assert xmin <= 0 and xmax >= 50
+
+
+def test_repita_longo_com_corpo_vazio_termina():
+    extensao = analisar("inicio\navancar 10;\ngirar_direita 0.3;\nrepita 900000000 vezes\nfim_repita\n"
+                        "avancar 5;\nfim\n")
+    xmin, ymin, xmax, ymax = extensao.caixa
+    assert xmax >= 14.99
+
+
+def caixa_desenhada(codigo):
+    # Caixa dos vértices realmente desenhados pelo executor
+    pontos = []
+
+    class Destino(DestinoSegmentos):
+        def segmento(self, x0, y0, x1, y1):
+            pontos.extend([(x0, y0), (x1, y1)])
+
+    executar(compilar(codigo), Destino())
+    return (min(x for x, _ in pontos), min(y for _, y in pontos),
+            max(x for x, _ in pontos), max(y for _, y in pontos))
+
+
+def test_periodo_aproximado_ainda_cobre_o_desenho():
+    # 7 * 51.428571 fica a 3e-6 graus de 360: o desvio se acumula nas 300000 voltas
+    codigo = "inicio\nrepita 300000 vezes\navancar 100;\ngirar_direita 51.428571;\nfim_repita\nfim\n"
+    xmin, ymin, xmax, ymax = analisar(codigo).caixa
+    dx0, dy0, dx1, dy1 = caixa_desenhada(codigo)
+    assert xmin <= dx0 and ymin <= dy0 and xmax >= dx1 and ymax >= dy1
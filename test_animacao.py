@@ -0,0 +1,90 @@
+import io
+import struct
+import zlib
+
+from animacao import exportar_animacao
+from executor import compilar
+from rasterizador import renderizar_png
+
+PROGRAMA = """inicio
+definir_cor "red";
+repita 6 vezes
+    avancar 40;
+    girar_direita 60;
+fim_repita
+levantar_caneta;
+ir_para(-30, -30);
+abaixar_caneta;
+definir_espessura 3;
+definir_cor "blue";
+circulo(20);
+fim
+"""
+
+
+def blocos(dados):
+    assert dados[:8] == b'\x89PNG\r\n\x1a\n'
+    pos = 8
+    while pos < len(dados):
+        tamanho, tipo = struct.unpack_from('>I4s', dados, pos)
+        conteudo = dados[pos + 8:pos + 8 + tamanho]
+        crc, = struct.unpack_from('>I', dados, pos + 8 + tamanho)
+        assert crc == zlib.crc32(conteudo, zlib.crc32(tipo))
+        yield tipo, conteudo
+        pos += 12 + tamanho
+
+
+def linhas_rgb(comprimido, largura, altura):
+    # Os escritores só usam o filtro 0
+    dados = zlib.decompress(comprimido)
+    passo = 1 + 3 * largura
+    assert len(dados) == passo * altura and all(dados[i] == 0 for i in range(0, len(dados), passo))
+    return [dados[i + 1:i + passo] for i in range(0, len(dados), passo)]
+
+
+def ler_png(dados):
+    lista = list(blocos(dados))
+    largura, altura = struct.unpack_from('>II', lista[0][1])
+    return linhas_rgb(b''.join(c for t, c in lista if t == b'IDAT'), largura, altura)
+
+
+def test_apng_tem_sequencia_continua_e_termina_na_imagem_do_rasterizador():
+    saida = io.BytesIO()
+    estatisticas = exportar_animacao(compilar(PROGRAMA), saida, 120, 100, fps=25)
+    lista = list(blocos(saida.getvalue()))
+    tipos = [t for t, _ in lista]
+    assert tipos[:3] == [b'IHDR', b'acTL', b'fcTL'] and tipos[-1] == b'IEND'
+
+    quadros, repeticoes = struct.unpack('>II', lista[1][1])
+    assert quadros == estatisticas['quadros'] == tipos.count(b'fcTL') and quadros > 1
+    assert repeticoes == 0
+
+    # fcTL e fdAT dividem uma única numeração, sem buracos
+    sequencia = [struct.unpack_from('>I', c)[0] for t, c in lista if t in (b'fcTL', b'fdAT')]
+    assert sequencia == list(range(len(sequencia)))
+
+    # Compõe os quadros (sem descarte, substituindo a região) e compara o último
+    tela = None
+    for i, (tipo, conteudo) in enumerate(lista):
+        if tipo != b'fcTL':
+            continue
+        _, largura, altura, x0, y0, _, _, descarte, mistura = struct.unpack('>IIIIIHHBB', conteudo)
+        assert descarte == 0 and mistura == 0
+        dados = b''
+        for t, c in lista[i + 1:]:
+            if t == b'IDAT':
+                dados += c
+            elif t == b'fdAT':
+                dados += c[4:]
+            else:
+                break
+        linhas = linhas_rgb(dados, largura, altura)
+        if tela is None:
+            assert (largura, altura, x0, y0) == (120, 100, 0, 0)
+            tela = [bytearray(linha) for linha in linhas]
+        for y, linha in enumerate(linhas):
+            tela[y0 + y][3 * x0:3 * (x0 + largura)] = linha
+
+    imagem = io.BytesIO()
+    renderizar_png(compilar(PROGRAMA), imagem, 120, 100)
+    assert [bytes(linha) for linha in tela] == ler_png(imagem.getvalue())
@@ -0,0 +1,45 @@
+import io
+
+from executor import compilar
+from rasterizador import renderizar_png
+
+# O traço azul fica a 200 unidades do vermelho: na janela abaixo isso é um
+# pixel, e com espessura 5 os dois se sobrepõem na tela
+SOBREPOSTOS = """inicio
+definir_espessura 5;
+definir_cor "red";
+avancar 10000;
+levantar_caneta;
+ir_para(0, 200);
+abaixar_caneta;
+definir_cor "blue";
+avancar 10000;
+levantar_caneta;
+ir_para(0, 0);
+abaixar_caneta;
+definir_cor "red";
+avancar 10000;
+fim
+"""
+
+
+def renderizar(codigo, janela, deduplicar):
+    saida = io.BytesIO()
+    estatisticas = renderizar_png(compilar(codigo), saida, 200, 200, janela=janela, deduplicar=deduplicar)
+    return saida.getvalue(), estatisticas
+
+
+def test_janela_afastada_mantem_a_imagem():
+    janela = (-20000, -20000, 20000, 20000)
+    sem, _ = renderizar(SOBREPOSTOS, janela, False)
+    com, estatisticas = renderizar(SOBREPOSTOS, janela, True)
+    assert com == sem
+    assert estatisticas['duplicados'] == 0
+
+
+def test_traco_repetido_sem_nada_por_cima_e_descartado():
+    codigo = "inicio\nrepita 4 vezes\navancar 50;\nrecuar 50;\nfim_repita\nfim\n"
+    sem, _ = renderizar(codigo, (-100, -100, 100, 100), False)
+    com, estatisticas = renderizar(codigo, (-100, -100, 100, 100), True)
+    assert com == sem
+    assert estatisticas['duplicados'] > 0
@@ -0,0 +1,63 @@
+import struct
+import zlib
+
+import pytest
+
+from folha_contatos import COR_LIMITE, gerar_folha, miniatura_falha
+
+PROGRAMAS = {
+    'ok.txt': "inicio\nrepita 4 vezes\navancar 100;\ngirar_direita 90;\nfim_repita\nfim\n",
+    'erro.txt': "inicio\navancar ;\nfim\n",
+    'desenhos.txt': "inicio\nrepita 1000 vezes\navancar 5;\ngirar_direita 7;\nfim_repita\nfim\n",
+    'sem_fim.txt': "inicio\nvar inteiro i;\nenquanto verdadeiro faca\ni = i + 1;\nfim_enquanto\nfim\n",
+}
+LADO = 40
+SEPARADOR = 4
+
+
+def ler_png(caminho):
+    dados = caminho.read_bytes()
+    pos, idat = 8, b''
+    largura = altura = None
+    while pos < len(dados):
+        tamanho, tipo = struct.unpack_from('>I4s', dados, pos)
+        conteudo = dados[pos + 8:pos + 8 + tamanho]
+        if tipo == b'IHDR':
+            largura, altura = struct.unpack_from('>II', conteudo)
+        elif tipo == b'IDAT':
+            idat += conteudo
+        pos += 12 + tamanho
+    bruto = zlib.decompress(idat)
+    passo = 1 + 3 * largura
+    return largura, altura, [bruto[i + 1:i + passo] for i in range(0, len(bruto), passo)]
+
+
+def miniatura(linhas, fileira, coluna):
+    x = SEPARADOR + coluna * (LADO + SEPARADOR)
+    y = SEPARADOR + fileira * (LADO + SEPARADOR)
+    return b''.join(linha[3 * x:3 * (x + LADO)] for linha in linhas[y:y + LADO])
+
+
+@pytest.mark.parametrize('processos', [1, 2])
+def test_cada_falha_tem_sua_marca(tmp_path, processos):
+    arquivos = []
+    for nome, codigo in PROGRAMAS.items():
+        (tmp_path / nome).write_text(codigo, encoding='utf-8')
+        arquivos.append(str(tmp_path / nome))
+    saida = tmp_path / 'folha.png'
+
+    resultados = gerar_folha(arquivos, str(saida), lado=LADO, colunas=2, processos=processos, max_segundos=None,
+                             max_desenhos=50, separador=SEPARADOR, max_tarefa=0.3)
+    assert [r['situacao'] for r in resultados] == ['ok', 'compilacao', 'orcamento', 'tempo']
+    assert [(r['fileira'], r['coluna']) for r in resultados] == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+    largura, altura, linhas = ler_png(saida)
+    assert (largura, altura) == (2 * LADO + 3 * SEPARADOR, 2 * LADO + 3 * SEPARADOR)
+
+    desenho = miniatura(linhas, 0, 0)
+    assert desenho != miniatura_falha(LADO) and set(desenho) != {255}
+    assert miniatura(linhas, 0, 1) == miniatura_falha(LADO)
+    # Interrompido pelo orçamento: o desenho parcial com moldura laranja
+    parcial = miniatura(linhas, 1, 0)
+    assert parcial[:3] == bytes(COR_LIMITE) and parcial[-3:] == bytes(COR_LIMITE)
+    assert miniatura(linhas, 1, 1) == miniatura_falha(LADO, COR_LIMITE)
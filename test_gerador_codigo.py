@@ -0,0 +1,44 @@
+from executor import compilar
+from gerador_codigo import gerar_codigo, verificar_arquivos
+from orcamento import Orcamento
+
+
+def gerar(codigo):
+    return gerar_codigo(compilar(codigo), None, None).splitlines()
+
+
+def test_sem_tartarugas_declaradas_cria_a_padrao():
+    assert "t = turtle.Turtle()" in gerar("inicio\navancar 10;\nfim\n")
+
+
+def test_usar_antes_de_desenhar_nao_cria_a_padrao():
+    linhas = gerar("inicio\nvar tartaruga a;\nvar inteiro i;\ni = 2;\nusar a;\navancar 10;\nfim\n")
+    assert "t = turtle.Turtle()" not in linhas
+    assert "a = turtle.Turtle()" in linhas
+
+
+def test_desenhar_antes_do_primeiro_usar_cria_a_padrao():
+    linhas = gerar("inicio\nvar tartaruga a;\navancar 10;\nusar a;\navancar 10;\nfim\n")
+    assert "t = turtle.Turtle()" in linhas
+
+
+def test_limpar_tela_apaga_todas_as_tartarugas():
+    linhas = gerar("inicio\nvar tartaruga a, b;\nusar a;\navancar 10;\nusar b;\nlimpar_tela;\nfim\n")
+    assert "for _tartaruga in tela.turtles():" in linhas
+    assert "    _tartaruga.clear()" in linhas
+    assert "t.clear()" not in linhas
+
+
+def test_verificacao_em_texto_mostra_a_linha_uma_vez(tmp_path, capsys):
+    arquivo = tmp_path / 'erros.txt'
+    arquivo.write_text("inicio\nvar inteiro x;\navancar ;\ny = 2;\nfim\n", encoding='utf-8')
+    assert verificar_arquivos([str(arquivo)]) == 1
+    saida = capsys.readouterr().out.splitlines()
+    assert saida[0] == f"{arquivo}:3: Erro sintático: fator aritmético inválido ';'"
+    assert saida[1] == f"{arquivo}:4: Erro semântico: variável 'y' não foi declarada"
+
+
+def test_programa_vazio_com_perfil_compila():
+    for orcamento in [None, Orcamento(max_instrucoes=10)]:
+        codigo = gerar_codigo(compilar("inicio\nfim\n"), orcamento, perfil=True)
+        compile(codigo, 'saida.py', 'exec')
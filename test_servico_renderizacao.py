@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from servico_renderizacao import (ErroRenderizacao, ServicoOcupado, ServicoRenderizacao, ServidorHTTP,
+                                  renderizar_programa)
+
+QUADRADO = "inicio\nrepita 4 vezes\navancar 50;\ngirar_direita 90;\nfim_repita\nfim\n"
+GROSSO = "inicio\ndefinir_espessura 300;\nrepita 300 vezes\navancar 700;\ngirar_direita 91;\nfim_repita\nfim\n"
+
+
+def sem_fim(n):
+    return f"inicio\nvar inteiro i{n};\nenquanto verdadeiro faca\ni{n} = i{n} + 1;\nfim_enquanto\nfim\n"
+
+
+def test_pedido_repetido_sai_do_cache():
+    async def rodar():
+        async with ServicoRenderizacao(processos=1) as servico:
+            primeira = await servico.renderizar(QUADRADO, 100, 100)
+            segunda = await servico.renderizar(QUADRADO, 100, 100)
+            return primeira, segunda, servico.estatisticas()
+
+    primeira, segunda, estatisticas = asyncio.run(rodar())
+    assert primeira.startswith(b'\x89PNG') and segunda == primeira
+    assert estatisticas['acertos_cache'] == 1 and estatisticas['falhas_cache'] == 1
+
+
+def test_pedidos_iguais_simultaneos_compartilham_o_trabalho():
+    async def rodar():
+        async with ServicoRenderizacao(processos=1) as servico:
+            imagens = await asyncio.gather(*[servico.renderizar(QUADRADO, 120, 120) for _ in range(3)])
+            return imagens, servico.estatisticas()
+
+    imagens, estatisticas = asyncio.run(rodar())
+    assert imagens[0] == imagens[1] == imagens[2]
+    assert estatisticas['compartilhados'] == 2
+
+
+def test_fila_cheia_recusa_e_o_servidor_responde_503():
+    async def rodar():
+        async with ServicoRenderizacao(processos=1, tamanho_fila=1, max_segundos=0.5) as servico:
+            # O primeiro vai para o processo e o segundo ocupa a única vaga da fila
+            tarefas = []
+            for n in range(2):
+                tarefas.append(asyncio.create_task(servico.renderizar(sem_fim(n), 50, 50)))
+                await asyncio.sleep(0.05)
+            with pytest.raises(ServicoOcupado):
+                await servico.renderizar(sem_fim(2), 50, 50)
+
+            leitor = asyncio.StreamReader()
+            corpo = sem_fim(3).encode('utf-8')
+            leitor.feed_data(b"POST /render?largura=50&altura=50 HTTP/1.1\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(corpo) + corpo)
+            resposta = await ServidorHTTP(servico).processar(leitor)
+            return await asyncio.gather(*tarefas, return_exceptions=True), resposta
+
+    resultados, resposta = asyncio.run(rodar())
+    assert resposta.startswith(b"HTTP/1.1 503 ")
+    assert all(isinstance(r, ErroRenderizacao) and r.detalhes['recurso'] == 'segundos' for r in resultados)
+
+
+def test_traco_grosso_esbarra_no_limite_de_pixels():
+    imagem, erro = renderizar_programa(GROSSO, 800, 800, False, 2.0, None, 30.0)
+    assert imagem is None
+    assert erro['erro'] == 'orcamento_excedido' and erro['recurso'] == 'pixels'
+
+
+@pytest.mark.skipif(not hasattr(__import__('signal'), 'setitimer'), reason="prazo depende de SIGALRM")
+def test_prazo_cobre_o_trabalho_inteiro():
+    imagem, erro = renderizar_programa(sem_fim(0), 50, 50, False, None, None, 0.2)
+    assert imagem is None
+    assert erro['erro'] == 'tempo_esgotado'
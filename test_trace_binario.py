@@ -0,0 +1,75 @@
+import pytest
+
+from executor import DestinoSegmentos, compilar, executar
+from trace_binario import OP_ALTO, EstadoTrace, GravadorTrace, LeitorTrace, gravar_trace
+
+PROGRAMA = """inicio
+var tartaruga a;
+var inteiro i;
+definir_cor "red";
+repita 40 vezes
+    avancar 10 + i;
+    girar_direita 37;
+    i = i + 1;
+fim_repita
+circulo(15);
+usar a;
+definir_espessura 3;
+avancar 10000000;
+girar_esquerda 90;
+recuar 20000000;
+levantar_caneta;
+ir_para(-1.5, 2.25);
+fim
+"""
+
+
+class DestinoLista(DestinoSegmentos):
+    def __init__(self):
+        super().__init__()
+        self.segmentos = []
+
+    def segmento(self, x0, y0, x1, y1):
+        self.segmentos.append((x0, y0, x1, y1))
+
+
+def gravar(tmp_path, codigo, intervalo=4096):
+    caminho = tmp_path / 'programa.tstr'
+    with GravadorTrace(caminho, intervalo) as gravador:
+        executar(compilar(codigo), gravador)
+    return caminho
+
+
+def test_leitura_devolve_os_segmentos_executados(tmp_path):
+    direto = DestinoLista()
+    executar(compilar(PROGRAMA), direto)
+    with LeitorTrace(gravar(tmp_path, PROGRAMA)) as leitor:
+        lidos = [s[:4] for s in leitor.segmentos()]
+    assert len(lidos) == len(direto.segmentos)
+    for lido, esperado in zip(lidos, direto.segmentos):
+        assert lido == pytest.approx(esperado, abs=0.01)
+    assert lidos[-1] == (10000000, 0, 10000000, -20000000)
+
+
+def test_retomada_igual_a_leitura_do_inicio(tmp_path):
+    # Com retomadas a cada 3 registros, algumas cairiam entre um OP_ALTO e
+    # o registro que ele completa
+    with LeitorTrace(gravar(tmp_path, PROGRAMA, intervalo=3)) as leitor:
+        assert any(op == OP_ALTO for op, *_ in leitor.registros_brutos(0, len(leitor)))
+        tudo = list(leitor.segmentos())
+        estado = EstadoTrace()
+        for n, registro in enumerate(leitor.registros_brutos(0, len(leitor))):
+            assert vars(leitor.estado(n)) == vars(estado)
+            estado.aplicar(*registro)
+            parcial = list(leitor.segmentos(n))
+            assert parcial == tudo[len(tudo) - len(parcial):]
+
+
+def test_segmentos_do_trace(tmp_path):
+    with LeitorTrace(gravar(tmp_path, "inicio\navancar 100;\ngirar_direita 90;\navancar 50;\nfim\n")) as leitor:
+        assert [s[:4] for s in leitor.segmentos()] == [(0, 0, 100, 0), (100, 0, 100, -50)]
+
+
+def test_valor_fora_do_alcance_falha_com_mensagem(tmp_path):
+    with pytest.raises(Exception, match='fora do alcance do trace'):
+        gravar_trace(compilar("inicio\navancar 100000000000000000000;\nfim\n"), tmp_path / 'grande.tstr')
@@ -0,0 +1,398 @@
+import bisect
+import math
+import mmap
+import os
+import struct
+import sys
+
+from executor import Destino, compilar, executar, pontos_circulo
+
+MAGICO = b'TSTR'
+MAGICO_FINAL = b'TEND'
+VERSAO = 3
+ESCALA = 256
+TAMANHO_BUFFER = 64 * 1024
+
+CABECALHO = struct.Struct('<4sHHI')
+REGISTRO = struct.Struct('<BBii')
+RETOMADA = struct.Struct('<QqqiqiqiB3x')
+RODAPE = struct.Struct('<4sQQQ')
+
+OP_MOVER = 1
+OP_CANETA = 2
+OP_COR = 3
+OP_ESPESSURA = 4
+OP_CIRCULO = 5
+OP_LIMPAR = 6
+OP_FUNDO = 7
+OP_VELOCIDADE = 8
+OP_TARTARUGA = 9
+OP_ALTO = 10
+
+# Os campos do registro têm 32 bits; valores maiores levam antes um registro
+# OP_ALTO com os 32 bits de cima. Os quantizados ficam abaixo de 2**61 para
+# que a diferença entre duas posições ainda caiba nos dois registros
+LIMITE_CAMPO = 2 ** 31
+LIMITE_VALOR = 2 ** 61
+
+NOMES_OPERACOES = {
+    OP_MOVER: 'mover',
+    OP_CANETA: 'caneta',
+    OP_COR: 'cor',
+    OP_ESPESSURA: 'espessura',
+    OP_CIRCULO: 'circulo',
+    OP_LIMPAR: 'limpar',
+    OP_FUNDO: 'fundo',
+    OP_VELOCIDADE: 'velocidade',
+    OP_TARTARUGA: 'tartaruga',
+    OP_ALTO: 'alto',
+}
+
+PALETA_INICIAL = ['black', 'white']
+
+
+def quantizar(valor):
+    if not math.isfinite(valor) or abs(valor) * ESCALA >= LIMITE_VALOR:
+        raise Exception(f"Valor fora do alcance do trace: {valor}")
+    return int(round(valor * ESCALA))
+
+
+class EstadoTrace:
+    def __init__(self, x=0, y=0, caneta=1, cor=0, espessura=ESCALA, fundo=1, velocidade=3 * ESCALA,
+                 tartaruga=-1):
+        self.x = x
+        self.y = y
+        self.caneta = caneta
+        self.cor = cor
+        self.espessura = espessura
+        self.fundo = fundo
+        self.velocidade = velocidade
+        self.tartaruga = tartaruga
+        self.alto_a = 0
+        self.alto_b = 0
+
+    def empacotar(self, registro):
+        return RETOMADA.pack(registro, self.x, self.y, self.cor, self.espessura,
+                             self.fundo, self.velocidade, self.tartaruga, self.caneta)
+
+    @staticmethod
+    def desempacotar(dados):
+        registro, x, y, cor, espessura, fundo, velocidade, tartaruga, caneta = RETOMADA.unpack(dados)
+        return registro, EstadoTrace(x, y, caneta, cor, espessura, fundo, velocidade, tartaruga)
+
+    def aplicar(self, op, aux, a, b):
+        # Devolve os valores completos do registro, somando o OP_ALTO anterior
+        if op == OP_ALTO:
+            self.alto_a, self.alto_b = a, b
+            return a, b
+        if self.alto_a or self.alto_b:
+            a += self.alto_a << 32
+            b += self.alto_b << 32
+            self.alto_a = self.alto_b = 0
+
+        if op == OP_MOVER:
+            self.x += a
+            self.y += b
+        elif op == OP_CANETA:
+            self.caneta = aux
+        elif op == OP_COR:
+            self.cor = a
+        elif op == OP_ESPESSURA:
+            self.espessura = a
+        elif op == OP_FUNDO:
+            self.fundo = a
+        elif op == OP_VELOCIDADE:
+            self.velocidade = a
+        elif op == OP_TARTARUGA:
+            self.tartaruga = a
+        return a, b
+
+
+class GravadorTrace(Destino):
+    def __init__(self, caminho, intervalo_retomada=4096):
+        self.arquivo = open(caminho, 'wb')
+        self.arquivo.write(CABECALHO.pack(MAGICO, VERSAO, REGISTRO.size, ESCALA))
+        self.buffer = bytearray()
+        self.intervalo_retomada = intervalo_retomada
+        self.proxima_retomada = 0
+        self.retomadas = bytearray()
+        self.paleta = list(PALETA_INICIAL)
+        self.indices_paleta = {cor: i for i, cor in enumerate(self.paleta)}
+        self.estado = EstadoTrace()
+        self.estados_tartarugas = {}
+        self.registros = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.finalizar()
+
+    def gravar(self, op, aux=0, a=0, b=0):
+        if not (-LIMITE_CAMPO <= a < LIMITE_CAMPO and -LIMITE_CAMPO <= b < LIMITE_CAMPO):
+            alto_a = (a + LIMITE_CAMPO) >> 32
+            alto_b = (b + LIMITE_CAMPO) >> 32
+            self.registrar(OP_ALTO, 0, alto_a, alto_b)
+            a -= alto_a << 32
+            b -= alto_b << 32
+        self.registrar(op, aux, a, b)
+
+    def registrar(self, op, aux, a, b):
+        # Um ponto de retomada nunca separa o OP_ALTO do registro que ele completa
+        if self.registros >= self.proxima_retomada and not (self.estado.alto_a or self.estado.alto_b):
+            self.retomadas += self.estado.empacotar(self.registros)
+            self.proxima_retomada = self.registros + self.intervalo_retomada
+
+        self.buffer += REGISTRO.pack(op, aux, a, b)
+        self.estado.aplicar(op, aux, a, b)
+        self.registros += 1
+
+        if len(self.buffer) >= TAMANHO_BUFFER:
+            self.arquivo.write(self.buffer)
+            self.buffer.clear()
+
+    def indice_cor(self, cor):
+        cor = str(cor)
+        if cor not in self.indices_paleta:
+            self.indices_paleta[cor] = len(self.paleta)
+            self.paleta.append(cor)
+        return self.indices_paleta[cor]
+
+    def mover(self, x, y):
+        dx = quantizar(x) - self.estado.x
+        dy = quantizar(y) - self.estado.y
+        if dx or dy:
+            self.gravar(OP_MOVER, 0, dx, dy)
+
+    def caneta(self, abaixada):
+        if int(abaixada) != self.estado.caneta:
+            self.gravar(OP_CANETA, int(abaixada))
+
+    def cor(self, cor):
+        indice = self.indice_cor(cor)
+        if indice != self.estado.cor:
+            self.gravar(OP_COR, 0, indice)
+
+    def espessura(self, espessura):
+        valor = quantizar(espessura)
+        if valor != self.estado.espessura:
+            self.gravar(OP_ESPESSURA, 0, valor)
+
+    def circulo(self, raio, direcao):
+        raio = quantizar(raio)
+        if raio and self.estado.caneta:
+            self.gravar(OP_CIRCULO, 0, raio, quantizar(direcao % 360.0))
+
+    def limpar(self):
+        self.gravar(OP_LIMPAR)
+
+    def fundo(self, cor):
+        indice = self.indice_cor(cor)
+        if indice != self.estado.fundo:
+            self.gravar(OP_FUNDO, 0, indice)
+
+    def velocidade(self, velocidade):
+        valor = quantizar(velocidade)
+        if valor != self.estado.velocidade:
+            self.gravar(OP_VELOCIDADE, 0, valor)
+
+    def tartaruga(self, nome):
+        # A paleta também guarda os nomes das tartarugas; -1 é a tartaruga padrão
+        indice = self.indice_cor(nome) if nome else -1
+        estado = self.estado
+        if indice == estado.tartaruga:
+            return
+
+        self.estados_tartarugas[estado.tartaruga] = (estado.x, estado.y, estado.caneta,
+                                                     estado.cor, estado.espessura)
+        x, y, caneta, cor, espessura = self.estados_tartarugas.get(indice, (0, 0, 1, 0, ESCALA))
+
+        # Depois da troca o trace segue descrevendo uma caneta só: o estado
+        # completo da tartaruga escolhida é gravado logo em seguida
+        self.gravar(OP_TARTARUGA, 0, indice)
+        self.gravar(OP_CANETA, 0)
+        self.gravar(OP_MOVER, 0, x - estado.x, y - estado.y)
+        self.gravar(OP_COR, 0, cor)
+        self.gravar(OP_ESPESSURA, 0, espessura)
+        self.gravar(OP_CANETA, caneta)
+
+    def finalizar(self):
+        if self.arquivo.closed:
+            return
+
+        self.arquivo.write(self.buffer)
+        self.buffer.clear()
+
+        pos_paleta = self.arquivo.tell()
+        self.arquivo.write(struct.pack('<I', len(self.paleta)))
+        for cor in self.paleta:
+            dados = cor.encode('utf-8')
+            self.arquivo.write(struct.pack('<H', len(dados)) + dados)
+
+        pos_retomadas = self.arquivo.tell()
+        self.arquivo.write(self.retomadas)
+        self.arquivo.write(RODAPE.pack(MAGICO_FINAL, self.registros, pos_paleta, pos_retomadas))
+        self.arquivo.close()
+
+
+class LeitorTrace:
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, 'rb')
+        self.dados = mmap.mmap(self.arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magico, versao, tamanho, escala = CABECALHO.unpack_from(self.dados, 0)
+        if magico != MAGICO or versao != VERSAO or tamanho != REGISTRO.size:
+            raise Exception(f"Arquivo de trace inválido: '{caminho}'")
+        self.escala = escala
+
+        magico, self.registros, pos_paleta, pos_retomadas = RODAPE.unpack_from(
+            self.dados, len(self.dados) - RODAPE.size)
+        if magico != MAGICO_FINAL:
+            raise Exception(f"Arquivo de trace incompleto: '{caminho}'")
+
+        self.paleta = []
+        pos = pos_paleta + 4
+        for _ in range(struct.unpack_from('<I', self.dados, pos_paleta)[0]):
+            tamanho = struct.unpack_from('<H', self.dados, pos)[0]
+            self.paleta.append(self.dados[pos + 2:pos + 2 + tamanho].decode('utf-8'))
+            pos += 2 + tamanho
+
+        self.retomadas = self.dados[pos_retomadas:len(self.dados) - RODAPE.size]
+        self.registros_retomada = [
+            RETOMADA.unpack_from(self.retomadas, i)[0]
+            for i in range(0, len(self.retomadas), RETOMADA.size)
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def __len__(self):
+        return self.registros
+
+    def fechar(self):
+        self.dados.close()
+        self.arquivo.close()
+
+    def registros_brutos(self, inicio, fim, bloco=4096):
+        for pos in range(inicio, fim, bloco):
+            ini = CABECALHO.size + pos * REGISTRO.size
+            yield from REGISTRO.iter_unpack(self.dados[ini:ini + min(bloco, fim - pos) * REGISTRO.size])
+
+    def estado(self, n):
+        n = max(0, min(n, self.registros))
+        i = bisect.bisect_right(self.registros_retomada, n) - 1
+        if i < 0:
+            return EstadoTrace()
+
+        registro, estado = EstadoTrace.desempacotar(self.retomadas[i * RETOMADA.size:(i + 1) * RETOMADA.size])
+        for op, aux, a, b in self.registros_brutos(registro, n):
+            estado.aplicar(op, aux, a, b)
+        return estado
+
+    def operacoes(self, inicio=0, fim=None):
+        fim = self.registros if fim is None else min(fim, self.registros)
+        estado = self.estado(inicio)
+        escala = float(self.escala)
+
+        for op, aux, a, b in self.registros_brutos(inicio, fim):
+            a, b = estado.aplicar(op, aux, a, b)
+
+            if op == OP_MOVER:
+                yield 'mover', estado.x / escala, estado.y / escala
+            elif op == OP_CANETA:
+                yield 'caneta', bool(aux)
+            elif op in [OP_COR, OP_FUNDO]:
+                yield NOMES_OPERACOES[op], self.paleta[a]
+            elif op in [OP_ESPESSURA, OP_VELOCIDADE]:
+                yield NOMES_OPERACOES[op], a / escala
+            elif op == OP_CIRCULO:
+                yield 'circulo', a / escala, b / escala
+            elif op == OP_LIMPAR:
+                yield ('limpar',)
+            elif op == OP_TARTARUGA:
+                yield 'tartaruga', self.nome_tartaruga(a)
+
+    def nome_tartaruga(self, indice):
+        return self.paleta[indice] if indice >= 0 else ''
+
+    def reproduzir(self, destino, inicio=0, fim=None):
+        if inicio > 0:
+            estado = self.estado(inicio)
+            destino.tartaruga(self.nome_tartaruga(estado.tartaruga))
+            destino.caneta(False)
+            destino.mover(estado.x / self.escala, estado.y / self.escala)
+            destino.cor(self.paleta[estado.cor])
+            destino.espessura(estado.espessura / self.escala)
+            destino.fundo(self.paleta[estado.fundo])
+            destino.velocidade(estado.velocidade / self.escala)
+            destino.caneta(bool(estado.caneta))
+
+        for nome, *args in self.operacoes(inicio, fim):
+            getattr(destino, nome)(*args)
+
+    def segmentos(self, inicio=0, fim=None):
+        estado = self.estado(inicio)
+        escala = float(self.escala)
+        x, y = estado.x / escala, estado.y / escala
+        caneta = estado.caneta
+        cor = self.paleta[estado.cor]
+        espessura = estado.espessura / escala
+
+        for nome, *args in self.operacoes(inicio, fim):
+            if nome == 'mover':
+                if caneta:
+                    yield x, y, args[0], args[1], cor, espessura
+                x, y = args
+            elif nome == 'caneta':
+                caneta = args[0]
+            elif nome == 'cor':
+                cor = args[0]
+            elif nome == 'espessura':
+                espessura = args[0]
+            elif nome == 'circulo' and caneta:
+                pontos = pontos_circulo(x, y, args[1], args[0])
+                for (x0, y0), (x1, y1) in zip(pontos, pontos[1:]):
+                    yield x0, y0, x1, y1, cor, espessura
+
+
+def gravar_trace(ast, caminho):
+    with GravadorTrace(caminho) as gravador:
+        executar(ast, gravador)
+    return gravador.registros
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Uso: python trace_binario.py <arquivo_entrada> <arquivo_trace>")
+        print("     python trace_binario.py --info <arquivo_trace>")
+        sys.exit(1)
+
+    if sys.argv[1] == '--info':
+        with LeitorTrace(sys.argv[2]) as leitor:
+            print(f"Registros: {len(leitor)}")
+            print(f"Paleta: {', '.join(leitor.paleta)}")
+            print(f"Segmentos: {sum(1 for _ in leitor.segmentos())}")
+        return
+
+    nome_entrada, nome_trace = sys.argv[1], sys.argv[2]
+    if not os.path.exists(nome_entrada):
+        print(f"Erro: Arquivo '{nome_entrada}' não encontrado!")
+        sys.exit(1)
+
+    try:
+        with open(nome_entrada, "r", encoding="utf-8") as f:
+            ast = compilar(f.read())
+
+        registros = gravar_trace(ast, nome_trace)
+        print(f"Trace gravado com sucesso: {nome_trace} ({registros} registros, "
+              f"{os.path.getsize(nome_trace)} bytes)")
+    except Exception as e:
+        print(f"Erro durante a gravação do trace: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()